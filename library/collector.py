@@ -5,14 +5,24 @@ Created on 27 Jul. 2021
 '''
 
 import logging
+from datetime import date
+
+import numpy as np
+
 from library.station_metadata import StationMetadata
+from library.date_ordinals import date_ordinal
+from library.station_store import StationStore
+from library.statistic_accumulators import StatisticsAccumulator, \
+    EarliestStationAccumulator, RetiredStationAccumulator, NetworkAccumulator
 
 #from itertools import accumulate
 
 class Collector(object):
     '''
     Class to collect various statistics
-    from the list of station metadata records.
+    from the list of station metadata records,
+    or from a station store, whose statistics
+    are collected by array operations.
     '''
 
 
@@ -20,42 +30,148 @@ class Collector(object):
         '''
         Constructor
         The filter parameters are stored here.
+        The date range parameter is a (begin, end) pair of YYYYMMDD strings,
+        kept as a pair of dates.
+        When set, just the stations active in that range are counted.
         '''
-        self.date_range = None
+        date_range = getattr(params, 'date_range', None)
+        self.date_range = tuple(
+            date.fromordinal(date_ordinal(day)) for day in date_range) \
+            if date_range is not None else None
         self.country_code = None        
 
     def earliest_station(self, metadatas: list) -> StationMetadata:
-        dated_metadatas = filter(lambda metadata:metadata.earliest_location(), metadatas)
-        earliest_metadata = min(dated_metadatas, key=lambda metadata:metadata.earliest_location().period().start_datetime)
-        return earliest_metadata
+        accumulator = EarliestStationAccumulator()
+        for metadata in metadatas:
+            accumulator.update(metadata)
+        return accumulator.station
     
     def retired_station_count(self, metadatas):
-        return sum([1 if metadata.is_retired_station() else 0 for metadata in metadatas]) 
+        accumulator = RetiredStationAccumulator()
+        for metadata in metadatas:
+            accumulator.update(metadata)
+        return accumulator.finalize()
     
     def available_networks(self, metadatas: list) -> set:
-        networks = set()
+        accumulator = NetworkAccumulator()
         for metadata in metadatas:
-            networks.update(metadata.networks)
-        return ', '.join(sorted(networks))
+            accumulator.update(metadata)
+        return accumulator.finalize()
+
+    def filter_stations(self, store: StationStore) -> StationStore:
+        '''
+        The stations of the store that pass the filters,
+        found for the date range by the interval index of the store.
+        '''
+        if self.date_range is None:
+            return store
+        return store.select(store.stations_active_between(*self.date_range))
 
-    def collect_statistics(self, metadatas: list):
+    def filtered_store(self, metadatas) -> StationStore:
+        '''
+        The stations that pass the filters as a station store,
+        collecting a list of metadata records into a store.
+        '''
+        store = metadatas if isinstance(metadatas, StationStore) \
+            else StationStore.from_metadatas(metadatas)
+        return self.filter_stations(store)
+
+    def collect_statistics(self, metadatas) -> dict:
+        '''
+        Collect the statistics in a single pass over any iterable
+        of metadata records, such as LoadEMSHRLite.iter_stations(),
+        updating an accumulator for each statistic with each record.
+        No record is kept once it has been counted,
+        apart from the earliest station found so far.
+        The earliest station is omitted if no station has a known start date.
+        '''
+        if self.date_range is not None and not isinstance(metadatas, StationStore):
+            metadatas = StationStore.from_metadatas(metadatas)
+        if isinstance(metadatas, StationStore):
+            return self.collect_store_statistics(metadatas)
+        return StatisticsAccumulator().update_all(metadatas).finalize()
+
+    def collect_store_statistics(self, store: StationStore) -> dict:
+        '''
+        Collect the same statistics as collect_statistics()
+        from a station store, with array operations over its columns.
+        Station metadata records are only made for the earliest station
+        and for the stations with invalid periods.
+        '''
         logger = logging.getLogger(__name__)
 
+        store = self.filter_stations(store)
+        valid_periods = store.valid_periods()
+        for failure_count, station_index in enumerate((~valid_periods).nonzero()[0], 1):
+            dump = store.station(station_index).dump()
+            logger.warning(
+                f"Failure: {failure_count} - \nMetadata: {dump}")
+
         statistics = dict()
-        statistics['station_count'] = len(metadatas)
-        statistics['location_count'] = sum([metadata.location_count() for metadata in metadatas]) 
-        statistics['valid_period_count'] = sum([1 if metadata.is_valid_periods() else 0 for metadata in metadatas])        
-        earliest_station = self.earliest_station(metadatas)
-        statistics['earliest_station'] = earliest_station.dump()
-        statistics['retired_station_count'] = self.retired_station_count(metadatas)
-        statistics['available_networks'] = self.available_networks(metadatas)
-
-        failure_count = 1
-        for metadata in metadatas:
-            if not metadata.is_valid_periods():
-                dump = metadata.dump()
-                logger.warning(
-                    f"Failure: {failure_count} - \nMetadata: {dump}")
-                failure_count += 1
+        statistics['station_count'] = store.station_count()
+        statistics['location_count'] = store.location_count()
+        statistics['valid_period_count'] = int(valid_periods.sum())
+        earliest_index = store.earliest_station_index()
+        if earliest_index is not None:
+            statistics['earliest_station'] = store.station(earliest_index).dump()
+        statistics['retired_station_count'] = int(store.retired().sum())
+        statistics['available_networks'] = ', '.join(sorted(store.available_networks()))
+        return statistics
+
+    def collect_active_station_series(
+            self, metadatas, resolution: str='year', group_by: str=None) -> tuple:
+        '''
+        The count of active stations in each day, month or year,
+        optionally grouped by 'country' or 'network', 
+        as for StationStore.active_station_counts().
+        When the date range is set the series covers just that range.
+        '''
+        store = self.filtered_store(metadatas)
+        begin, end = self.date_range if self.date_range is not None else (None, None)
+        return store.active_station_counts(resolution, begin, end, group_by)
+
+    def collect_relocation_statistics(
+            self, metadatas, pseudo_move_km: float=1.0, percentiles: tuple=(50, 90, 99)) -> dict:
+        '''
+        Summarise the relocation table of the stations.
+        A move is a change of coordinates between consecutive locations,
+        and a pseudo move is a move shorter than the pseudo move distance,
+        usually due to the rounding of coordinates.
+        The moves per station count just the real moves.
+        '''
+        store = self.filtered_store(metadatas)
+        relocations = store.relocations()
+        moves = relocations.moves()
+        pseudo_moves = relocations.pseudo_moves(pseudo_move_km)
+        real_moves = moves & ~pseudo_moves
+        moves_per_station = np.bincount(
+            relocations.station_indices[real_moves], minlength=store.station_count())
+        distances = relocations.distances_km[moves]
+        move_count = int(moves.sum())
+
+        statistics = dict()
+        statistics['location_pair_count'] = relocations.row_count()
+        statistics['move_count'] = move_count
+        statistics['pseudo_move_count'] = int(pseudo_moves.sum())
+        statistics['pseudo_move_share'] = \
+            float(pseudo_moves.sum()) / move_count if move_count > 0 else 0.0
+        statistics['moved_station_count'] = int(np.count_nonzero(moves_per_station))
+        statistics['mean_moves_per_station'] = \
+            float(moves_per_station.mean()) if store.station_count() > 0 else 0.0
+        statistics['max_moves_per_station'] = \
+            int(moves_per_station.max()) if store.station_count() > 0 else 0
+        statistics['distance_percentiles'] = dict(
+            (percentile, float(np.percentile(distances, percentile)) if move_count > 0 else None)
+            for percentile in percentiles)
         return statistics
 
+    def collect_duplicate_clusters(
+            self, metadatas, tolerance_degrees: float=0.0001, min_overlap: float=0.0) -> list:
+        '''
+        The clusters of candidate duplicate stations, as lists of
+        their NCDC ids with the best overlap score of the cluster.
+        '''
+        store = self.filtered_store(metadatas)
+        return [
+            (cluster.ncdcs, cluster.score())
+            for cluster in store.duplicate_clusters(tolerance_degrees, min_overlap)]
@@ -4,14 +4,22 @@ Created on 26 Jul. 2021
 @author: richardrothwell
 '''
 
-from struct import Struct
+from collections import namedtuple
+from struct import Struct, error as struct_error
+
+from library.field_types import TEXT
+from library.exceptions import LayoutDriftError
+
 
 class ColumnLayout(object):
     '''
     A representation of the layout of the records
     in an EMSHR Lite file. 
     
-    This class provides a public parse_line method.
+    This class provides a public parse_line method,
+    compiles faster tuple-returning parsers
+    and converts blocks of lines column-at-a-time,
+    unpacking contiguous fixed-stride blocks in one pass.
     
     In this case the file contains fixed-width fields
     with each field separated by a space.
@@ -22,6 +30,10 @@ class ColumnLayout(object):
     The headings line is followed by a separator line.
     This line is use to infer the column widths.
     
+    The selected fields are heading names or column fields,
+    which also give the type of the column values.
+    The values of untyped columns are stripped strings.
+    
     The default column heading and separator lines are shown below.
     '''
 
@@ -60,9 +72,21 @@ class ColumnLayout(object):
         '''
         self.heading_line = heading_line
         self.separator_line = separator_line
-        self.selected_fields = selected_fields
+        self.selected_fields = [
+            field if isinstance(field, str) else field.name for field in selected_fields]
+        self.field_types = dict(
+            (field, TEXT) if isinstance(field, str) else field for field in selected_fields)
+        # Derived once, as blocks are converted many times per file.
+        self._field_widths = self._all_field_widths()
+        self._column_headings = self._all_column_headings()
+        self._field_names = [
+            heading for heading in self._column_headings 
+            if heading in self.selected_fields]
         line_format = self._line_format()
         self.field_struct = Struct(line_format)               
+        self._parsers = dict()
+        self._parsed_record_type = None
+        self._block_structs = dict()
         
     def _all_field_widths(self):
         '''
@@ -71,8 +95,7 @@ class ColumnLayout(object):
         '''
         fields = self.separator_line.split()
         widths = [len(field) for field in fields]
-        paddings = [1] * len(widths)
-        paddings[0] = 0
+        paddings = [0] + [1] * (len(widths) - 1)
         # Add leading padding byte to each field except the first.
         widths = [width[0] + width[1]  for width in zip(widths, paddings)]        
         return widths
@@ -103,8 +126,8 @@ class ColumnLayout(object):
         are of interest.
         Uninteresting fields are set to be negative.
         '''
-        widths = self._all_field_widths()
-        headings = self._all_column_headings()
+        widths = self._field_widths
+        headings = self._column_headings
         selected_fields = self.selected_fields
         selected_widths = []
         for width, heading in zip(widths, headings):
@@ -133,15 +156,170 @@ class ColumnLayout(object):
             line_format = ''.join(column_formats)
         return line_format
 
+    def _selected_headings(self) -> list:
+        '''
+        The selected column names in the order of the columns in the file,
+        as for the values unpacked by the field struct.
+        '''
+        return self._field_names
+
+    def columns(self) -> list:
+        '''
+        Public method that returns a list of (heading, offset, width)
+        triples, one per column in the file, in column order.
+        The widths include the padding byte before each column.
+        '''
+        columns = []
+        offset = 0
+        for width, heading in zip(self._field_widths, self._column_headings):
+            columns.append((heading, offset, width))
+            offset += width
+        return columns
+
+    def missing_fields(self) -> list:
+        '''
+        The selected column names without a column in the headings line.
+        '''
+        headings = self._column_headings
+        return [field for field in self.selected_fields if field not in headings]
+
+    def field_spans(self) -> dict:
+        '''
+        Public method that returns a dictionary of (offset, width) 
+        pairs keyed by column name, giving the position of each
+        selected column within a line.
+        The widths include the padding byte before each column.
+        '''
+        widths = self._field_widths
+        headings = self._column_headings
+        spans = dict()
+        offset = 0
+        for width, heading in zip(widths, headings):
+            if heading in self.selected_fields:
+                spans[heading] = (offset, width)
+            offset += width
+        return spans
+
+    def compile_parser(self, converters: dict=None):
+        '''
+        Public method that returns a parse function for lines.
+        The function returns a named tuple with one value per
+        selected column, in the order of the columns in the file.
+        Each value is given by the converter for its column name,
+        applied to the raw field bytes including the padding byte,
+        or by default by the type of the column.
+        The parsers are compiled once per set of converters.
+        '''
+        converters = converters if converters is not None else dict()
+        key = frozenset(converters.items())
+        parser = self._parsers.get(key)
+        if parser is not None:
+            return parser
+
+        unpack = self.field_struct.unpack
+        field_names = self._selected_headings()
+        make_record = self._record_type()._make
+        field_converters = [
+            converters.get(name, self.field_types[name].convert) for name in field_names]
+        if all(converter is TEXT.convert for converter in field_converters):
+            convert = TEXT.convert
+            def parser(line) -> tuple:
+                return make_record(map(convert, unpack(line)))
+        else:
+            def parser(line) -> tuple:
+                return make_record([
+                    convert(value) for convert, value in zip(field_converters, unpack(line))])
+        self._parsers[key] = parser
+        return parser
+
+    def _record_type(self):
+        if self._parsed_record_type is None:
+            missing_fields = self.missing_fields()
+            if missing_fields:
+                # Parsing would silently drop these columns.
+                raise LayoutDriftError(
+                    f"Missing selected columns: {', '.join(missing_fields)}")
+            self._parsed_record_type = namedtuple(
+                'ParsedLine', self._selected_headings(), rename=True)
+        return self._parsed_record_type
+
+    def parse_lines(self, lines: list) -> tuple:
+        '''
+        Public method that parses a block of lines column-at-a-time.
+        The lines are unpacked, then each column is converted in one
+        pass by the type of the column.
+        Returns a list with a named tuple per line, as for compile_parser(),
+        and a dictionary of the errors keyed by line index.
+        The entry for a line with an error is None.
+        '''
+        unpack = self.field_struct.unpack
+        errors = dict()
+        rows = []
+        for index, line in enumerate(lines):
+            try:
+                rows.append(unpack(line))
+            except struct_error as parsing_error:
+                # Drop the traceback, which would keep the lines, 
+                # possibly slices of a memory map, alive in a cycle.
+                errors[index] = parsing_error.with_traceback(None)
+        if errors:
+            row_indices = [index for index in range(len(lines)) if index not in errors]
+        else:
+            row_indices = range(len(lines))
+        return self._convert_rows(rows, row_indices, len(lines), errors)
+
+    def block_struct(self, stride: int) -> Struct:
+        '''
+        The struct for a line of the given stride, 
+        skipping the end-of-line bytes after the fields.
+        '''
+        block_struct = self._block_structs.get(stride)
+        if block_struct is None:
+            end_of_line_length = stride - self.field_struct.size
+            if end_of_line_length < 0:
+                raise ValueError(
+                    f"Stride: {stride} is shorter than the fields: {self.field_struct.size}")
+            block_struct = Struct(self.field_struct.format + '{}x'.format(end_of_line_length))
+            self._block_structs[stride] = block_struct
+        return block_struct
+
+    def parse_block(self, buffer, stride: int) -> tuple:
+        '''
+        Public method that parses a contiguous block of fixed-stride lines,
+        such as a slice of a memory mapped file.
+        The whole block is unpacked in one pass, then each column 
+        is converted in one pass by the type of the column.
+        The caller must check that every line has the stride.
+        Returns the records and errors, as for parse_lines().
+        '''
+        rows = list(self.block_struct(stride).iter_unpack(buffer))
+        return self._convert_rows(rows, range(len(rows)), len(rows), dict())
+
+    def _convert_rows(self, rows: list, row_indices, line_count: int, errors: dict) -> tuple:
+        field_names = self._field_names
+        columns = list(zip(*rows)) if rows else [()] * len(field_names)
+        converted_columns = []
+        for name, column in zip(field_names, columns):
+            converted, column_errors = self.field_types[name].convert_column(column)
+            converted_columns.append(converted)
+            for row_index, error in column_errors.items():
+                errors.setdefault(row_indices[row_index], error)
+
+        make_record = self._record_type()._make
+        records = [None] * line_count
+        for row_index, record in zip(row_indices, zip(*converted_columns)):
+            if row_index not in errors:
+                records[row_index] = make_record(record)
+        return records, errors
+
     def parse_line(self, line: bytes) -> dict:
         '''
         Public method that returns a dictionary of string values 
         keyed by column name, with values from the corresponding column.
         Just the selected column values are returned.
+        Retained for compatibility, see compile_parser().
         '''
-        parsed_fields = self.field_struct.unpack(line)
-        field_values = [bytes_value.decode() for bytes_value in parsed_fields]
-        field_values = [field_value.strip() for field_value in field_values]
-        field_keys = self.selected_fields        
-        return dict(zip(field_keys, field_values))
+        return dict(zip(
+            self._selected_headings(), 
+            self.compile_parser(dict.fromkeys(self.selected_fields, TEXT.convert))(line)))
 
@@ -0,0 +1,59 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+from datetime import date, datetime
+from functools import lru_cache
+
+# Special value signifying that there is no known begin date.
+UNKNOWN_START_DATE = '00010101'
+UNKNOWN_START_ORDINAL = date(1, 1, 1).toordinal()
+
+# Special value signifying that the location is currently operational.
+STILL_OPEN_DATE = '99991231'
+STILL_OPEN_ORDINAL = date(9999, 12, 31).toordinal()
+
+# Dates may be given as strings or as the raw bytes from the file.
+SENTINEL_ORDINALS = {
+    UNKNOWN_START_DATE: UNKNOWN_START_ORDINAL,
+    STILL_OPEN_DATE: STILL_OPEN_ORDINAL,
+    UNKNOWN_START_DATE.encode(): UNKNOWN_START_ORDINAL,
+    STILL_OPEN_DATE.encode(): STILL_OPEN_ORDINAL
+}
+
+# The dates in an EMSHR file come from a small set of distinct values,
+# so a bounded memo table catches nearly all of them.
+MEMO_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _decode_date(date_str: str) -> int:
+    if len(date_str) != 8 or not date_str.isdigit():
+        raise ValueError(f"Date: {date_str} does not match format YYYYMMDD")
+    year = int(date_str[0:4])
+    month = int(date_str[4:6])
+    day = int(date_str[6:8])
+    return date(year, month, day).toordinal()
+
+
+def date_ordinal(date_str: str) -> int:
+    '''
+    Convert a YYYYMMDD date string, or bytes, to a proleptic 
+    Gregorian day ordinal, as for date.toordinal().
+    Raises a ValueError for a malformed or impossible date,
+    as datetime.strptime() does.
+    '''
+    ordinal = SENTINEL_ORDINALS.get(date_str)
+    if ordinal is None:
+        ordinal = _decode_date(date_str)
+    return ordinal
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def ordinal_datetime(ordinal: int) -> datetime:
+    '''
+    Convert a day ordinal back to a datetime at midnight.
+    '''
+    return datetime.fromordinal(ordinal)
@@ -0,0 +1,196 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+from datetime import date
+
+import numpy as np
+
+from library.station_table import StationTable
+from library.date_ordinals import UNKNOWN_START_ORDINAL
+
+
+class DuplicateCluster(object):
+    '''
+    A value object to record a group of stations
+    that are candidates for being the same physical site,
+    with the overlap score of each linked pair of stations.
+    '''
+
+    def __init__(self, station_indices: list, ncdcs: list, pairs: list):
+        '''
+        Constructor
+        The pairs are (ncdc, ncdc, overlap score) triples.
+        '''
+        self.station_indices = station_indices
+        self.ncdcs = ncdcs
+        self.pairs = pairs
+
+    def __repr__(self):
+        return 'NCDCs: ' + ', '.join(str(ncdc) for ncdc in self.ncdcs) \
+            + ', Score: ' + '{:.3f}'.format(self.score())
+
+    def station_count(self) -> int:
+        return len(self.station_indices)
+
+    def score(self) -> float:
+        return max(score for _, _, score in self.pairs)
+
+
+class DuplicateDetector(object):
+    '''
+    Detect stations with distinct NCDC ids that describe the same site,
+    with locations at nearly the same coordinates over overlapping periods.
+
+    The coordinates are hashed into cells by rounding them to the tolerance,
+    by default to 4 decimal places. Locations in the same cell or in
+    neighbouring cells are near, which allows for coordinates that were
+    rounded differently, so only those locations are compared.
+    The overlap score of two locations is the share of the shorter
+    period that both are active. Still open periods end today
+    and periods with an unknown start date are taken to begin
+    on their end date.
+    '''
+
+    # Half of the neighbouring cells, so each pair of cells is met once.
+    NEIGHBOUR_OFFSETS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+    def __init__(self, tolerance_degrees: float=0.0001, min_overlap: float=0.0):
+        '''
+        Constructor
+        The tolerance is the size of a cell in degrees.
+        Stations are linked when the overlap score
+        of a pair of their locations is more than the minimum.
+        '''
+        self.tolerance_degrees = tolerance_degrees
+        self.min_overlap = min_overlap
+
+    def _cell_keys(self, latitudes: np.ndarray, longitudes: np.ndarray) -> tuple:
+        '''
+        The located points and the key of the cell of each,
+        with the number of columns of cells.
+        '''
+        tolerance = self.tolerance_degrees
+        located = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+        column_count = int(np.rint(360.0 / tolerance))
+        rows = np.rint(latitudes[located] / tolerance).astype(np.int64)
+        columns = np.rint((longitudes[located] + 180.0) / tolerance).astype(np.int64) % column_count
+        return located, rows * column_count + columns, column_count
+
+    def _neighbour_pairs(self, keys: np.ndarray, column_count: int) -> tuple:
+        '''
+        The pairs of positions in the sorted cell keys
+        that are in the same or neighbouring cells.
+        '''
+        cell_keys, cell_starts, cell_sizes = np.unique(
+            keys, return_index=True, return_counts=True)
+        cell_rows, cell_columns = np.divmod(cell_keys, column_count)
+
+        firsts = []
+        seconds = []
+        for row_offset, column_offset in DuplicateDetector.NEIGHBOUR_OFFSETS:
+            neighbour_keys = (cell_rows + row_offset) * column_count \
+                + (cell_columns + column_offset) % column_count
+            positions = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+            found = cell_keys[positions] == neighbour_keys
+            cells = np.flatnonzero(found)
+            neighbours = positions[found]
+            # Every member of a cell with every member of its neighbour.
+            first_sizes = cell_sizes[cells]
+            second_sizes = cell_sizes[neighbours]
+            block_sizes = first_sizes * second_sizes
+            blocks = np.repeat(np.arange(len(cells)), block_sizes)
+            within = np.arange(block_sizes.sum()) - np.repeat(np.cumsum(block_sizes) - block_sizes, block_sizes)
+            first = cell_starts[cells][blocks] + within // second_sizes[blocks]
+            second = cell_starts[neighbours][blocks] + within % second_sizes[blocks]
+            if row_offset == 0 and column_offset == 0:
+                distinct = first < second
+                first = first[distinct]
+                second = second[distinct]
+            firsts.append(first)
+            seconds.append(second)
+        return np.concatenate(firsts), np.concatenate(seconds)
+
+    def candidate_pairs(self, store: StationTable) -> tuple:
+        '''
+        The pairs of stations with near locations
+        over overlapping periods, and the largest overlap score
+        of each pair, as arrays of the first station, the second station
+        and the score, ordered by station.
+        '''
+        located, keys, column_count = self._cell_keys(store.latitudes, store.longitudes)
+        stations = store.location_stations()[located]
+        ends = np.minimum(store.end_ordinals[located], date.today().toordinal()).astype(np.int64)
+        starts = store.start_ordinals[located].astype(np.int64)
+        starts = np.where(starts == UNKNOWN_START_ORDINAL, ends, starts)
+
+        # The span of the locations of each station in each cell,
+        # as a station is often listed many times at one site.
+        order = np.lexsort((stations, keys))
+        keys = keys[order]
+        stations = stations[order]
+        span_firsts = np.flatnonzero(np.concatenate((
+            [True], (keys[1:] != keys[:-1]) | (stations[1:] != stations[:-1]))))[0:len(keys)]
+        span_starts = np.minimum.reduceat(starts[order], span_firsts) if len(keys) > 0 else starts
+        span_ends = np.maximum.reduceat(ends[order], span_firsts) if len(keys) > 0 else ends
+        keys = keys[span_firsts]
+        stations = stations[span_firsts]
+
+        firsts, seconds = self._neighbour_pairs(keys, column_count)
+        distinct = stations[firsts] != stations[seconds]
+        firsts = firsts[distinct]
+        seconds = seconds[distinct]
+        overlaps = np.minimum(span_ends[firsts], span_ends[seconds]) \
+            - np.maximum(span_starts[firsts], span_starts[seconds]) + 1
+        shorter = np.minimum(
+            span_ends[firsts] - span_starts[firsts], span_ends[seconds] - span_starts[seconds]) + 1
+        scores = np.maximum(overlaps, 0) / np.maximum(shorter, 1)
+        linked = scores > self.min_overlap
+
+        low = np.minimum(stations[firsts], stations[seconds])[linked]
+        high = np.maximum(stations[firsts], stations[seconds])[linked]
+        scores = scores[linked]
+        # The best score of each pair of stations.
+        order = np.lexsort((-scores, high, low))
+        low = low[order]
+        high = high[order]
+        scores = scores[order]
+        first_pairs = np.ones(len(low), dtype=bool)
+        first_pairs[1:] = (low[1:] != low[:-1]) | (high[1:] != high[:-1])
+        return low[first_pairs], high[first_pairs], scores[first_pairs]
+
+    def clusters(self, store: StationTable) -> list:
+        '''
+        Public method that returns the clusters of linked stations,
+        the best scoring first.
+        '''
+        lows, highs, scores = self.candidate_pairs(store)
+        parents = dict()
+
+        def root(station):
+            while parents.setdefault(station, station) != station:
+                parents[station] = parents[parents[station]]
+                station = parents[station]
+            return station
+
+        for low, high in zip(lows.tolist(), highs.tolist()):
+            parents[root(high)] = root(low)
+
+        members = dict()
+        pairs = dict()
+        for low, high, score in zip(lows.tolist(), highs.tolist(), scores.tolist()):
+            cluster = root(low)
+            members.setdefault(cluster, set()).update((low, high))
+            pairs.setdefault(cluster, []).append(
+                (int(store.ncdcs[low]), int(store.ncdcs[high]), score))
+        clusters = []
+        for cluster, station_indices in members.items():
+            station_indices = sorted(station_indices)
+            clusters.append(DuplicateCluster(
+                station_indices,
+                [int(store.ncdcs[index]) for index in station_indices],
+                pairs[cluster]))
+        clusters.sort(key=lambda cluster: (-cluster.score(), cluster.ncdcs))
+        return clusters
@@ -9,4 +9,11 @@ class InvalidPeriodsError(Exception):
     classdocs
     '''
     pass
-        
\ No newline at end of file
+        
+
+class LayoutDriftError(Exception):
+    '''
+    The header lines of an EMSHR Lite file do not
+    have the columns needed to parse its lines.
+    '''
+    pass
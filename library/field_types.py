@@ -0,0 +1,94 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import sys
+from collections import namedtuple
+
+from library.date_ordinals import date_ordinal
+
+# A selected column, by heading name, with the type of its values.
+ColumnField = namedtuple('ColumnField', ['name', 'field_type'])
+
+
+class FieldType(object):
+    '''
+    The type of the values in a column of an EMSHR Lite file,
+    given by a function converting the raw field bytes,
+    including the padding byte, to a value.
+    '''
+
+    def __init__(self, name: str, convert):
+        '''
+        Constructor
+        '''
+        self.name = name
+        self.convert = convert
+
+    def __repr__(self):
+        return 'FieldType: ' + self.name
+
+    def convert_column(self, values) -> tuple:
+        '''
+        Convert a column of raw field bytes.
+        Each distinct value is converted once, as the values
+        of a column repeat heavily within the lines of a station.
+        Returns the list of converted values and a dictionary
+        of the conversion errors keyed by row index.
+        The converted value of a failed row is None.
+        '''
+        conversions = dict()
+        failures = dict()
+        for value in values:
+            if value not in conversions:
+                try:
+                    conversions[value] = self.convert(value)
+                except ValueError as value_error:
+                    conversions[value] = None
+                    failures[value] = value_error.with_traceback(None)
+        converted = [conversions[value] for value in values]
+        errors = dict()
+        if failures:
+            for index, value in enumerate(values):
+                if value in failures:
+                    errors[index] = failures[value]
+        return converted, errors
+
+
+def _text(value: bytes) -> str:
+    return value.decode().strip()
+
+
+def _interned_string(value: bytes) -> str:
+    return sys.intern(value.decode().strip())
+
+
+def _yyyymmdd_date(value: bytes) -> int:
+    return date_ordinal(value.strip())
+
+
+def _decimal_degree(value: bytes) -> float:
+    # High altitude balloon records have empty coordinates.
+    return float(value) if not value.isspace() else None
+
+
+def _comma_list(value: bytes) -> tuple:
+    # A tuple, as the converted values are shared between rows.
+    text = value.decode().strip()
+    return tuple(text.split(',')) if text else ()
+
+
+# Stripped string, the default type.
+TEXT = FieldType('text', _text)
+# Integer identifier such as the NCDC.
+INT_ID = FieldType('int id', int)
+# YYYYMMDD date as a day ordinal.
+YYYYMMDD_DATE = FieldType('yyyymmdd date', _yyyymmdd_date)
+# Decimal degrees, or None if empty.
+DECIMAL_DEGREE = FieldType('decimal degree', _decimal_degree)
+# Comma separated list as a tuple of stripped strings.
+COMMA_LIST = FieldType('comma list', _comma_list)
+# Stripped string drawn from a small set, such as a country code.
+INTERNED_STRING = FieldType('interned string', _interned_string)
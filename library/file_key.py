@@ -0,0 +1,86 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import hashlib
+import os
+from struct import Struct
+
+# Input file size, modification time and SHA-256 digest.
+KEY_STRUCT = Struct('<Qq32s')
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_hash(file_path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as data_file:
+        for chunk in iter(lambda: data_file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def file_key(file_path: str, known_hash: bytes=None) -> tuple:
+    '''
+    The key of a derived file, such as a snapshot or an index,
+    to be compared against its input file later.
+    '''
+    file_stat = os.stat(file_path)
+    known_hash = known_hash if known_hash is not None else file_hash(file_path)
+    return file_stat.st_size, file_stat.st_mtime_ns, known_hash
+
+
+def is_current_key(file_path: str, key: tuple, key_path: str=None, key_offset: int=0) -> bool:
+    '''
+    The key is current if the input file has the same size
+    and either the same modification time or the same content hash.
+    When only the hash matches, as after a touch or a copy,
+    the key stored at the offset in the derived file is rewritten
+    with the new modification time, so later checks need no hash.
+    '''
+    if key is None:
+        return False
+    size, mtime_ns, known_hash = key
+    file_stat = os.stat(file_path)
+    if size != file_stat.st_size:
+        return False
+    if mtime_ns == file_stat.st_mtime_ns:
+        return True
+    if known_hash != file_hash(file_path):
+        return False
+    if key_path is not None:
+        rewrite_key(key_path, key_offset, (size, file_stat.st_mtime_ns, known_hash))
+    return True
+
+
+def rewrite_key(key_path: str, key_offset: int, key: tuple):
+    '''
+    Rewrite the key of a derived file in place.
+    A derived file that cannot be written keeps its old key.
+    '''
+    try:
+        with open(key_path, 'r+b') as key_file:
+            key_file.seek(key_offset)
+            key_file.write(KEY_STRUCT.pack(*key))
+    except OSError:
+        pass
+
+
+def read_key(key_file, magic: bytes) -> tuple:
+    '''
+    Read the magic bytes and key at the start of a derived file.
+    Returns None if either is missing.
+    '''
+    if key_file.read(len(magic)) != magic:
+        return None
+    key_bytes = key_file.read(KEY_STRUCT.size)
+    if len(key_bytes) != KEY_STRUCT.size:
+        return None
+    return KEY_STRUCT.unpack(key_bytes)
+
+
+def write_key(key_file, magic: bytes, key: tuple):
+    key_file.write(magic)
+    key_file.write(KEY_STRUCT.pack(*key))
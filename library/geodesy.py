@@ -0,0 +1,53 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+# The mean radius of the Earth.
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    '''
+    The points on the unit sphere of decimal degree coordinates,
+    as an array with one row of x, y and z per coordinate.
+    '''
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_latitudes = np.cos(latitudes)
+    return np.stack((
+        cos_latitudes * np.cos(longitudes),
+        cos_latitudes * np.sin(longitudes),
+        np.sin(latitudes)), axis=-1)
+
+
+def chord_to_km(chords):
+    '''
+    The great circle distance of a chord of the unit sphere.
+    '''
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chords) / 2.0, 1.0))
+
+
+def km_to_chord(distances):
+    '''
+    The chord of the unit sphere of a great circle distance.
+    '''
+    return 2.0 * np.sin(np.minimum(np.asarray(distances) / (2.0 * EARTH_RADIUS_KM), np.pi / 2))
+
+
+def haversine_km(latitudes0, longitudes0, latitudes1, longitudes1):
+    '''
+    The great circle distances in km between pairs of
+    decimal degree coordinates, by the haversine formula.
+    NaN coordinates give NaN distances.
+    '''
+    latitudes0 = np.radians(latitudes0)
+    latitudes1 = np.radians(latitudes1)
+    half_latitudes = (latitudes1 - latitudes0) / 2.0
+    half_longitudes = np.radians(np.asarray(longitudes1) - np.asarray(longitudes0)) / 2.0
+    haversines = np.sin(half_latitudes) ** 2 \
+        + np.cos(latitudes0) * np.cos(latitudes1) * np.sin(half_longitudes) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(haversines, 1.0)))
@@ -0,0 +1,61 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import re
+
+
+class GremlinRepair(object):
+    '''
+    Replaces annoying non-ASCII byte sequences in a line
+    with plain ASCII characters.
+
+    The sequences are encoded characters whose expansion
+    messes with the fixed column widths, leading to bad
+    parsing of fields. So each replacement is padded with spaces
+    at the end of the line to restore the original width.
+
+    The default table relates to particular issues in particular files.
+    '''
+
+    GREMLINS = {
+        # Quebec, Montreal, Prevost (French Canadian)
+        # have double encoded E-acute characters.
+        b'\xc3\x83\xc2\xa9': b'E',
+        # Espanola (Spanish) has double encoded N-tilde character.
+        b'\xc3\x83\xc2\xb1': b'N',
+        # Barrow (USA) has encoded G-dot characters.
+        b'\xc4\xa0': b'G',
+    }
+
+    def __init__(self, gremlins: dict=GREMLINS):
+        '''
+        Constructor
+        The table of byte sequences and their replacements
+        is compiled into a single pattern for use
+        by the public repair method.
+        '''
+        for gremlin, replacement in gremlins.items():
+            if len(replacement) > len(gremlin):
+                raise ValueError(
+                    f"Replacement {replacement} is longer than gremlin {gremlin}.")
+        self.gremlins = dict(gremlins)
+        # Longest sequences first so no gremlin is split by a shorter one.
+        alternatives = sorted(self.gremlins, key=len, reverse=True)
+        self.pattern = re.compile(b'|'.join(re.escape(gremlin) for gremlin in alternatives))
+
+    def _replacement(self, match) -> bytes:
+        return self.gremlins[match.group()]
+
+    def repair(self, line: bytes) -> bytes:
+        '''
+        Public method that returns the line with every gremlin replaced
+        and with trailing spaces for the deleted bytes.
+        Lines that are pure ASCII are returned unchanged.
+        '''
+        if line.isascii() or not self.gremlins:
+            return line
+        repaired_line = self.pattern.sub(self._replacement, line)
+        return repaired_line + b' ' * (len(line) - len(repaired_line))
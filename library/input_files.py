@@ -0,0 +1,50 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import bz2
+import gzip
+import io
+import lzma
+
+# NOAA distributes the metadata files in compressed form,
+# and monthly snapshots are kept compressed to save disk.
+DECOMPRESSORS = {
+    '.gz': gzip.GzipFile,
+    '.bz2': bz2.BZ2File,
+    '.xz': lzma.LZMAFile
+}
+
+# Decompressed data is read in large blocks so
+# line iteration stays close to the plain-text speed.
+BUFFER_SIZE = 1 << 20
+
+
+def compression_suffix(file_path: str) -> str:
+    '''
+    The compression suffix of the file name,
+    or None for an uncompressed file.
+    '''
+    for suffix in DECOMPRESSORS:
+        if str(file_path).endswith(suffix):
+            return suffix
+    return None
+
+
+def is_compressed(file_path: str) -> bool:
+    return compression_suffix(file_path) is not None
+
+
+def open_input(file_path: str, buffer_size: int=BUFFER_SIZE):
+    '''
+    Open an input file for reading as bytes.
+    Compressed files are decompressed as a stream,
+    so no uncompressed copy is made.
+    '''
+    suffix = compression_suffix(file_path)
+    if suffix is None:
+        return open(file_path, 'rb')
+    decompressor = DECOMPRESSORS[suffix](file_path, 'rb')
+    return io.BufferedReader(decompressor, buffer_size=buffer_size)
@@ -0,0 +1,66 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+
+class IntervalIndex(object):
+    '''
+    An index of closed intervals, such as the location periods
+    of a station store as day ordinals, answering point-in-time
+    and range-overlap queries.
+
+    The interval indices are held sorted by start and sorted by end.
+    Counts take two binary searches.
+    The intervals found by a query are taken from the smaller of the
+    intervals starting before the range end and the intervals ending
+    after the range begin, so only those candidates are checked.
+    '''
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        '''
+        Constructor
+        '''
+        self.by_start = np.argsort(starts, kind='stable')
+        self.sorted_starts = starts[self.by_start]
+        self.by_end = np.argsort(ends, kind='stable')
+        self.sorted_ends = ends[self.by_end]
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def count_overlapping(self, begin: int, end: int) -> int:
+        '''
+        The number of intervals overlapping the range from begin to end.
+        '''
+        # Every interval ending before the range begin
+        # also starts before the range end.
+        started = np.searchsorted(self.sorted_starts, end, side='right')
+        ended = np.searchsorted(self.sorted_ends, begin, side='left')
+        return int(max(started - ended, 0))
+
+    def count_active(self, point: int) -> int:
+        return self.count_overlapping(point, point)
+
+    def overlapping(self, begin: int, end: int) -> np.ndarray:
+        '''
+        The indices, in ascending order, of the intervals
+        overlapping the range from begin to end.
+        '''
+        started = np.searchsorted(self.sorted_starts, end, side='right')
+        ended = np.searchsorted(self.sorted_ends, begin, side='left')
+        if started <= len(self) - ended:
+            candidates = self.by_start[0:started]
+            found = candidates[self.ends[candidates] >= begin]
+        else:
+            candidates = self.by_end[ended:]
+            found = candidates[self.starts[candidates] <= end]
+        return np.sort(found)
+
+    def active(self, point: int) -> np.ndarray:
+        return self.overlapping(point, point)
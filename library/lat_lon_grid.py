@@ -0,0 +1,108 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+
+class LatLonGrid(object):
+    '''
+    A grid of equal angle latitude/longitude cells,
+    as for gridded temperature products, such as 5° x 5°.
+
+    Cells are numbered by row from the south pole,
+    then by column from the antimeridian eastwards.
+    A latitude of 90 falls in the top row
+    and a longitude of 180 in the first column.
+    '''
+
+    def __init__(self, cell_degrees: float=5.0):
+        '''
+        Constructor
+        The cell size must divide 180 degrees.
+        '''
+        row_count = 180.0 / cell_degrees
+        if cell_degrees <= 0 or row_count != round(row_count):
+            raise ValueError(f"Cell size: {cell_degrees} does not divide 180 degrees.")
+        self.cell_degrees = cell_degrees
+        self.row_count = int(round(row_count))
+        self.column_count = 2 * self.row_count
+
+    def cell_count(self) -> int:
+        return self.row_count * self.column_count
+
+    def cell_indices(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        '''
+        The cell of each coordinate, or -1 if there is no coordinate.
+        '''
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        located = ~(np.isnan(latitudes) | np.isnan(longitudes))
+        rows = np.floor((np.where(located, latitudes, 0.0) + 90.0) / self.cell_degrees)
+        rows = np.clip(rows.astype(np.int64), 0, self.row_count - 1)
+        columns = np.floor((np.where(located, longitudes, 0.0) + 180.0) / self.cell_degrees)
+        columns = columns.astype(np.int64) % self.column_count
+        return np.where(located, rows * self.column_count + columns, -1)
+
+    def cell_centres(self) -> tuple:
+        '''
+        The latitude and longitude of the centre of every cell.
+        '''
+        cells = np.arange(self.cell_count())
+        rows, columns = np.divmod(cells, self.column_count)
+        latitudes = -90.0 + (rows + 0.5) * self.cell_degrees
+        longitudes = -180.0 + (columns + 0.5) * self.cell_degrees
+        return latitudes, longitudes
+
+    def area_weights(self) -> np.ndarray:
+        '''
+        The weight of every cell, cos(latitude) of its centre,
+        proportional to its area.
+        '''
+        latitudes, _ = self.cell_centres()
+        return np.cos(np.radians(latitudes))
+
+
+class GridOccupancy(object):
+    '''
+    The number of active stations in each cell of a grid in each year,
+    as a dense array of cells by years.
+    A station that moves within a year counts in each cell it occupied.
+    '''
+
+    def __init__(self, grid: LatLonGrid, years: np.ndarray, counts: np.ndarray):
+        '''
+        Constructor
+        '''
+        self.grid = grid
+        self.years = years
+        self.counts = counts
+
+    def year_counts(self, year: int) -> np.ndarray:
+        '''
+        The number of active stations in each cell in the year.
+        '''
+        return self.counts[:, year - self.years[0]]
+
+    def occupied_cell_counts(self) -> np.ndarray:
+        '''
+        The number of cells with an active station in each year.
+        '''
+        return np.count_nonzero(self.counts, axis=0)
+
+    def weighted_coverage(self) -> np.ndarray:
+        '''
+        The area weighted fraction of the globe in cells
+        with an active station, in each year.
+        '''
+        weights = self.grid.area_weights()
+        return weights @ (self.counts > 0) / weights.sum()
+
+    def weighted_counts(self) -> np.ndarray:
+        '''
+        The area weighted number of active stations in each year,
+        which counts stations in the high latitude cells for less.
+        '''
+        return self.grid.area_weights() @ self.counts
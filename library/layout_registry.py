@@ -0,0 +1,130 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import hashlib
+import logging
+
+from library.column_layout import ColumnLayout
+
+
+class LayoutRegistry(object):
+    '''
+    A registry of the column layouts of EMSHR Lite files,
+    keyed by a hash of the headings and separator lines
+    and by the selected fields.
+
+    Successive NOAA snapshots usually share the same header lines,
+    so a layout, with its compiled parsers and block structs,
+    is built once and reused for every file with that header.
+    The module level registry is shared by all loaders in a process,
+    including the worker processes of a parallel load, 
+    which each build a layout once for all of their chunks.
+
+    Each new header is compared with the reference layout,
+    by default the layout given by the ColumnLayout defaults,
+    and any drift, such as a new column or a changed width, 
+    is reported once per header.
+    A selected field missing from the header 
+    raises a LayoutDriftError when a line is parsed.
+    '''
+
+    def __init__(self, reference: ColumnLayout=None):
+        '''
+        Constructor
+        '''
+        self.reference = reference if reference is not None else ColumnLayout([])
+        self._layouts = dict()
+        self._drifts = dict()
+
+    def signature(self, heading_line: str, separator_line: str) -> str:
+        '''
+        The hash of the two header lines, which identifies the layout.
+        '''
+        digest = hashlib.sha256()
+        digest.update(heading_line.encode('utf-8'))
+        digest.update(b'\n')
+        digest.update(separator_line.encode('utf-8'))
+        return digest.hexdigest()
+
+    def layout(
+            self, 
+            selected_fields: list, 
+            heading_line: str=ColumnLayout.COLUMN_HEADINGS, 
+            separator_line: str=ColumnLayout.COLUMN_UNDERLINES) -> ColumnLayout:
+        '''
+        Public method that returns the column layout 
+        for the header lines and selected fields, 
+        building it on first use.
+        '''
+        signature = self.signature(heading_line, separator_line)
+        key = (signature, tuple(selected_fields))
+        column_layout = self._layouts.get(key)
+        if column_layout is not None:
+            return column_layout
+
+        column_layout = ColumnLayout(selected_fields, heading_line, separator_line)
+        if signature not in self._drifts:
+            self._drifts[signature] = self.drift(column_layout)
+            self.report(signature, self._drifts[signature])
+        missing_fields = column_layout.missing_fields()
+        if missing_fields:
+            logger = logging.getLogger(__name__)
+            logger.error(
+                f"Layout: {signature[0:12]}, \n"
+                f"is missing the selected columns: {', '.join(missing_fields)}\n")
+        self._layouts[key] = column_layout
+        return column_layout
+
+    def drift(self, column_layout: ColumnLayout) -> list:
+        '''
+        Public method that returns a description of each difference
+        between the columns of the layout and the reference layout.
+        An empty list means the layouts match.
+        '''
+        reference_columns = dict(
+            (heading, (offset, width)) for heading, offset, width in self.reference.columns())
+        columns = dict(
+            (heading, (offset, width)) for heading, offset, width in column_layout.columns())
+        differences = []
+        for heading in reference_columns:
+            if heading not in columns:
+                differences.append(f"Removed column: {heading}")
+        for heading, (offset, width) in columns.items():
+            if heading not in reference_columns:
+                differences.append(f"Added column: {heading} at offset: {offset}")
+                continue
+            reference_offset, reference_width = reference_columns[heading]
+            if width != reference_width:
+                differences.append(
+                    f"Changed width of column: {heading} from: {reference_width} to: {width}")
+            elif offset != reference_offset:
+                differences.append(
+                    f"Moved column: {heading} from offset: {reference_offset} to: {offset}")
+        return differences
+
+    def drifts(self) -> dict:
+        '''
+        The differences from the reference layout keyed by 
+        the signature of each header seen so far.
+        '''
+        return dict(self._drifts)
+
+    def report(self, signature: str, differences: list):
+        if not differences:
+            return
+        logger = logging.getLogger(__name__)
+        logger.warning(
+            f"Layout: {signature[0:12]}, \n"
+            f"differs from the reference layout: \n" 
+            + ''.join(f"    {difference}\n" for difference in differences))
+
+    def clear(self):
+        self._layouts.clear()
+        self._drifts.clear()
+
+
+# Shared by all of the loaders in a process.
+LAYOUT_REGISTRY = LayoutRegistry()
@@ -0,0 +1,151 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import re
+
+from library.column_layout import ColumnLayout
+from library.date_ordinals import date_ordinal
+
+
+class LineFilter(object):
+    '''
+    Load-time filters for the lines of an EMSHR Lite file.
+
+    Each filter checks the fixed-width bytes of its column,
+    so rejected lines are skipped before any decoding
+    or object construction.
+    The filters apply to lines, that is to station locations.
+    A station with no accepted locations is not loaded.
+
+    Filters:
+        country_codes: CC is one of these.
+        networks: TYPE includes one of these.
+            <UNKNOWN> matches an empty TYPE, as for the loader.
+        bounding_box: (min_latitude, min_longitude, max_latitude, max_longitude)
+            in decimal degrees. The longitudes may wrap around
+            the antimeridian. Lines without coordinates are rejected.
+        date_range: (begin, end) as YYYYMMDD strings.
+            The location period overlaps this range.
+    '''
+
+    UNKNOWN_NETWORK = '<UNKNOWN>'
+
+    def __init__(
+            self,
+            country_codes: list=None,
+            networks: list=None,
+            bounding_box: tuple=None,
+            date_range: tuple=None):
+        '''
+        Constructor
+        '''
+        self.country_codes = country_codes
+        self.networks = networks
+        self.bounding_box = bounding_box
+        if date_range is not None:
+            # Raises a ValueError if either date is malformed.
+            date_ordinal(date_range[0])
+            date_ordinal(date_range[1])
+        self.date_range = date_range
+
+    def is_active(self) -> bool:
+        return any(criterion is not None for criterion in (
+            self.country_codes, self.networks, self.bounding_box, self.date_range))
+
+    def _country_check(self, spans: dict):
+        offset, width = spans['CC']
+        end = offset + width
+        # The field includes its leading padding byte.
+        padded_codes = set(
+            b' ' + country_code.encode().ljust(width - 1)
+            for country_code in self.country_codes)
+
+        def accepts(line) -> bool:
+            return line[offset:end] in padded_codes
+        return accepts
+
+    def _network_check(self, spans: dict):
+        offset, width = spans['TYPE']
+        end = offset + width
+        names = [network for network in self.networks if network != LineFilter.UNKNOWN_NETWORK]
+        # A name is preceded by the padding byte or a comma,
+        # and followed by a comma, trailing spaces or the field end.
+        pattern = re.compile(
+            b'[ ,](?:' + b'|'.join(re.escape(name.encode()) for name in names) + b')(?=[ ,]|$)') \
+            if names else None
+        empty_field = b' ' * width if LineFilter.UNKNOWN_NETWORK in self.networks else None
+
+        def accepts(line) -> bool:
+            if pattern is not None and pattern.search(line, offset, end):
+                return True
+            return empty_field is not None and line[offset:end] == empty_field
+        return accepts
+
+    def _bounding_box_check(self, spans: dict):
+        latitude_offset, latitude_width = spans['LAT_DEC']
+        latitude_end = latitude_offset + latitude_width
+        longitude_offset, longitude_width = spans['LON_DEC']
+        longitude_end = longitude_offset + longitude_width
+        min_latitude, min_longitude, max_latitude, max_longitude = self.bounding_box
+        wraps = min_longitude > max_longitude
+
+        def accepts(line) -> bool:
+            try:
+                latitude = float(bytes(line[latitude_offset:latitude_end]))
+                longitude = float(bytes(line[longitude_offset:longitude_end]))
+            except ValueError:
+                return False
+            if not min_latitude <= latitude <= max_latitude:
+                return False
+            if wraps:
+                return longitude >= min_longitude or longitude <= max_longitude
+            return min_longitude <= longitude <= max_longitude
+        return accepts
+
+    def _date_range_check(self, spans: dict):
+        # Skip the padding byte, leaving YYYYMMDD,
+        # which orders in the same way as the dates.
+        begin_offset, begin_width = spans['BEG_DT']
+        begin_offset, begin_end = begin_offset + 1, begin_offset + begin_width
+        end_offset, end_width = spans['END_DT']
+        end_offset, end_end = end_offset + 1, end_offset + end_width
+        range_begin = self.date_range[0].encode()
+        range_end = self.date_range[1].encode()
+
+        def accepts(line) -> bool:
+            begin = bytes(line[begin_offset:begin_end])
+            end = bytes(line[end_offset:end_end])
+            # Some Colorado dates are inverted in time.
+            if end < begin:
+                begin, end = end, begin
+            return begin <= range_end and end >= range_begin
+        return accepts
+
+    def compile(self, column_layout: ColumnLayout):
+        '''
+        Public method that returns a function of a line,
+        true if the line passes every active filter.
+        Returns None if no filter is active.
+        '''
+        spans = column_layout.field_spans()
+        checks = []
+        if self.country_codes is not None:
+            checks.append(self._country_check(spans))
+        if self.networks is not None:
+            checks.append(self._network_check(spans))
+        if self.bounding_box is not None:
+            checks.append(self._bounding_box_check(spans))
+        if self.date_range is not None:
+            checks.append(self._date_range_check(spans))
+        if not checks:
+            return None
+
+        def accepts(line) -> bool:
+            for check in checks:
+                if not check(line):
+                    return False
+            return True
+        return accepts
@@ -5,15 +5,24 @@ Created on 23 Jun. 2021
 '''
 
 import logging
-from datetime import datetime
-from datetimerange import DateTimeRange 
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
 from struct import error as struct_error
 
 from library.configuration import Configuration
 from library.column_layout import ColumnLayout
+from library.layout_registry import LAYOUT_REGISTRY
+from library.gremlin_repair import GremlinRepair
+from library.station_cache import StationCache, settings_digest
+from library.station_index import StationIndex
+from library.input_files import open_input, is_compressed
+from library.line_filter import LineFilter
 from library.station_metadata import StationMetadata
-from library.station_location import StationLocation
-from library.misc_types import spherical_coordinate
+from library.station_location import CompactStationLocation
+from library.date_ordinals import date_ordinal
+from library.field_types import ColumnField, INT_ID, YYYYMMDD_DATE, TEXT, \
+    INTERNED_STRING, DECIMAL_DEGREE, COMMA_LIST
 
 
 class LoadEMSHRLite(object):
@@ -27,15 +36,63 @@ class LoadEMSHRLite(object):
     """
     
     SELECTED_FIELDS = [
-        'NCDC', 'BEG_DT', 'END_DT', 'STATION_NAME', 'CC', 'LAT_DEC', 'LON_DEC', 'TYPE'
+        ColumnField('NCDC', INT_ID), 
+        ColumnField('BEG_DT', YYYYMMDD_DATE), 
+        ColumnField('END_DT', YYYYMMDD_DATE), 
+        ColumnField('STATION_NAME', TEXT), 
+        ColumnField('CC', INTERNED_STRING), 
+        ColumnField('LAT_DEC', DECIMAL_DEGREE), 
+        ColumnField('LON_DEC', DECIMAL_DEGREE), 
+        ColumnField('TYPE', COMMA_LIST)
     ]
 
+    # Networks of a location with an empty TYPE.
+    UNKNOWN_NETWORKS = ('<UNKNOWN>',)
 
-    def __init__(self, config: Configuration):
+    # Lines converted column-at-a-time in each block.
+    BLOCK_LINE_COUNT = 4096
+
+    # Bytes read at a time by the block reader.
+    READ_SIZE = 1 << 22
+
+    def __init__(
+            self, 
+            config: Configuration, 
+            memory_mapped: bool=False,
+            workers: int=1,
+            gremlins: dict=GremlinRepair.GREMLINS,
+            cached: bool=False,
+            refresh_cache: bool=False,
+            line_filter: LineFilter=None,
+            block_parsed: bool=True):
         """
         Create the EMSHR lite file loader.
+        When memory_mapped is set load() reads the file 
+        through a memory map rather than line by line.
+        When there is more than one worker load() parses
+        the file in that many processes.
+        The gremlins table maps non-ASCII byte sequences
+        to their ASCII replacements.
+        When cached is set a binary snapshot of the parsed file
+        is kept beside it and used while the file is unchanged.
+        Set refresh_cache to force a re-parse.
+        The line filter rejects lines before they are parsed.
+        The snapshot is not used while a filter is active.
+        When block_parsed is set the file is read in large blocks
+        and each run of clean fixed-stride lines is unpacked in one pass,
+        otherwise the file is read and parsed line by line.
         """
         self.file_path = config.input_file_path
+        self.memory_mapped = memory_mapped
+        self.workers = workers
+        self.gremlin_repair = GremlinRepair(gremlins)
+        self.cached = cached
+        self.refresh_cache = refresh_cache
+        self.line_filter = line_filter if line_filter is not None else LineFilter()
+        self.block_parsed = block_parsed
+        self._station_index = None
+        self._parsed_layout = None
+        self._line_parser = None
 
     def make_location(self, fields):
         '''
@@ -73,20 +130,11 @@ class LoadEMSHRLite(object):
         # This would appear to mean that the station
         # continues to operate, but has no begin date. 
                    
-        begin_str = fields['BEG_DT'].strip()
-        end_str = fields['END_DT'].strip()            
-        
-        date_format = '%Y%m%d'
-        begin_date = datetime.strptime(begin_str, date_format)
-        end_date = datetime.strptime(end_str, date_format)
-        if end_date >= begin_date:
-            date_range = DateTimeRange(begin_date, end_date)
-        else: 
-            date_range = DateTimeRange(end_date, begin_date)
-        
-        date_range.validate_time_inversion()
+        # The dates are decoded to day ordinals through a memo table
+        # and the period is stored in that compact form.
+        begin_ordinal = date_ordinal(fields['BEG_DT'].strip())
+        end_ordinal = date_ordinal(fields['END_DT'].strip())
 
-        
         # Coordinates of weather station.
         # High altitude balloon records have 
         # empty latitude/longitude fields,
@@ -95,9 +143,33 @@ class LoadEMSHRLite(object):
         latitude = float(latitute_str) if latitute_str != '' else None
         longitude_str = fields['LON_DEC'].strip()
         longitude = float(longitude_str) if longitude_str != '' else None
-        coordinate = spherical_coordinate(latitude, longitude)
-        location = StationLocation(coordinate, date_range)
-        return location
+        return self.make_ordinal_location(begin_ordinal, end_ordinal, latitude, longitude)
+
+    def make_ordinal_location(
+            self, 
+            begin_ordinal: int, 
+            end_ordinal: int, 
+            latitude: float, 
+            longitude: float) -> CompactStationLocation:
+        '''
+        Make a station location instance from converted field values.
+        '''
+        # Some Colorado dates are inverted in time,
+        # so we check and fix this.
+        if end_ordinal < begin_ordinal:
+            begin_ordinal, end_ordinal = end_ordinal, begin_ordinal
+        return CompactStationLocation(latitude, longitude, begin_ordinal, end_ordinal)
+
+    def line_parser(self, column_layout: ColumnLayout):
+        '''
+        The compiled parser of the column layout, 
+        converting the selected fields as they are unpacked.
+        The parser is kept for as long as the column layout is in use.
+        '''
+        if column_layout is not self._parsed_layout:
+            self._line_parser = column_layout.compile_parser()
+            self._parsed_layout = column_layout
+        return self._line_parser
 
     def extract_metadata(
             self,
@@ -107,39 +179,80 @@ class LoadEMSHRLite(object):
         """
         Split the bytes array from the file
         into fields and keep the fields of interest.
-        The field values are all strings and are returned
-        in a dictionary key by column name.
+        The field values are converted as they are unpacked
+        by the compiled parser of the column layout.
         The column names come from the headings line for the file.
         Organsation of line:
             'NCDC', 'BEG_DT', 'END_DT', 'STATION_NAME', 'CC', 'TYPE'
 
         """
-        fields = column_layout.parse_line(line)
-        ncdc = int(fields['NCDC'].strip())
-        network_str = fields['TYPE'].strip()
-        network_str = network_str if network_str != '' else '<UNKNOWN>'
-        networks = network_str.split(',')       
-        country_code = fields['CC'].strip()       
+        record = self.line_parser(column_layout)(line)
+        return self.add_record(metadata, record)
+
+    def add_record(self, metadata: StationMetadata, record: tuple) -> StationMetadata:
+        '''
+        Add the location of a parsed line to the station metadata record,
+        or to a new record if the line is for a different station.
+        Returns the record the location was added to.
+        '''
+        ncdc = record.NCDC
 
         metadata_update = None
         if metadata.ncdc == ncdc:
             metadata_update = metadata
         else:
             metadata_update = StationMetadata(ncdc)
-            metadata_update.add_networks(networks)
-            metadata_update.set_country_code(country_code)
+            metadata_update.add_networks(record.TYPE or LoadEMSHRLite.UNKNOWN_NETWORKS)
+            metadata_update.set_country_code(record.CC)
  
         # Use the latest station name if one exists.
         # It is assumed the station records are ordered by date.
-        station_name = fields['STATION_NAME'].strip()
-        if station_name != '':
-            metadata_update.name = station_name
+        if record.STATION_NAME != '':
+            metadata_update.name = record.STATION_NAME
 
-        station_location = self.make_location(fields)
+        station_location = self.make_ordinal_location(
+            record.BEG_DT, record.END_DT, record.LAT_DEC, record.LON_DEC)
         metadata_update.add_location(station_location)
 
         return metadata_update
 
+    def iter_block_stations(
+            self, 
+            metadata: StationMetadata, 
+            column_layout: ColumnLayout, 
+            lines: list, 
+            positions: list,
+            position_name: str='Line index'):
+        '''
+        Parse a block of lines column-at-a-time and add their
+        locations to the station metadata records.
+        Yields each record completed within the block and returns
+        the record still open at the end of the block, 
+        so use it as: metadata = yield from ...
+        The positions locate the lines in the file for logging.
+        '''
+        records, errors = column_layout.parse_lines(lines)
+        if errors:
+            self.log_parse_errors(
+                errors, lambda index: (positions[index], lines[index]), position_name)
+        return (yield from self.iter_record_stations(metadata, records))
+
+    def iter_record_stations(self, metadata: StationMetadata, records: list):
+        '''
+        Add the locations of parsed lines to the station metadata records,
+        skipping lines that failed to parse.
+        Yields each record completed and returns the record still open.
+        '''
+        for record in records:
+            if record is None:
+                continue
+            metadata_update = self.add_record(metadata, record)
+            if metadata_update != metadata:
+                # Skip the dummy starting value.
+                if metadata.ncdc != 0:
+                    yield metadata
+                metadata = metadata_update
+        return metadata
 
     def strip_end_of_line(self, line: bytes) -> bytes:
         '''
@@ -156,79 +269,72 @@ class LoadEMSHRLite(object):
     
 
     def zap_gremlins(self, line: bytes) -> bytes:
-        logger = logging.getLogger(__name__)
-        try:
-            '''
-            Remove annoying non-ASCII characters.
-            These are encoded and the expansion messes 
-            with the fixed column widths, leading to bad 
-            parsing of fields.
-            These can be detected in the log output as interesing line lengths.
-            The code is adhoc and relates to particular issues in particuler files.
-            '''
-            
-            #Quebec, Momtreal, Prevost (French Canadian) 
-            # have double encoded E-acute characters.
-            #So replace \xc3\x83\xc2\xa9 with E.
-            
-            # Espanola (Spanish) has double encoded N-tilde character
-            # So replace \xc3\x83\xc2\xb1 with N
-            
-            # Barrow (USA) has encoded G-dot characters
-            # So replace \xc4\xa0 with G
-            
-            start_gremlin = 0
-            end_gremlin = 0
-            for char_index in range(len(line) - 3):
-                if line[char_index] == 0xc3:
-                    if line[char_index + 1] == 0x83:
-                        if line[char_index + 2] == 0xc2:
-                            if line[char_index + 3] == 0xa9:
-                                start_gremlin = char_index
-                                end_gremlin = char_index + 3 
-                                # Remove the e-acute bytes. Replace 1 and delete 3.
-                                # Add 3 spaces at the end to replace the 3 deleted byes.
-                                line = line[0:start_gremlin] + b'E' + line[end_gremlin + 1:] + b'   '
-                            elif line[char_index + 3] == 0xb1:
-                                start_gremlin = char_index
-                                end_gremlin = char_index + 3 
-                                # Remove the e-acute bytes. Replace 1 and delete 3.
-                                # Add 3 spaces at the end to replace the 3 deleted byes.
-                                line = line[0:start_gremlin] + b'N' + line[end_gremlin + 1:] + b'   '
-                elif line[char_index] == 0xc4:
-                    if line[char_index + 1] == 0xa0:
-                        start_gremlin = char_index
-                        end_gremlin = char_index + 1 
-                        # Remove the e-acute bytes. Replace 1 and delete 3.
-                        # Add 3 spaces at the end to replace the 3 deleted byes.
-                        line = line[0:start_gremlin] + b'G' + line[end_gremlin + 1:] + b' '
-            
-        except IndexError as index_error:
-            logger.warn(
-                f"Line: {str(line)}, \n"
-                f"At char index: {char_index}, \n"
-                f"had bad data, causing a: {index_error}\n")
-            raise index_error
-        return line
+        '''
+        Remove annoying non-ASCII characters.
+        These are encoded and the expansion messes 
+        with the fixed column widths, leading to bad 
+        parsing of fields.
+        These can be detected in the log output as interesing line lengths.
+        The byte sequences and their replacements are taken
+        from the loader's gremlin repair table.
+        '''
+        return self.gremlin_repair.repair(line)
 
-    def load(self) -> list:
+    def iter_stations(self):
         '''
-        Load the data from an ASCII file as bytes.
-        Interpret the headings line and the separator line
-        to obtain the column layout/tabular structure.
-        Parse subsequent lines as string values
-        and use these to build a list of station metadata records. 
+        Generate the station metadata records one at a time.
+        Each record is yielded as soon as the group of lines 
+        with its NCDC ends, so only one station history 
+        is held in memory at a time.
+        Reads the file in the same way as load().
         '''
+        if self.cached and not self.line_filter.is_active():
+            yield from self.iter_cached_stations()
+            return
+        yield from self.iter_parsed_stations()
+
+    def iter_cached_stations(self):
+        '''
+        Generate the station metadata records from the snapshot
+        if it is current and can be read, otherwise parse the file
+        and write a new snapshot.
+        '''
+        cache = StationCache(
+            self.file_path,
+            settings=settings_digest(LoadEMSHRLite.SELECTED_FIELDS, self.gremlin_repair.gremlins))
+        # The body of a snapshot with a current header may still be corrupt.
+        columns = None if self.refresh_cache else cache.read_columns()
+        if columns is not None:
+            yield from cache.iter_column_stations(columns)
+            return
+        yield from cache.iter_saving(self.iter_parsed_stations())
+
+    def iter_parsed_stations(self):
+        '''
+        Generate the station metadata records by parsing the file.
+        A compressed file is always parsed as a stream,
+        as it can be neither memory mapped nor split into byte ranges.
+        '''
+        compressed = is_compressed(self.file_path)
+        if self.workers > 1 and not compressed:
+            yield from self.iter_parallel_stations()
+            return
+        if self.memory_mapped and not compressed:
+            yield from self.iter_mapped_range(0, None)
+            return
+        if self.block_parsed:
+            yield from self.iter_buffered_stations()
+            return
         logger = logging.getLogger(__name__)
-        metadatas = []
         file_line_length = 539
         buffer_size = file_line_length - len(b'\r\r\n')
         line_index = 0
-        with open(self.file_path, 'rb') as data_file:
+        with open_input(self.file_path) as data_file:
             metadata = StationMetadata(0) # Dummy starting value.
             header_line = []
             separator_line = []
             column_layout = ColumnLayout(['NCDC']) # Dummy column layout.
+            accepts = None
             for line in data_file:
                 line_length = len(line)
                 if line_length != file_line_length:
@@ -244,18 +350,22 @@ class LoadEMSHRLite(object):
                 elif line_index == 1:
                     # Remember separator line and build column layout.
                     separator_line = str(line, 'utf-8')
-                    column_layout = ColumnLayout(
+                    column_layout = LAYOUT_REGISTRY.layout(
                         LoadEMSHRLite.SELECTED_FIELDS, header_line, separator_line)
+                    accepts = self.line_filter.compile(column_layout)
                 else:
                     try:
                         line = self.zap_gremlins(line)
                         line_length = len(line)
                         line = line[0:buffer_size - line_length] if line_length > buffer_size else line
-                        metadata_update = self.extract_metadata(metadata, column_layout, line)
-                        # Process record values
-                        if metadata_update != metadata:
-                            metadata = metadata_update
-                            metadatas.append(metadata)
+                        if accepts is None or accepts(line):
+                            metadata_update = self.extract_metadata(metadata, column_layout, line)
+                            # Process record values
+                            if metadata_update != metadata:
+                                # Skip the dummy starting value.
+                                if metadata.ncdc != 0:
+                                    yield metadata
+                                metadata = metadata_update
                     except IndexError as index_error:
                         logger.warn(
                             f"Line index: {line_index}, \n"
@@ -273,14 +383,504 @@ class LoadEMSHRLite(object):
                             f"had bad data, causing a: {value_error}\n")
                         
                 line_index += 1
+            if metadata.ncdc != 0:
+                yield metadata
+
+    def iter_buffered_stations(self):
+        '''
+        Generate the station metadata records by reading the file,
+        decompressing it if need be, in large blocks of whole lines.
+        Each block is parsed as for a memory mapped file, with any
+        station spanning two blocks carried over to the next block.
+        '''
+        with open_input(self.file_path) as data_file:
+            header_line = data_file.readline()
+            separator_line = data_file.readline()
+            if not separator_line:
+                # No data lines.
+                return
+            column_layout = LAYOUT_REGISTRY.layout(
+                LoadEMSHRLite.SELECTED_FIELDS, 
+                str(self.strip_end_of_line(header_line), 'utf-8'), 
+                str(self.strip_end_of_line(separator_line), 'utf-8'))
+            file_offset = len(header_line) + len(separator_line)
+            metadata = StationMetadata(0) # Dummy starting value.
+            remainder = b''
+            while True:
+                chunk = data_file.read(LoadEMSHRLite.READ_SIZE)
+                block = remainder + chunk
+                if chunk:
+                    # Hold back the partial line at the end of the block.
+                    block_end = block.rfind(b'\n') + 1
+                    remainder = block[block_end:]
+                    block = block[0:block_end]
+                if block:
+                    view = memoryview(block)
+                    try:
+                        metadata = yield from self.iter_view_stations(
+                            metadata, view, column_layout, 0, len(block), file_offset)
+                    finally:
+                        view.release()
+                    file_offset += len(block)
+                if not chunk:
+                    break
+            if metadata.ncdc != 0:
+                yield metadata
+
+    def station_index(self) -> StationIndex:
+        '''
+        The sidecar index of the station blocks in the file,
+        rebuilt whenever the file changes.
+        '''
+        if self._station_index is None:
+            self._station_index = StationIndex(self.file_path)
+        return self._station_index
+
+    def load_station(self, ncdc: int) -> StationMetadata:
+        '''
+        Load the metadata record of one station.
+        The station index gives the byte offset and line count
+        of each block of the station, so only those lines are parsed.
+        A compressed file cannot be sought, so it is scanned instead.
+        Returns None if the station is not in the file,
+        or if the line filter rejects all of its lines.
+        '''
+        if is_compressed(self.file_path):
+            for metadata in self.iter_parsed_stations():
+                if metadata.ncdc == ncdc:
+                    return metadata
+            return None
+        logger = logging.getLogger(__name__)
+        blocks = self.station_index().lookup(ncdc)
+        if not blocks:
+            return None
+        buffer_size = 539 - len(b'\r\r\n')
+        metadata = StationMetadata(0) # Dummy starting value.
+        with open(self.file_path, 'rb') as data_file:
+            header_line = str(self.strip_end_of_line(data_file.readline()), 'utf-8')
+            separator_line = str(self.strip_end_of_line(data_file.readline()), 'utf-8')
+            column_layout = LAYOUT_REGISTRY.layout(
+                LoadEMSHRLite.SELECTED_FIELDS, header_line, separator_line)
+            accepts = self.line_filter.compile(column_layout)
+            for offset, line_count in blocks:
+                data_file.seek(offset)
+                for _ in range(line_count):
+                    line = data_file.readline()
+                    line_length = len(line)
+                    try:
+                        line = self.zap_gremlins(self.strip_end_of_line(line))[0:buffer_size]
+                        if accepts is None or accepts(line):
+                            metadata = self.extract_metadata(metadata, column_layout, line)
+                    except (IndexError, struct_error, ValueError) as error:
+                        logger.warning(
+                            f"Byte offset: {offset}, \n"
+                            f"With line: {str(line)}, \n"
+                            f"had bad data, causing a: {error}\n")
+                    offset += line_length
+        return metadata if metadata.ncdc == ncdc else None
+
+    def load(self) -> list:
+        '''
+        Load the data from an ASCII file as bytes.
+        Interpret the headings line and the separator line
+        to obtain the column layout/tabular structure.
+        Parse subsequent lines as string values
+        and use these to build a list of station metadata records. 
+        '''
+        if self.cached and not self.line_filter.is_active():
+            return self.load_cached()
+        compressed = is_compressed(self.file_path)
+        if self.workers > 1 and not compressed:
+            return self.load_parallel()
+        if self.memory_mapped and not compressed:
+            return self.load_mapped()
+        metadatas = list(self.iter_stations())
+        self.log_invalid_periods(metadatas)
+        return metadatas
+
+    def mapped_column_layout(self, view: memoryview) -> tuple:
+        '''
+        Build the column layout from the headings line
+        and the separator line at the start of a memory mapped file.
+        Returns the column layout and the byte offset 
+        of the first data line.
+        '''
+        header_end = view.obj.find(b'\n') + 1
+        separator_end = view.obj.find(b'\n', header_end) + 1
+        if header_end == 0 or separator_end == 0:
+            raise ValueError('Missing headings or separator line.')
+        header_line = str(self.strip_end_of_line(view[0:header_end]), 'utf-8')
+        separator_line = str(self.strip_end_of_line(view[header_end:separator_end]), 'utf-8')
+        column_layout = LAYOUT_REGISTRY.layout(
+            LoadEMSHRLite.SELECTED_FIELDS, header_line, separator_line)
+        return column_layout, separator_end
+
+    def line_stride(self, view: memoryview, begin_offset: int, end_offset: int) -> tuple:
+        '''
+        The stride and the record length, without the end-of-line,
+        of the first line between the two byte offsets.
+        Lines with gremlin characters are passed over,
+        as their length is not the nominal stride.
+        '''
+        data = view.obj
+        offset = begin_offset
+        while offset < end_offset:
+            line_end = data.find(b'\n', offset, end_offset) + 1
+            if line_end == 0:
+                break
+            line = bytes(view[offset:line_end])
+            if line.isascii():
+                stride = line_end - offset
+                record_length = len(self.strip_end_of_line(line)) if stride > 1 else 0
+                return stride, record_length
+            offset = line_end
+        return 0, 0
+
+    def repair_line(self, view: memoryview, begin_offset: int, end_offset: int, base_offset: int=0) -> bytes:
+        '''
+        Copy a line of unexpected length, usually due to gremlin
+        characters, then repair and truncate it as for load().
+        '''
+        logger = logging.getLogger(__name__)
+        buffer_size = 539 - len(b'\r\r\n')
+        line = bytes(view[begin_offset:end_offset])
+        logger.info(
+            f"Interesting line length: {len(line)}\n"
+            f"Byte offset: {base_offset + begin_offset}, \n"
+            f"With line: {str(line)}, \n")
+        line = self.strip_end_of_line(line)
+        line = self.zap_gremlins(line)
+        return line[0:buffer_size]
+
+    def mapped_lines(
+            self, 
+            view: memoryview, 
+            begin_offset: int, 
+            end_offset: int, 
+            base_offset: int=0):
+        '''
+        Generate (offset, line) pairs for the data lines 
+        between the two byte offsets of a memory mapped file.
+        
+        The records are nominally fixed-stride, so the stride
+        is taken from the first line and each line is located
+        by offset, without copying, as a memoryview slice.
+        Lines of a different length, usually due to gremlin 
+        characters, are found by scanning for the newline.
+        These are copied, repaired and truncated as for load().
+        The base offset locates the view in the file, for logging.
+        '''
+        data_map = view.obj
+        stride, record_length = self.line_stride(view, begin_offset, end_offset)
+        offset = begin_offset
+        while offset < end_offset:
+            line_end = offset + stride
+            if stride > 0 and line_end <= end_offset \
+                    and data_map.find(b'\n', offset, line_end) == line_end - 1:
+                yield offset, view[offset:offset + record_length]
+            else:
+                line_end = data_map.find(b'\n', offset, end_offset) + 1
+                if line_end == 0:
+                    line_end = end_offset
+                yield offset, self.repair_line(view, offset, line_end, base_offset)
+            offset = line_end
+
+    def buffer_runs(self, data, begin_offset: int, end_offset: int, stride: int):
+        '''
+        Generate (begin offset, end offset, clean) triples covering
+        the data lines between the two byte offsets.
         
-        # Report on invalid location periods.
-        # This arises as some records (about 200)
-        # have duplicate locations based on the period.
+        A clean run is a block of lines of the given stride,
+        found by checking that every stride-th byte is a newline,
+        so it can be unpacked in one pass.
+        Otherwise the triple covers a single line of another length.
+        '''
+        run_size = stride * LoadEMSHRLite.BLOCK_LINE_COUNT
+        offset = begin_offset
+        while offset < end_offset:
+            line_count = min(run_size, end_offset - offset) // stride
+            run_end = offset + line_count * stride
+            newlines = data[offset + stride - 1:run_end:stride]
+            clean_count = len(newlines) - len(newlines.lstrip(b'\n'))
+            if clean_count > 0:
+                run_end = offset + clean_count * stride
+                yield offset, run_end, True
+            else:
+                run_end = data.find(b'\n', offset, end_offset) + 1
+                if run_end == 0:
+                    run_end = end_offset
+                yield offset, run_end, False
+            offset = run_end
+
+    def log_parse_errors(self, errors: dict, line_at, position_name: str):
+        '''
+        Log the errors of a parsed block in line order.
+        The function line_at gives the position and the line 
+        for the index of a line in the block.
+        '''
+        logger = logging.getLogger(__name__)
+        for index in sorted(errors):
+            position, line = line_at(index)
+            logger.warning(
+                f"{position_name}: {position}, \n"
+                f"With line: {str(bytes(line))}, \n"
+                f"had bad data, causing a: {errors[index]}\n")
+
+    def iter_run_stations(
+            self, 
+            metadata: StationMetadata, 
+            view: memoryview, 
+            column_layout: ColumnLayout,
+            begin_offset: int, 
+            end_offset: int,
+            base_offset: int=0):
+        '''
+        Parse the data lines between two byte offsets,
+        unpacking each clean fixed-stride run in one pass.
+        The other lines are repaired and parsed one at a time.
+        Yields each record completed and returns the record still open.
+        '''
+        stride, record_length = self.line_stride(view, begin_offset, end_offset)
+        runs = self.buffer_runs(view.obj, begin_offset, end_offset, stride)
+        parse_line = column_layout.compile_parser()
+        for run_begin, run_end, clean in runs:
+            if clean:
+                block = view[run_begin:run_end]
+                try:
+                    records, errors = column_layout.parse_block(block, stride)
+                finally:
+                    block.release()
+                if errors:
+                    self.log_parse_errors(
+                        errors, 
+                        lambda index: (
+                            base_offset + run_begin + index * stride,
+                            view[run_begin + index * stride:run_begin + index * stride + record_length]),
+                        'Byte offset')
+            else:
+                # A single line is quicker to parse by row than by column.
+                line = self.repair_line(view, run_begin, run_end, base_offset)
+                try:
+                    records = [parse_line(line)]
+                except (struct_error, ValueError) as error:
+                    records = []
+                    self.log_parse_errors(
+                        {0: error.with_traceback(None)}, 
+                        lambda index: (base_offset + run_begin, line), 'Byte offset')
+            metadata = yield from self.iter_record_stations(metadata, records)
+        return metadata
+
+    def iter_view_stations(
+            self, 
+            metadata: StationMetadata, 
+            view: memoryview, 
+            column_layout: ColumnLayout,
+            begin_offset: int, 
+            end_offset: int,
+            base_offset: int=0):
+        '''
+        Parse the data lines between two byte offsets of a view
+        of a memory mapped file or of a block read from a file.
+        Yields each record completed and returns the record still open,
+        so a station may continue into the next view.
+
+        Clean fixed-stride runs are unpacked a block at a time.
+        When lines are filtered, not block parsed, or are not 
+        of the width of the fields, they are parsed one by one
+        and converted column-at-a-time in blocks.
+        '''
+        accepts = self.line_filter.compile(column_layout)
+        if accepts is None and self.block_parsed:
+            stride, record_length = self.line_stride(view, begin_offset, end_offset)
+            if record_length == column_layout.field_struct.size:
+                return (yield from self.iter_run_stations(
+                    metadata, view, column_layout, begin_offset, end_offset, base_offset))
+        lines = self.mapped_lines(view, begin_offset, end_offset, base_offset)
+        line = None
+        block = []
+        offsets = []
+        try:
+            for offset, line in lines:
+                if accepts is not None and not accepts(line):
+                    continue
+                block.append(line)
+                offsets.append(base_offset + offset)
+                if len(block) == LoadEMSHRLite.BLOCK_LINE_COUNT:
+                    metadata = yield from self.iter_block_stations(
+                        metadata, column_layout, block, offsets, 'Byte offset')
+                    block = []
+                    offsets = []
+            metadata = yield from self.iter_block_stations(
+                metadata, column_layout, block, offsets, 'Byte offset')
+        finally:
+            # Release all slices so the map can be closed.
+            lines.close()
+            del line
+            del block
+        return metadata
+
+    def iter_mapped_stations(
+            self, 
+            view: memoryview, 
+            column_layout: ColumnLayout,
+            begin_offset: int, 
+            end_offset: int):
+        '''
+        Generate the station metadata records for the data lines 
+        between two byte offsets of a memory mapped file.
+        '''
+        metadata = StationMetadata(0) # Dummy starting value.
+        metadata = yield from self.iter_view_stations(
+            metadata, view, column_layout, begin_offset, end_offset)
+        if metadata.ncdc != 0:
+            yield metadata
+
+    def iter_mapped_range(self, begin_offset: int, end_offset: int):
+        '''
+        Memory map the file and generate the station metadata 
+        records for the data lines between two byte offsets.
+        An end offset of None means the end of the file.
+        '''
+        with open(self.file_path, 'rb') as data_file:
+            if os.fstat(data_file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data_map:
+                view = memoryview(data_map)
+                stations = None
+                try:
+                    column_layout, data_offset = self.mapped_column_layout(view)
+                    begin_offset = max(begin_offset, data_offset)
+                    end_offset = len(view) if end_offset is None else end_offset
+                    stations = self.iter_mapped_stations(
+                        view, column_layout, begin_offset, end_offset)
+                    yield from stations
+                finally:
+                    if stations is not None:
+                        stations.close()
+                    view.release()
+
+    def load_mapped_range(self, begin_offset: int, end_offset: int) -> list:
+        '''
+        Memory map the file and parse the data lines
+        between two byte offsets into a list of station metadata records.
+        '''
+        return list(self.iter_mapped_range(begin_offset, end_offset))
+
+    def log_invalid_periods(self, metadatas: list):
+        '''
+        Report on invalid location periods.
+        This arises as some records (about 200)
+        have duplicate locations based on the period.
+        '''
+        logger = logging.getLogger(__name__)
         failure_count = 1
         for metadata in metadatas:
             if not metadata.is_valid_periods():
-                logger.warn(
+                logger.warning(
                     f"Failure: {failure_count} - Metadata: {metadata}\n")
                 failure_count += 1
+
+    def load_cached(self) -> list:
+        '''
+        Load the station metadata records from the snapshot
+        if it is current, otherwise parse the file.
+        '''
+        metadatas = list(self.iter_cached_stations())
+        self.log_invalid_periods(metadatas)
         return metadatas
+
+    def load_mapped(self) -> list:
+        '''
+        Load the data from a memory mapped file.
+        Otherwise the same as load(), though the column layout is
+        handed zero-copy slices of the file for the clean lines.
+        '''
+        metadatas = self.load_mapped_range(0, None)
+        self.log_invalid_periods(metadatas)
+        return metadatas
+
+    def chunk_offsets(self, chunk_count: int) -> list:
+        '''
+        Split the data lines of the file into byte ranges,
+        one per chunk, returned as a list of offsets.
+        
+        Each nominal boundary is moved forward to the start 
+        of the next line and then past any lines with the same
+        NCDC as the line before it. So each station is parsed 
+        entirely within one chunk and the chunks can be 
+        parsed independently.
+        '''
+        with open(self.file_path, 'rb') as data_file:
+            if os.fstat(data_file.fileno()).st_size == 0:
+                return [0, 0]
+            with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data_map:
+                view = memoryview(data_map)
+                try:
+                    _, data_offset = self.mapped_column_layout(view)
+                finally:
+                    view.release()
+                file_size = len(data_map)
+                chunk_size = (file_size - data_offset) // chunk_count + 1
+                offsets = [data_offset]
+                for chunk_index in range(1, chunk_count):
+                    offset = max(data_offset + chunk_index * chunk_size, offsets[-1])
+                    if offset >= file_size:
+                        break
+                    # Back up to the start of the line holding the boundary.
+                    offset = data_map.rfind(b'\n', data_offset, offset) + 1
+                    offset = max(offset, data_offset)
+                    # The NCDC is the first field on the line.
+                    ncdc_width = data_map.find(b' ', offset) - offset
+                    ncdc = data_map[offset:offset + ncdc_width]
+                    # Skip forward to the start of the next station.
+                    while offset < file_size and data_map[offset:offset + ncdc_width] == ncdc:
+                        line_end = data_map.find(b'\n', offset) + 1
+                        offset = line_end if line_end > 0 else file_size
+                    if offsets[-1] < offset < file_size:
+                        offsets.append(offset)
+                offsets.append(file_size)
+        return offsets
+
+    def iter_parallel_stations(self):
+        '''
+        Generate the station metadata records by parsing byte ranges 
+        aligned on station boundaries in separate worker processes.
+        The chunks are yielded in file order as they complete,
+        giving the same sequence as the serial loaders.
+        '''
+        offsets = self.chunk_offsets(self.workers)
+        ranges = list(zip(offsets[:-1], offsets[1:]))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            chunks = executor.map(
+                _load_mapped_range,
+                [self.file_path] * len(ranges),
+                [begin_offset for begin_offset, _ in ranges],
+                [end_offset for _, end_offset in ranges],
+                [self.gremlin_repair.gremlins] * len(ranges),
+                [self.line_filter] * len(ranges))
+            for chunk in chunks:
+                yield from chunk
+
+    def load_parallel(self) -> list:
+        '''
+        Load the file using several worker processes.
+        '''
+        metadatas = list(self.iter_parallel_stations())
+        self.log_invalid_periods(metadatas)
+        return metadatas
+
+
+def _load_mapped_range(
+        file_path: str, 
+        begin_offset: int, 
+        end_offset: int, 
+        gremlins: dict,
+        line_filter: LineFilter) -> list:
+    '''
+    Worker process entry point for LoadEMSHRLite.load_parallel().
+    '''
+    loader = LoadEMSHRLite(
+        Configuration({'input_file_path': file_path}), 
+        gremlins=gremlins, 
+        line_filter=line_filter)
+    return loader.load_mapped_range(begin_offset, end_offset)
@@ -0,0 +1,205 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import logging
+
+import numpy as np
+
+from library.configuration import Configuration
+from library.column_layout import ColumnLayout
+from library.layout_registry import LAYOUT_REGISTRY
+from library.gremlin_repair import GremlinRepair
+from library.input_files import open_input
+from library.station_table import StationTable
+
+
+class LoadStationTable(object):
+    """
+    Load an EMSHR lite file in bulk into a NumPy structured array
+    and convert the selected columns to a column-oriented station table.
+
+    This is an alternative to LoadEMSHRLite for callers that
+    work on whole columns rather than on station metadata records,
+    so no per-station Python objects are made.
+    """
+
+    SELECTED_FIELDS = [
+        'NCDC', 'BEG_DT', 'END_DT', 'CC', 'LAT_DEC', 'LON_DEC'
+    ]
+
+    EPOCH = np.datetime64('0001-01-01', 'D')
+
+    def __init__(self, config: Configuration, gremlins: dict=GremlinRepair.GREMLINS):
+        """
+        Create the EMSHR lite bulk file loader.
+        """
+        self.file_path = config.input_file_path
+        self.gremlin_repair = GremlinRepair(gremlins)
+
+    def record_dtype(self, column_layout: ColumnLayout, itemsize: int) -> np.dtype:
+        '''
+        A fixed-width byte dtype for one line, with one field
+        per selected column at the offset given by the separator line.
+        '''
+        spans = column_layout.field_spans()
+        return np.dtype({
+            'names': list(spans),
+            'formats': ['S{}'.format(width) for _, width in spans.values()],
+            'offsets': [offset for offset, _ in spans.values()],
+            'itemsize': itemsize
+        })
+
+    def read_records(self, data: bytes, data_offset: int, column_layout: ColumnLayout) -> np.ndarray:
+        '''
+        View the data lines as a structured array.
+
+        When every line has the stride of the first line the file
+        is viewed in place. Otherwise the clean lines are gathered
+        into fixed-width rows and the others, usually due to gremlin
+        characters, are repaired one at a time.
+        '''
+        logger = logging.getLogger(__name__)
+        record_length = column_layout.field_struct.size
+        raw = np.frombuffer(data, dtype=np.uint8, offset=data_offset)
+        line_ends = np.flatnonzero(raw == 0x0a) + 1
+        if len(raw) > 0 and raw[-1] != 0x0a:
+            line_ends = np.append(line_ends, len(raw))
+        line_starts = np.concatenate(([0], line_ends[:-1]))
+        line_lengths = line_ends - line_starts
+        stride = line_lengths[0] if len(line_lengths) > 0 else 0
+        # Clean lines hold a whole record followed by the end of line.
+        clean = (line_lengths == stride) & (stride > record_length)
+        if np.all(clean) and len(clean) > 0:
+            return np.frombuffer(
+                data, dtype=self.record_dtype(column_layout, stride), offset=data_offset)
+
+        rows = np.full((len(line_lengths), record_length), 0x20, dtype=np.uint8)
+        clean_starts = line_starts[clean]
+        rows[clean] = raw[clean_starts[:, np.newaxis] + np.arange(record_length)]
+        for line_index in np.flatnonzero(~clean):
+            line = data[data_offset + line_starts[line_index]:data_offset + line_ends[line_index]]
+            logger.info(
+                f"Interesting line length: {len(line)}\n"
+                f"Line index: {line_index + 2}, \n"
+                f"With line: {str(line)}, \n")
+            line = self.gremlin_repair.repair(line.rstrip(b'\r\n'))[0:record_length]
+            rows[line_index, 0:len(line)] = np.frombuffer(line, dtype=np.uint8)
+        return rows.view(self.record_dtype(column_layout, record_length)).reshape(-1)
+
+    def _date_ordinals(self, dates: np.ndarray) -> tuple:
+        '''
+        Convert a column of YYYYMMDD byte strings to day ordinals.
+        Returns the ordinals and a mask of the valid dates.
+        '''
+        dates = np.char.strip(dates)
+        valid = (np.char.str_len(dates) == 8) & np.char.isdigit(dates)
+        numbers = np.where(valid, dates, b'00010101').astype(np.int64)
+        years = numbers // 10000
+        months = numbers // 100 % 100
+        days = numbers % 100
+        valid &= (months >= 1) & (months <= 12) & (days >= 1) & (years >= 1)
+        months = np.where(valid, months, 1)
+        days = np.where(valid, days, 1)
+        years = np.where(valid, years, 1)
+        month_starts = (years - 1970).astype('datetime64[Y]').astype('datetime64[M]') \
+            + (months - 1).astype('timedelta64[M]')
+        day_dates = month_starts.astype('datetime64[D]') + (days - 1).astype('timedelta64[D]')
+        # Days past the end of the month roll over into the next month.
+        valid &= day_dates.astype('datetime64[M]') == month_starts
+        ordinals = (day_dates - LoadStationTable.EPOCH).astype(np.int64) + 1
+        return ordinals, valid
+
+    def _coordinates(self, values: np.ndarray) -> tuple:
+        '''
+        Convert a column of decimal degree byte strings to floats.
+        Empty values, as for high altitude balloon records, become NaN.
+        Returns the floats and a mask of the valid values.
+        '''
+        values = np.char.strip(values)
+        values = np.where(values == b'', b'nan', values)
+        try:
+            return values.astype(np.float64), np.ones(len(values), dtype=bool)
+        except ValueError:
+            floats = np.full(len(values), np.nan)
+            valid = np.ones(len(values), dtype=bool)
+            for index, value in enumerate(values):
+                try:
+                    floats[index] = float(value)
+                except ValueError:
+                    valid[index] = False
+            return floats, valid
+
+    def convert(self, records: np.ndarray) -> StationTable:
+        '''
+        Convert the selected columns to typed arrays and group
+        the locations into stations by runs of the same NCDC.
+        '''
+        logger = logging.getLogger(__name__)
+        ncdcs = np.char.strip(records['NCDC'])
+        valid = (np.char.str_len(ncdcs) > 0) & np.char.isdigit(ncdcs)
+        ncdcs = np.where(valid, ncdcs, b'0').astype(np.int64)
+        begin_ordinals, valid_begin = self._date_ordinals(records['BEG_DT'])
+        end_ordinals, valid_end = self._date_ordinals(records['END_DT'])
+        latitudes, valid_latitude = self._coordinates(records['LAT_DEC'])
+        longitudes, valid_longitude = self._coordinates(records['LON_DEC'])
+        valid &= valid_begin & valid_end & valid_latitude & valid_longitude
+        for line_index in np.flatnonzero(~valid):
+            logger.warning(
+                f"Line index: {line_index + 2}, \n"
+                f"With record: {records[line_index]}, \n"
+                f"had bad data.\n")
+        # Some Colorado dates are inverted in time.
+        start_ordinals = np.minimum(begin_ordinals, end_ordinals)[valid]
+        end_ordinals = np.maximum(begin_ordinals, end_ordinals)[valid]
+        ncdcs = ncdcs[valid]
+        latitudes = latitudes[valid]
+        longitudes = longitudes[valid]
+        country_codes = np.char.strip(records['CC'][valid])
+
+        # A location with the same period as the next location
+        # of the same station is replaced by that later record.
+        duplicate = (ncdcs[:-1] == ncdcs[1:]) \
+            & (start_ordinals[:-1] == start_ordinals[1:]) \
+            & (end_ordinals[:-1] == end_ordinals[1:])
+        keep = np.ones(len(ncdcs), dtype=bool)
+        keep[:-1] = ~duplicate
+        ncdcs = ncdcs[keep]
+
+        station_changes = np.ones(len(ncdcs), dtype=bool)
+        station_changes[1:] = ncdcs[1:] != ncdcs[:-1]
+        station_starts = np.flatnonzero(station_changes)
+        location_offsets = np.append(station_starts, len(ncdcs))
+        return StationTable(
+            ncdcs[station_starts],
+            country_codes[keep][station_starts].astype('U'),
+            location_offsets,
+            start_ordinals[keep].astype(np.int32),
+            end_ordinals[keep].astype(np.int32),
+            latitudes[keep],
+            longitudes[keep])
+
+    def load(self) -> StationTable:
+        '''
+        Read the whole file, decompressing it if need be, interpret the headings line and
+        the separator line to obtain the column layout, and
+        convert the data lines to a station table.
+        '''
+        with open_input(self.file_path) as data_file:
+            data = data_file.read()
+        header_end = data.find(b'\n') + 1
+        separator_end = data.find(b'\n', header_end) + 1
+        if header_end == 0 or separator_end == 0:
+            # No data lines, so use the default column layout.
+            column_layout = LAYOUT_REGISTRY.layout(LoadStationTable.SELECTED_FIELDS)
+            records = np.zeros(0, dtype=self.record_dtype(
+                column_layout, column_layout.field_struct.size))
+            return self.convert(records)
+        header_line = str(data[0:header_end].rstrip(b'\r\n'), 'utf-8')
+        separator_line = str(data[header_end:separator_end].rstrip(b'\r\n'), 'utf-8')
+        column_layout = LAYOUT_REGISTRY.layout(
+            LoadStationTable.SELECTED_FIELDS, header_line, separator_line)
+        records = self.read_records(data, separator_end, column_layout)
+        return self.convert(records)
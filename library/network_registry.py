@@ -0,0 +1,85 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+
+class NetworkRegistry(object):
+    '''
+    A registry that interns network names as bit positions,
+    so the networks of a station are held as an integer bitmask.
+    Unions and intersections of network sets are then 
+    bitwise or and bitwise and of their masks.
+
+    The registry grows as unseen network names appear.
+    Bit positions are particular to a process, 
+    so masks are not to be stored or sent between processes.
+    Use the names instead.
+    '''
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self._positions = dict()
+        self._names = []
+        self._name_sets = dict()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def position(self, name: str) -> int:
+        '''
+        The bit position of the network, 
+        assigned on first sight of the network name.
+        '''
+        position = self._positions.get(name)
+        if position is None:
+            position = len(self._names)
+            self._positions[name] = position
+            self._names.append(name)
+        return position
+
+    def find(self, name: str) -> int:
+        '''
+        The bit position of the network, or None for an unseen
+        network name, which is not registered.
+        '''
+        return self._positions.get(name)
+
+    def bit(self, name: str) -> int:
+        return 1 << self.position(name)
+
+    def mask(self, names) -> int:
+        '''
+        The bitmask of an iterable of network names.
+        '''
+        mask = 0
+        for name in names:
+            mask |= 1 << self.position(name)
+        return mask
+
+    def names(self, mask: int) -> frozenset:
+        '''
+        The network names of a bitmask.
+        '''
+        names = self._name_sets.get(mask)
+        if names is None:
+            names = frozenset(
+                name for position, name in enumerate(self._names) if mask >> position & 1)
+            self._name_sets[mask] = names
+        return names
+
+    def mask_dtype(self) -> np.dtype:
+        '''
+        The array type to hold the current masks,
+        Python integers once there are too many networks for 64 bits.
+        '''
+        return np.dtype(np.uint64) if len(self) <= 64 else np.dtype(object)
+
+
+# Shared by all of the station metadata records in a process.
+NETWORK_REGISTRY = NetworkRegistry()
@@ -0,0 +1,52 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+
+class RelocationTable(object):
+    '''
+    A column-oriented table of the changes of location of stations,
+    with one row per pair of consecutive locations of a station.
+
+    Rows are indexed by the later location of the pair.
+    Distances are great circle distances in km, 
+    NaN if either location has no coordinates.
+    Elapsed days are from the start of the earlier location 
+    to the start of the later one, NaN if either start date is unknown.
+    '''
+
+    def __init__(
+            self,
+            station_indices: np.ndarray,
+            ncdcs: np.ndarray,
+            location_indices: np.ndarray,
+            distances_km: np.ndarray,
+            elapsed_days: np.ndarray):
+        '''
+        Constructor
+        '''
+        self.station_indices = station_indices
+        self.ncdcs = ncdcs
+        self.location_indices = location_indices
+        self.distances_km = distances_km
+        self.elapsed_days = elapsed_days
+
+    def row_count(self) -> int:
+        return len(self.location_indices)
+
+    def moves(self) -> np.ndarray:
+        '''
+        A mask of the rows where the coordinates changed.
+        '''
+        return self.distances_km > 0.0
+
+    def pseudo_moves(self, threshold_km: float) -> np.ndarray:
+        '''
+        A mask of the moves shorter than the threshold,
+        such as those due to rounding of the coordinates.
+        '''
+        return self.moves() & (self.distances_km < threshold_km)
@@ -0,0 +1,161 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import math
+
+import numpy as np
+
+from library.geodesy import unit_vectors, chord_to_km, km_to_chord
+
+
+class SpatialIndex(object):
+    '''
+    An index of points on the sphere, such as the coordinates
+    of station locations, answering radius and nearest neighbour queries.
+
+    The points are held as unit vectors, sorted by the cell
+    of a grid of cubes that contains them. A query only checks
+    the points in the cells that meet the bounding cube
+    of the query radius, found by binary searches of the cells.
+
+    Each point may belong to a group, such as the station of a location,
+    and may have a period as day ordinals.
+    Queries return the nearest point of each group,
+    optionally just for the points with a period overlapping a range.
+    Points without coordinates are not indexed.
+    '''
+
+    # The mean number of points in a cell, for points spread over the sphere.
+    POINTS_PER_CELL = 8
+    # The smallest cell edge, as a fraction of the radius of the sphere.
+    MIN_CELL_SIZE = 1.0 / 4096
+
+    def __init__(
+            self,
+            latitudes: np.ndarray,
+            longitudes: np.ndarray,
+            groups: np.ndarray=None,
+            start_ordinals: np.ndarray=None,
+            end_ordinals: np.ndarray=None):
+        '''
+        Constructor
+        '''
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        point_indices = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+        vectors = unit_vectors(latitudes[point_indices], longitudes[point_indices])
+        self.cell_size = min(max(
+            math.sqrt(SpatialIndex.POINTS_PER_CELL * 4 * math.pi / max(len(point_indices), 1)),
+            SpatialIndex.MIN_CELL_SIZE), 2.0)
+        self.grid_width = int(2.0 / self.cell_size) + 1
+        keys = self._cell_keys(self._cells(vectors))
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.vectors = vectors[order]
+        self.point_indices = point_indices[order]
+        self.groups = np.asarray(groups)[self.point_indices] \
+            if groups is not None else self.point_indices
+        self.start_ordinals = np.asarray(start_ordinals)[self.point_indices] \
+            if start_ordinals is not None else None
+        self.end_ordinals = np.asarray(end_ordinals)[self.point_indices] \
+            if end_ordinals is not None else None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _cells(self, vectors: np.ndarray) -> np.ndarray:
+        cells = np.floor((vectors + 1.0) / self.cell_size).astype(np.int64)
+        return np.clip(cells, 0, self.grid_width - 1)
+
+    def _cell_keys(self, cells: np.ndarray) -> np.ndarray:
+        width = self.grid_width
+        return (cells[..., 0] * width + cells[..., 1]) * width + cells[..., 2]
+
+    def _candidates(self, vector: np.ndarray, chord: float) -> np.ndarray:
+        '''
+        The sorted positions of the points in the cells
+        that meet the cube of the chord around the vector.
+        '''
+        low = self._cells(vector - chord)
+        high = self._cells(vector + chord)
+        cell_count = np.prod(high - low + 1)
+        if cell_count * SpatialIndex.POINTS_PER_CELL >= len(self):
+            # Most cells are needed, so check every point.
+            return np.arange(len(self))
+        cells = np.stack(np.meshgrid(
+            np.arange(low[0], high[0] + 1),
+            np.arange(low[1], high[1] + 1),
+            np.arange(low[2], high[2] + 1), indexing='ij'), axis=-1).reshape(-1, 3)
+        keys = self._cell_keys(cells)
+        begins = np.searchsorted(self.keys, keys, side='left')
+        lengths = np.searchsorted(self.keys, keys, side='right') - begins
+        total = lengths.sum()
+        # The positions in each cell follow on from the first position of the cell.
+        first_positions = np.cumsum(lengths) - lengths
+        return np.repeat(begins - first_positions, lengths) + np.arange(total)
+
+    def _search(self, vector: np.ndarray, chord: float, begin: int, end: int) -> tuple:
+        '''
+        The groups with a point within the chord of the vector,
+        and the chord to the nearest point of each group, nearest first.
+        '''
+        positions = self._candidates(vector, chord)
+        if begin is not None and self.start_ordinals is not None:
+            positions = positions[
+                (self.start_ordinals[positions] <= end) & (self.end_ordinals[positions] >= begin)]
+        chords = np.sqrt(((self.vectors[positions] - vector) ** 2).sum(axis=1))
+        within = chords <= chord
+        positions = positions[within]
+        chords = chords[within]
+        groups = self.groups[positions]
+        # Keep the nearest point of each group.
+        order = np.lexsort((chords, groups))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = groups[order][1:] != groups[order][:-1]
+        nearest = order[first]
+        nearest = nearest[np.argsort(chords[nearest], kind='stable')]
+        return groups[nearest], chords[nearest]
+
+    def within(
+            self,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            begin: int=None,
+            end: int=None) -> tuple:
+        '''
+        Public method that returns the groups with a point within the
+        radius of the coordinate, and the distance in km to the
+        nearest point of each group, nearest first.
+        When begin and end day ordinals are given, just the points
+        with a period overlapping that range are considered.
+        '''
+        vector = unit_vectors(latitude, longitude)
+        groups, chords = self._search(
+            vector, float(km_to_chord(radius_km)), begin, end if end is not None else begin)
+        return groups, chord_to_km(chords)
+
+    def nearest(
+            self,
+            latitude: float,
+            longitude: float,
+            count: int,
+            begin: int=None,
+            end: int=None) -> tuple:
+        '''
+        Public method that returns the nearest groups to the coordinate,
+        up to the count, and the distance in km to each, nearest first.
+        The search radius is doubled until enough groups are found.
+        '''
+        vector = unit_vectors(latitude, longitude)
+        end = end if end is not None else begin
+        chord = self.cell_size
+        while True:
+            groups, chords = self._search(vector, chord, begin, end)
+            # The chord of antipodal points is the diameter.
+            if len(groups) >= count or chord >= 2.0:
+                return groups[0:count], chord_to_km(chords[0:count])
+            chord = min(chord * 2.0, 2.0)
@@ -0,0 +1,262 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import hashlib
+import logging
+import math
+import os
+import sys
+from array import array
+from struct import Struct, error as struct_error
+
+from library.station_metadata import StationMetadata
+from library.station_location import BaseOrdinalLocation, CompactStationLocation
+from library.network_registry import NETWORK_REGISTRY
+from library.file_key import file_key, is_current_key, read_key, write_key
+
+
+# The version of the snapshot columns and of the field conversions,
+# to be bumped when either changes.
+FORMAT_VERSION = 2
+
+
+def settings_digest(selected_fields: list, gremlins: dict) -> bytes:
+    '''
+    The digest of the parse settings that shape the snapshot columns:
+    the selected fields with their types and the gremlin table.
+    '''
+    digest = hashlib.sha256()
+    for field in selected_fields:
+        digest.update(repr((field.name, field.field_type.name)).encode('utf-8'))
+    for gremlin, replacement in sorted(gremlins.items()):
+        digest.update(repr((gremlin, replacement)).encode('utf-8'))
+    return digest.digest()
+
+
+class StationCache(object):
+    '''
+    A compact columnar binary snapshot of the station metadata
+    records parsed from an EMSHR Lite file.
+    The snapshot is written next to the input file and
+    is keyed by the size, modification time and hash of that file.
+    The format version and the digest of the parse settings
+    follow the magic bytes, so a snapshot written by another
+    version or with other settings is rebuilt.
+
+    The snapshot holds one column per attribute:
+        per station: NCDC, location count, country code, name and networks.
+        per location: start and end day ordinals, latitude and longitude.
+    Country codes, names and network sets are interned in string tables.
+    Missing coordinates are stored as NaN.
+    '''
+
+    MAGIC = b'EMSHR-LITE-CACHE-1\n'
+
+    # Format version and parse settings digest.
+    SETTINGS_STRUCT = Struct('<I32s')
+
+    # Column typecode and item count.
+    COLUMN_STRUCT = Struct('<cQ')
+
+    STATION_COLUMNS = (
+        ('ncdc', 'q'), ('location_count', 'I'),
+        ('country_code', 'I'), ('name', 'I'), ('networks', 'I'))
+    LOCATION_COLUMNS = (
+        ('start', 'i'), ('end', 'i'), ('latitude', 'd'), ('longitude', 'd'))
+    STRING_TABLES = ('country_codes', 'names', 'networks')
+
+    def __init__(self, file_path: str, cache_path: str=None, settings: bytes=None):
+        '''
+        Constructor
+        By default the snapshot file sits beside the input file.
+        The settings are the digest of the parse settings,
+        see settings_digest().
+        '''
+        self.file_path = file_path
+        self.cache_path = cache_path if cache_path is not None else file_path + '.cache'
+        self.settings = StationCache.SETTINGS_STRUCT.pack(
+            FORMAT_VERSION, settings if settings is not None else hashlib.sha256().digest())
+
+    def _is_current(self, cache_file) -> bool:
+        '''
+        Check the magic bytes, the settings and the key
+        at the start of the snapshot.
+        '''
+        if cache_file.read(len(StationCache.MAGIC)) != StationCache.MAGIC:
+            return False
+        if cache_file.read(len(self.settings)) != self.settings:
+            logger = logging.getLogger(__name__)
+            logger.info(
+                f"Cache file: {self.cache_path}, \n"
+                f"was written by another version or with other parse settings.\n")
+            return False
+        return is_current_key(
+            self.file_path, read_key(cache_file, b''),
+            self.cache_path, len(StationCache.MAGIC) + len(self.settings))
+
+    def is_valid(self) -> bool:
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                return self._is_current(cache_file)
+        except OSError:
+            return False
+
+    def _read_column(self, cache_file, typecode: str) -> array:
+        stored_typecode, count = StationCache.COLUMN_STRUCT.unpack(
+            cache_file.read(StationCache.COLUMN_STRUCT.size))
+        if stored_typecode.decode() != typecode:
+            raise ValueError(f"Expected column type: {typecode}, found: {stored_typecode}")
+        column = array(typecode)
+        column.frombytes(cache_file.read(count * column.itemsize))
+        if len(column) != count:
+            raise ValueError('Truncated column.')
+        if sys.byteorder == 'big':
+            column.byteswap()
+        return column
+
+    def _write_column(self, cache_file, column: array):
+        cache_file.write(StationCache.COLUMN_STRUCT.pack(
+            column.typecode.encode(), len(column)))
+        if sys.byteorder == 'big':
+            column = array(column.typecode, column)
+            column.byteswap()
+        cache_file.write(column.tobytes())
+
+    def _read_strings(self, cache_file) -> list:
+        # Each string is terminated by a null character.
+        blob = self._read_column(cache_file, 'B').tobytes()
+        return blob.decode('utf-8').split('\0')[:-1]
+
+    def _write_strings(self, cache_file, strings: list):
+        blob = ''.join(string + '\0' for string in strings)
+        self._write_column(cache_file, array('B', blob.encode('utf-8')))
+
+    def read_columns(self) -> dict:
+        '''
+        Read every column of a current snapshot into a dictionary
+        keyed by column name.
+        Returns None if there is no current snapshot.
+        '''
+        logger = logging.getLogger(__name__)
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                if not self._is_current(cache_file):
+                    return None
+                columns = dict()
+                for name, typecode in StationCache.STATION_COLUMNS + StationCache.LOCATION_COLUMNS:
+                    columns[name] = self._read_column(cache_file, typecode)
+                for name in StationCache.STRING_TABLES:
+                    columns[name + '_table'] = self._read_strings(cache_file)
+        except (OSError, ValueError, struct_error) as error:
+            logger.warning(
+                f"Cache file: {self.cache_path}, \n"
+                f"could not be read, causing a: {error}\n")
+            return None
+        return columns
+
+    def iter_stations(self):
+        '''
+        Generate the station metadata records held in the snapshot.
+        Nothing is yielded if there is no current snapshot
+        or it cannot be read, so use read_columns()
+        and iter_column_stations() to tell these apart.
+        '''
+        columns = self.read_columns()
+        if columns is None:
+            return
+        yield from self.iter_column_stations(columns)
+
+    def iter_column_stations(self, columns: dict):
+        '''
+        Generate the station metadata records
+        from the columns given by read_columns().
+        '''
+        country_codes = columns['country_codes_table']
+        names = columns['names_table']
+        network_masks = [
+            NETWORK_REGISTRY.mask(networks.split(',')) if networks else 0
+            for networks in columns['networks_table']]
+        starts = columns['start']
+        ends = columns['end']
+        latitudes = columns['latitude']
+        longitudes = columns['longitude']
+        location_index = 0
+        for station_index, ncdc in enumerate(columns['ncdc']):
+            metadata = StationMetadata(ncdc, names[columns['name'][station_index]])
+            metadata.set_country_code(country_codes[columns['country_code'][station_index]])
+            metadata.set_network_mask(network_masks[columns['networks'][station_index]])
+            locations = []
+            end_index = location_index + columns['location_count'][station_index]
+            for index in range(location_index, end_index):
+                latitude = latitudes[index]
+                longitude = longitudes[index]
+                locations.append(CompactStationLocation(
+                    None if math.isnan(latitude) else latitude,
+                    None if math.isnan(longitude) else longitude,
+                    starts[index], ends[index]))
+            metadata.set_locations(locations)
+            location_index = end_index
+            yield metadata
+
+    def iter_saving(self, metadatas):
+        '''
+        Pass through the station metadata records from a parse,
+        collecting their columns as they go.
+        The snapshot is written once the parse has completed.
+        '''
+        input_key = file_key(self.file_path)
+        columns = dict(
+            (name, array(typecode))
+            for name, typecode in StationCache.STATION_COLUMNS + StationCache.LOCATION_COLUMNS)
+        tables = dict((name, dict()) for name in StationCache.STRING_TABLES)
+
+        def intern(table_name, value):
+            return tables[table_name].setdefault(value, len(tables[table_name]))
+
+        for metadata in metadatas:
+            columns['ncdc'].append(metadata.ncdc)
+            columns['location_count'].append(metadata.location_count())
+            columns['country_code'].append(intern('country_codes', metadata.country_code))
+            columns['name'].append(intern('names', metadata.name))
+            columns['networks'].append(intern('networks', metadata.network_mask))
+            for location in metadata.locations:
+                coordinate = location.coordinate()
+                latitude = coordinate.latitude if coordinate else None
+                longitude = coordinate.longitude if coordinate else None
+                columns['latitude'].append(math.nan if latitude is None else latitude)
+                columns['longitude'].append(math.nan if longitude is None else longitude)
+                if isinstance(location, BaseOrdinalLocation):
+                    columns['start'].append(location.start_ordinal)
+                    columns['end'].append(location.end_ordinal)
+                else:
+                    period = location.period()
+                    columns['start'].append(period.start_datetime.toordinal())
+                    columns['end'].append(period.end_datetime.toordinal())
+            yield metadata
+
+        # Bit positions differ between processes, so store the names.
+        tables['networks'] = dict(
+            (','.join(sorted(NETWORK_REGISTRY.names(network_mask))), index)
+            for network_mask, index in tables['networks'].items())
+        # Only keep the snapshot if the input did not change during the parse.
+        if file_key(self.file_path, input_key[2])[0:2] == input_key[0:2]:
+            self.save_columns(input_key, columns, tables)
+
+    def save_columns(self, input_key: tuple, columns: dict, tables: dict):
+        logger = logging.getLogger(__name__)
+        temporary_path = self.cache_path + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as cache_file:
+                write_key(cache_file, StationCache.MAGIC + self.settings, input_key)
+                for name, _ in StationCache.STATION_COLUMNS + StationCache.LOCATION_COLUMNS:
+                    self._write_column(cache_file, columns[name])
+                for name in StationCache.STRING_TABLES:
+                    self._write_strings(cache_file, list(tables[name]))
+            os.replace(temporary_path, self.cache_path)
+        except OSError as error:
+            logger.warning(
+                f"Cache file: {self.cache_path}, \n"
+                f"could not be written, causing a: {error}\n")
@@ -0,0 +1,174 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import logging
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from struct import Struct, error as struct_error
+
+from library.file_key import file_key, is_current_key, read_key, write_key
+
+
+class StationIndex(object):
+    '''
+    A sidecar index of the station blocks in an EMSHR Lite file.
+    Each entry maps an NCDC to the byte offset of the first line
+    of its block and the number of lines in the block.
+    The entries are sorted by NCDC for binary search.
+    A station whose lines are not contiguous has one entry per block.
+
+    The index is written next to the input file and is keyed
+    by the size, modification time and hash of that file,
+    so it is rebuilt when the file changes.
+    The input file must be uncompressed, so the blocks can be sought.
+    '''
+
+    MAGIC = b'EMSHR-LITE-INDEX-1\n'
+
+    # Entry count.
+    COUNT_STRUCT = Struct('<Q')
+    COLUMNS = (('ncdc', 'q'), ('offset', 'Q'), ('line_count', 'I'))
+
+    def __init__(self, file_path: str, index_path: str=None):
+        '''
+        Constructor
+        By default the index file sits beside the input file.
+        '''
+        self.file_path = file_path
+        self.index_path = index_path if index_path is not None else file_path + '.index'
+        self.columns = None
+
+    def _is_current(self, index_file) -> bool:
+        return is_current_key(
+            self.file_path, read_key(index_file, StationIndex.MAGIC),
+            self.index_path, len(StationIndex.MAGIC))
+
+    def is_valid(self) -> bool:
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                return self._is_current(index_file)
+        except OSError:
+            return False
+
+    def scan(self) -> dict:
+        '''
+        Scan the input file for runs of lines with the same NCDC.
+        Returns the index columns keyed by column name.
+        '''
+        logger = logging.getLogger(__name__)
+        blocks = []
+        with open(self.file_path, 'rb') as data_file:
+            # Skip the headings and separator lines.
+            offset = len(data_file.readline())
+            offset += len(data_file.readline())
+            ncdc_field = None
+            block = None
+            for line in data_file:
+                # The NCDC is the first field on the line.
+                field = line[0:line.find(b' ')]
+                if field == ncdc_field and block is not None:
+                    block[2] += 1
+                else:
+                    ncdc_field = field
+                    try:
+                        block = [int(field), offset, 1]
+                        blocks.append(block)
+                    except ValueError as value_error:
+                        logger.warning(
+                            f"Byte offset: {offset}, \n"
+                            f"With line: {str(line)}, \n"
+                            f"had bad data, causing a: {value_error}\n")
+                        block = None
+                offset += len(line)
+        # Stable, so the blocks of a station stay in file order.
+        blocks.sort(key=lambda block: block[0])
+        return dict(
+            (name, array(typecode, [block[index] for block in blocks]))
+            for index, (name, typecode) in enumerate(StationIndex.COLUMNS))
+
+    def build(self) -> dict:
+        '''
+        Scan the input file and write the index beside it.
+        Returns the index columns.
+        '''
+        input_key = file_key(self.file_path)
+        columns = self.scan()
+        # Only keep the index if the input did not change during the scan.
+        if file_key(self.file_path, input_key[2])[0:2] == input_key[0:2]:
+            self.save_columns(input_key, columns)
+        return columns
+
+    def read_columns(self) -> dict:
+        '''
+        Read the columns of a current index.
+        Returns None if there is no current index.
+        '''
+        logger = logging.getLogger(__name__)
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                if not self._is_current(index_file):
+                    return None
+                count, = StationIndex.COUNT_STRUCT.unpack(
+                    index_file.read(StationIndex.COUNT_STRUCT.size))
+                columns = dict()
+                for name, typecode in StationIndex.COLUMNS:
+                    column = array(typecode)
+                    column.frombytes(index_file.read(count * column.itemsize))
+                    if len(column) != count:
+                        raise ValueError('Truncated column.')
+                    if sys.byteorder == 'big':
+                        column.byteswap()
+                    columns[name] = column
+        except (OSError, ValueError, struct_error) as error:
+            logger.warning(
+                f"Index file: {self.index_path}, \n"
+                f"could not be read, causing a: {error}\n")
+            return None
+        return columns
+
+    def save_columns(self, input_key: tuple, columns: dict):
+        logger = logging.getLogger(__name__)
+        temporary_path = self.index_path + '.tmp'
+        try:
+            with open(temporary_path, 'wb') as index_file:
+                write_key(index_file, StationIndex.MAGIC, input_key)
+                index_file.write(StationIndex.COUNT_STRUCT.pack(len(columns['ncdc'])))
+                for name, _ in StationIndex.COLUMNS:
+                    column = columns[name]
+                    if sys.byteorder == 'big':
+                        column = array(column.typecode, column)
+                        column.byteswap()
+                    index_file.write(column.tobytes())
+            os.replace(temporary_path, self.index_path)
+        except OSError as error:
+            logger.warning(
+                f"Index file: {self.index_path}, \n"
+                f"could not be written, causing a: {error}\n")
+
+    def load(self) -> dict:
+        '''
+        Read the index if it is current, otherwise rebuild it.
+        '''
+        if self.columns is not None and self.is_valid():
+            return self.columns
+        columns = self.read_columns() if self.is_valid() else None
+        self.columns = columns if columns is not None else self.build()
+        return self.columns
+
+    def lookup(self, ncdc: int) -> list:
+        '''
+        The (byte offset, line count) of each block of the station,
+        in file order. Empty if the station is not in the file.
+        '''
+        columns = self.load()
+        ncdcs = columns['ncdc']
+        begin = bisect_left(ncdcs, ncdc)
+        end = bisect_right(ncdcs, ncdc, begin)
+        return [
+            (columns['offset'][index], columns['line_count'][index])
+            for index in range(begin, end)]
@@ -7,19 +7,16 @@ Created on 22 Jun. 2021
 from datetimerange import DateTimeRange
 
 from library.misc_types import spherical_coordinate
+from library.date_ordinals import ordinal_datetime
 
-class StationLocation(object):
+class BaseStationLocation(object):
     '''
-    A value object to record 
-    the location of a weather station at a period of time.
+    The behaviour shared by every form of station location,
+    given a coordinate and a date range.
+    It has no slots of its own, so each form holds just its own fields.
     '''
 
-    def __init__(self, coordinate, date_range):
-        '''
-        Constructor
-        '''
-        self.coord = coordinate
-        self.date_range = date_range
+    __slots__ = ()
 
     def __repr__(self):
 
@@ -52,4 +49,102 @@ class StationLocation(object):
     def is_period_valid_after_period(self, prior_location) -> bool:
         period_start = self.date_range.start_datetime
         prior_period_end = prior_location.date_range.end_datetime
-        return  period_start >= prior_period_end
\ No newline at end of file
+        return  period_start >= prior_period_end
+
+    def has_same_period(self, other) -> bool:
+        return self.period() == other.period()
+
+
+class StationLocation(BaseStationLocation):
+    '''
+    A value object to record 
+    the location of a weather station at a period of time.
+    '''
+
+    # The instance dictionary is only made if an attribute
+    # other than a slot is set, as when mocking.
+    __slots__ = ('coord', 'date_range', '__dict__')
+
+    def __init__(self, coordinate, date_range):
+        '''
+        Constructor
+        '''
+        self.coord = coordinate
+        self.date_range = date_range
+
+
+class BaseOrdinalLocation(BaseStationLocation):
+    '''
+    The behaviour shared by the station locations with the period
+    stored compactly as two day ordinals, as for date.toordinal().
+    The date range is only constructed when asked for.
+    '''
+
+    __slots__ = ('start_ordinal', 'end_ordinal')
+
+    @property
+    def date_range(self) -> DateTimeRange:
+        return DateTimeRange(
+            ordinal_datetime(self.start_ordinal), 
+            ordinal_datetime(self.end_ordinal))
+
+    def is_valid_period(self) -> bool:
+        return self.start_ordinal <= self.end_ordinal
+
+    def is_period_valid_after_period(self, prior_location) -> bool:
+        if isinstance(prior_location, BaseOrdinalLocation):
+            return self.start_ordinal >= prior_location.end_ordinal
+        return super().is_period_valid_after_period(prior_location)
+
+    def has_same_period(self, other) -> bool:
+        if isinstance(other, BaseOrdinalLocation):
+            return self.start_ordinal == other.start_ordinal \
+                and self.end_ordinal == other.end_ordinal
+        return super().has_same_period(other)
+
+
+class OrdinalStationLocation(BaseOrdinalLocation):
+    '''
+    A station location with the period stored as two day ordinals.
+    '''
+
+    __slots__ = ('coord',)
+
+    def __init__(self, coordinate, start_ordinal: int, end_ordinal: int):
+        '''
+        Constructor
+        '''
+        self.coord = coordinate
+        self.start_ordinal = start_ordinal
+        self.end_ordinal = end_ordinal
+
+    def __reduce__(self):
+        return (OrdinalStationLocation, (self.coord, self.start_ordinal, self.end_ordinal))
+
+
+class CompactStationLocation(BaseOrdinalLocation):
+    '''
+    A station location with the coordinate also stored compactly, 
+    as two floats, or None for a missing latitude or longitude.
+    The coordinate and the date range are only constructed when asked for.
+    This is the form made by the loader for large files.
+    '''
+
+    __slots__ = ('latitude', 'longitude')
+
+    def __init__(self, latitude: float, longitude: float, start_ordinal: int, end_ordinal: int):
+        '''
+        Constructor
+        '''
+        self.latitude = latitude
+        self.longitude = longitude
+        self.start_ordinal = start_ordinal
+        self.end_ordinal = end_ordinal
+
+    def __reduce__(self):
+        return (CompactStationLocation, (
+            self.latitude, self.longitude, self.start_ordinal, self.end_ordinal))
+
+    @property
+    def coord(self) -> spherical_coordinate:
+        return spherical_coordinate(self.latitude, self.longitude)
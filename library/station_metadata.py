@@ -4,12 +4,21 @@ Created on 22 Jun. 2021
 @author: richardrothwell
 '''
 from datetime import datetime
-from datetimerange import DateTimeRange
 
-from library.station_location import StationLocation
+from library.station_location import BaseOrdinalLocation, OrdinalStationLocation
+from library.network_registry import NETWORK_REGISTRY
 
 FAR_FUTURE_DATE = datetime(9999, 12, 31)
 
+# (1, 1, 1) corresponds to the special value, 
+# 00010101 signifiying an unknown start date.
+ANCIENT_DATETIME = datetime(1, 1, 1)
+ANCIENT_LOCATION = OrdinalStationLocation(None, ANCIENT_DATETIME.toordinal(), ANCIENT_DATETIME.toordinal())
+FAR_FUTURE_ORDINAL = FAR_FUTURE_DATE.toordinal()
+
+# Marks a derived value that is yet to be computed.
+_UNKNOWN = object()
+
 class StationMetadata(object):
     '''
     A value object to record 
@@ -17,6 +26,22 @@ class StationMetadata(object):
     over a period of time.
     '''
 
+    # The instance dictionary is only made if an attribute
+    # other than a slot is set, such as one of the identifiers below.
+    __slots__ = (
+        'ncdc', 'name', '__locations', '__network_mask', '__country_code',
+        '__valid_periods', '__earliest_location', '__retired', '__dict__')
+
+    # The other station identifiers are not loaded,
+    # so they default to None without taking space per station.
+    COOP = None
+    WBAN = None
+    ICAO = None
+    FAA = None
+    NWSLI = None
+    WMO = None
+    TRANS = None
+    GHCND = None
 
     def __init__(self, ncdc, name = ''):
         '''
@@ -27,14 +52,6 @@ class StationMetadata(object):
         # Its was probably a database id.
         self.ncdc = ncdc
         self.name = name
-        self.COOP = None
-        self.WBAN = None
-        self.ICAO = None
-        self.FAA = None
-        self.NWSLI = None
-        self.WMO = None
-        self.TRANS = None
-        self.GHCND = None
         self.set_locations([])
         self.set_networks(set())
         self.set_country_code('')        
@@ -47,19 +64,42 @@ class StationMetadata(object):
 
     def set_locations(self, locations):
         self.__locations = locations
+        self.invalidate()
+
+    def invalidate(self):
+        '''
+        Forget the values derived from the locations.
+        This is done whenever the locations are changed by a method,
+        so call it after changing the locations list directly.
+        '''
+        self.__valid_periods = _UNKNOWN
+        self.__earliest_location = _UNKNOWN
+        self.__retired = _UNKNOWN
 
     def location_count(self):
         return len(self.locations)
     
+    # The networks are held as a bitmask 
+    # interned by the network registry.
+    # The network names are a shared frozenset, so change
+    # the networks by set_networks() or add_networks().
+
     @property
-    def networks(self):
-        return self.__networks        
+    def networks(self) -> frozenset:
+        return NETWORK_REGISTRY.names(self.__network_mask)
 
     def set_networks(self, networks):
-        self.__networks = networks
+        self.__network_mask = NETWORK_REGISTRY.mask(networks)
+
+    @property
+    def network_mask(self):
+        return self.__network_mask
+
+    def set_network_mask(self, network_mask):
+        self.__network_mask = network_mask
 
     def network_count(self):
-        return len(self.networks)
+        return bin(self.__network_mask).count('1')
 
     @property
     def country_code(self):
@@ -83,6 +123,27 @@ class StationMetadata(object):
             return False
         return other.ncdc != self.ncdc
 
+    def __getstate__(self):
+        # Bit positions differ between processes,
+        # so the networks are pickled by name.
+        attributes = self.__dict__
+        if not attributes:
+            # Reading the instance dict makes one, so drop it again.
+            del self.__dict__
+            attributes = None
+        return (
+            self.ncdc, self.name, self.locations, sorted(self.networks),
+            self.country_code, attributes)
+
+    def __setstate__(self, state):
+        self.ncdc, self.name, locations, networks, country_code, attributes = state
+        self.set_locations(locations)
+        self.set_networks(networks)
+        self.set_country_code(country_code)
+        # Only set identifiers need an instance dict.
+        if attributes:
+            self.__dict__.update(attributes)
+
     def dump(self):
         dump_str = str(self) + '\n'
         for location in self.locations:
@@ -95,20 +156,25 @@ class StationMetadata(object):
         # may be a correction to the previous record.
         if len(self.locations) > 0:
             previous_station = self.locations[-1]
-            if station_location.period() == previous_station.period():
+            if station_location.has_same_period(previous_station):
                 self.locations.pop()
         self.locations.append(station_location)
+        self.invalidate()
        
     def add_networks(self, networks):
-        for network in networks:
-            self.networks.add(network)
+        self.__network_mask |= NETWORK_REGISTRY.mask(networks)
         
+    # The derived values are computed once, 
+    # until the locations are changed.
+
     def is_valid_periods(self) -> bool:
+        if self.__valid_periods is _UNKNOWN:
+            self.__valid_periods = self._check_periods()
+        return self.__valid_periods
+
+    def _check_periods(self) -> bool:
         result = True
-        # (1, 1, 1, 0, 0, 0) corresponds to the
-        # special value, 00010101 signifiying an unknown start date.
-        ancient_date_range = DateTimeRange(datetime(1, 1, 1, 0, 0, 0), datetime(1, 1, 1, 0, 0, 0))
-        prior_location = StationLocation(None, ancient_date_range)
+        prior_location = ANCIENT_LOCATION
         for location in self.locations:
             if not location.is_valid_period() or not location.is_period_valid_after_period(prior_location):
                 result = False
@@ -118,27 +184,47 @@ class StationMetadata(object):
     
     def sort_locations_by_start_date(self):
         self.locations.sort(key=lambda x: x.period().start_datetime, reverse=False)
+        self.invalidate()
         
     def earliest_location(self):
         '''
         Searches list of locations for earliest actual start date.
         Assumes locations list is already sorted earlest to latest.
         '''
+        if self.__earliest_location is _UNKNOWN:
+            self.__earliest_location = self._find_earliest_location()
+        return self.__earliest_location
+
+    def _find_earliest_location(self):
         found_location = None
-        # Special date signifying thay there is no known start date
-        # for the location.
-        ancient_datetime = datetime(1,1,1)
         for location in self.locations:
+            if isinstance(location, BaseOrdinalLocation):
+                # Compare the ordinals without making the period.
+                if location.start_ordinal != ANCIENT_LOCATION.start_ordinal:
+                    found_location = location
+                    break
+                continue
+            # Special date signifying thay there is no known start date
+            # for the location.
             if location.period() \
                 and location.period().start_datetime \
-                and location.period().start_datetime  != ancient_datetime:
+                and location.period().start_datetime  != ANCIENT_DATETIME:
                 
                 found_location = location
                 break;
         return found_location
     
     def is_retired_station(self):
+        if self.__retired is _UNKNOWN:
+            self.__retired = self._check_retired()
+        return self.__retired
+
+    def _check_retired(self):
         is_retired = True
         if  len(self.locations) > 0:       
-            is_retired = self.locations[-1].period().end_datetime != FAR_FUTURE_DATE
+            last_location = self.locations[-1]
+            if isinstance(last_location, BaseOrdinalLocation):
+                is_retired = last_location.end_ordinal != FAR_FUTURE_ORDINAL
+            else:
+                is_retired = last_location.period().end_datetime != FAR_FUTURE_DATE
         return is_retired
\ No newline at end of file
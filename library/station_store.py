@@ -0,0 +1,526 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import math
+from array import array
+from datetime import date
+
+import numpy as np
+
+from library.station_table import StationTable
+from library.station_metadata import StationMetadata
+from library.station_location import BaseOrdinalLocation, CompactStationLocation
+from library.date_ordinals import UNKNOWN_START_ORDINAL, STILL_OPEN_ORDINAL
+from library.network_registry import NETWORK_REGISTRY
+from library.interval_index import IntervalIndex
+from library.spatial_index import SpatialIndex
+from library.relocation_table import RelocationTable
+from library.geodesy import haversine_km
+from library.lat_lon_grid import LatLonGrid, GridOccupancy
+from library.duplicate_detector import DuplicateDetector
+
+
+# The numpy datetime units of the time series resolutions.
+RESOLUTION_UNITS = {'day': 'D', 'month': 'M', 'year': 'Y'}
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class StationStore(StationTable):
+    '''
+    A column-oriented store of every station history,
+    laid out as for a station table,
+    that also keeps the station names and networks.
+    So a store can stand in for a list of station metadata records
+    while aggregate queries run over whole arrays.
+
+    Names are interned in a table indexed by the per-station name indices.
+    Networks are held as per-station bitmasks, as for the metadata records.
+    Station metadata records are only made on demand,
+    by station() or by iterating over the store.
+    '''
+
+    def __init__(
+            self,
+            ncdcs: np.ndarray,
+            country_codes: np.ndarray,
+            location_offsets: np.ndarray,
+            start_ordinals: np.ndarray,
+            end_ordinals: np.ndarray,
+            latitudes: np.ndarray,
+            longitudes: np.ndarray,
+            names: list,
+            name_indices: np.ndarray,
+            network_masks: np.ndarray):
+        '''
+        Constructor
+        '''
+        super().__init__(
+            ncdcs, country_codes, location_offsets,
+            start_ordinals, end_ordinals, latitudes, longitudes)
+        self.names = names
+        self.name_indices = name_indices
+        self.network_masks = network_masks
+        self._interval_index = None
+        self._spatial_index = None
+        # Keyed by cell size.
+        self._location_cells = dict()
+        # Keyed by cell size and years.
+        self._grid_occupancies = dict()
+
+    @classmethod
+    def from_metadatas(cls, metadatas):
+        '''
+        Build a store in one pass over any iterable
+        of station metadata records, such as LoadEMSHRLite.iter_stations().
+        '''
+        ncdcs = array('q')
+        country_codes = []
+        location_offsets = array('q', [0])
+        start_ordinals = array('i')
+        end_ordinals = array('i')
+        latitudes = array('d')
+        longitudes = array('d')
+        name_indices = array('I')
+        network_masks = []
+        names = dict()
+
+        for metadata in metadatas:
+            ncdcs.append(metadata.ncdc)
+            country_codes.append(metadata.country_code)
+            name_indices.append(names.setdefault(metadata.name, len(names)))
+            network_masks.append(metadata.network_mask)
+            for location in metadata.locations:
+                if isinstance(location, CompactStationLocation):
+                    latitude, longitude = location.latitude, location.longitude
+                else:
+                    coordinate = location.coordinate()
+                    latitude = coordinate.latitude if coordinate else None
+                    longitude = coordinate.longitude if coordinate else None
+                latitudes.append(math.nan if latitude is None else latitude)
+                longitudes.append(math.nan if longitude is None else longitude)
+                if isinstance(location, BaseOrdinalLocation):
+                    start_ordinals.append(location.start_ordinal)
+                    end_ordinals.append(location.end_ordinal)
+                else:
+                    period = location.period()
+                    start_ordinals.append(period.start_datetime.toordinal())
+                    end_ordinals.append(period.end_datetime.toordinal())
+            location_offsets.append(len(start_ordinals))
+
+        return cls(
+            np.array(ncdcs, dtype=np.int64),
+            np.array(country_codes, dtype='U'),
+            np.array(location_offsets, dtype=np.int64),
+            np.array(start_ordinals, dtype=np.int32),
+            np.array(end_ordinals, dtype=np.int32),
+            np.array(latitudes, dtype=np.float64),
+            np.array(longitudes, dtype=np.float64),
+            list(names),
+            np.array(name_indices, dtype=np.uint32),
+            np.array(network_masks, dtype=NETWORK_REGISTRY.mask_dtype()))
+
+    def __len__(self) -> int:
+        return self.station_count()
+
+    def __iter__(self):
+        for station_index in range(self.station_count()):
+            yield self.station(station_index)
+
+    def station(self, station_index: int) -> StationMetadata:
+        '''
+        A station metadata record for one station,
+        made from the columns of the store.
+        '''
+        metadata = StationMetadata(
+            int(self.ncdcs[station_index]), self.names[self.name_indices[station_index]])
+        metadata.set_country_code(str(self.country_codes[station_index]))
+        metadata.set_network_mask(int(self.network_masks[station_index]))
+        locations = []
+        for index in range(
+                self.location_offsets[station_index], self.location_offsets[station_index + 1]):
+            latitude = self.latitudes[index]
+            longitude = self.longitudes[index]
+            locations.append(CompactStationLocation(
+                None if math.isnan(latitude) else float(latitude),
+                None if math.isnan(longitude) else float(longitude),
+                int(self.start_ordinals[index]), int(self.end_ordinals[index])))
+        metadata.set_locations(locations)
+        return metadata
+
+    def select(self, station_indices: np.ndarray):
+        '''
+        A store of just the stations with the given indices, in that order.
+        '''
+        station_indices = np.asarray(station_indices, dtype=np.int64)
+        counts = self.location_counts()[station_indices]
+        location_offsets = np.zeros(len(station_indices) + 1, dtype=np.int64)
+        np.cumsum(counts, out=location_offsets[1:])
+        # The location indices of each station follow on from its first location.
+        location_indices = np.repeat(
+            self.location_offsets[station_indices] - location_offsets[:-1], counts) \
+            + np.arange(location_offsets[-1])
+        return StationStore(
+            self.ncdcs[station_indices],
+            self.country_codes[station_indices],
+            location_offsets,
+            self.start_ordinals[location_indices],
+            self.end_ordinals[location_indices],
+            self.latitudes[location_indices],
+            self.longitudes[location_indices],
+            self.names,
+            self.name_indices[station_indices],
+            self.network_masks[station_indices])
+
+    def interval_index(self) -> IntervalIndex:
+        '''
+        The index of the location periods, made on first use.
+        '''
+        if self._interval_index is None:
+            self._interval_index = IntervalIndex(self.start_ordinals, self.end_ordinals)
+        return self._interval_index
+
+    def stations_active_between(self, begin: date, end: date) -> np.ndarray:
+        '''
+        The indices of the stations with a location period 
+        overlapping the dates from begin to end inclusive.
+        The periods are taken as given, so a period with 
+        an unknown start date begins at the earliest date.
+        '''
+        locations = self.interval_index().overlapping(begin.toordinal(), end.toordinal())
+        return np.unique(self.location_stations()[locations])
+
+    def stations_active_on(self, day: date) -> np.ndarray:
+        return self.stations_active_between(day, day)
+
+    def spatial_index(self) -> SpatialIndex:
+        '''
+        The index of the location coordinates, 
+        grouped by station, made on first use.
+        '''
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(
+                self.latitudes, self.longitudes, self.location_stations(),
+                self.start_ordinals, self.end_ordinals)
+        return self._spatial_index
+
+    def stations_within(
+            self, 
+            latitude: float, 
+            longitude: float, 
+            radius_km: float, 
+            begin: date=None, 
+            end: date=None) -> tuple:
+        '''
+        The indices of the stations with a location within the radius
+        of the coordinate, and the distance in km to the nearest
+        location of each, nearest first.
+        When a begin date is given, just the locations active 
+        from that date to the end date, by default the same date, count.
+        '''
+        return self.spatial_index().within(
+            latitude, longitude, radius_km, *self._ordinal_range(begin, end))
+
+    def nearest_stations(
+            self, 
+            latitude: float, 
+            longitude: float, 
+            count: int=10, 
+            begin: date=None, 
+            end: date=None) -> tuple:
+        '''
+        The indices of the nearest stations to the coordinate,
+        and the distance in km to each, nearest first.
+        The dates are as for stations_within().
+        '''
+        return self.spatial_index().nearest(
+            latitude, longitude, count, *self._ordinal_range(begin, end))
+
+    def _ordinal_range(self, begin: date, end: date) -> tuple:
+        if begin is None:
+            return None, None
+        return begin.toordinal(), (end if end is not None else begin).toordinal()
+
+    def relocations(self) -> RelocationTable:
+        '''
+        The distance and elapsed time between each pair of consecutive
+        locations of every station, in one pass over the columns.
+        '''
+        location_stations = self.location_stations()
+        # Pairs within a station, indexed by the later location.
+        later = np.flatnonzero(location_stations[1:] == location_stations[:-1]) + 1
+        earlier = later - 1
+        distances = haversine_km(
+            self.latitudes[earlier], self.longitudes[earlier],
+            self.latitudes[later], self.longitudes[later])
+        starts = self.start_ordinals
+        known = (starts[earlier] != UNKNOWN_START_ORDINAL) & (starts[later] != UNKNOWN_START_ORDINAL)
+        elapsed = np.where(
+            known, starts[later].astype(np.float64) - starts[earlier], np.nan)
+        station_indices = location_stations[later]
+        return RelocationTable(
+            station_indices, self.ncdcs[station_indices], later, distances, elapsed)
+
+    def duplicate_clusters(self, tolerance_degrees: float=0.0001, min_overlap: float=0.0) -> list:
+        '''
+        The clusters of stations with distinct NCDC ids
+        that may be the same site, with near locations over
+        overlapping periods, the best scoring first.
+        '''
+        return DuplicateDetector(tolerance_degrees, min_overlap).clusters(self)
+
+    def location_ncdcs(self) -> np.ndarray:
+        '''
+        The NCDC of the station of every location.
+        '''
+        return self.ncdcs[self.location_stations()]
+
+    def country_indices(self) -> tuple:
+        '''
+        The distinct country codes and the index
+        into those codes of the country of every location.
+        '''
+        codes, station_indices = np.unique(self.country_codes, return_inverse=True)
+        return codes, station_indices[self.location_stations()]
+
+    def valid_periods(self) -> np.ndarray:
+        '''
+        A mask of the stations with valid periods,
+        as for StationMetadata.is_valid_periods().
+        Each period must not be inverted, and must not
+        begin before the end of the previous period of the station.
+        '''
+        starts = self.start_ordinals
+        ends = self.end_ordinals
+        valid = starts <= ends
+        valid[1:] &= starts[1:] >= ends[:-1]
+        # The first period of a station follows the unknown start date.
+        first_locations = self.location_offsets[:-1][self.location_counts() > 0]
+        valid[first_locations] = starts[first_locations] <= ends[first_locations]
+        invalid_counts = np.bincount(
+            self.location_stations()[~valid], minlength=self.station_count())
+        return invalid_counts == 0
+
+    def retired(self) -> np.ndarray:
+        '''
+        A mask of the retired stations, as for StationMetadata.is_retired_station().
+        A station without locations counts as retired.
+        '''
+        retired = np.ones(self.station_count(), dtype=bool)
+        located = self.location_counts() > 0
+        last_locations = self.location_offsets[1:][located] - 1
+        retired[located] = self.end_ordinals[last_locations] != STILL_OPEN_ORDINAL
+        return retired
+
+    def earliest_station_index(self) -> int:
+        '''
+        The index of the station with the earliest known start date,
+        as for Collector.earliest_station(), taking the first location
+        of each station with a known start date.
+        Returns None if no station has a known start date.
+        '''
+        known = self.start_ordinals != UNKNOWN_START_ORDINAL
+        known_stations = self.location_stations()[known]
+        if len(known_stations) == 0:
+            return None
+        stations, first_known = np.unique(known_stations, return_index=True)
+        first_starts = self.start_ordinals[known][first_known]
+        return int(stations[np.argmin(first_starts)])
+
+    def network_mask(self) -> int:
+        '''
+        The union of the networks of all of the stations, as a bitmask.
+        '''
+        if len(self.network_masks) == 0:
+            return 0
+        return int(np.bitwise_or.reduce(self.network_masks))
+
+    def available_networks(self) -> set:
+        return set(NETWORK_REGISTRY.names(self.network_mask()))
+
+    def _network_bit(self, network: str):
+        '''
+        The bit of the network in the type of the masks, or None if no
+        station of the store can be in it. A query does not register 
+        the network, and a network registered after the store was built
+        may be beyond the bits of its masks.
+        '''
+        position = NETWORK_REGISTRY.find(network)
+        dtype = self.network_masks.dtype
+        if position is None or (dtype != object and position >= dtype.itemsize * 8):
+            return None
+        return dtype.type(1 << position)
+
+    def in_network(self, network: str) -> np.ndarray:
+        '''
+        A mask of the stations in the network.
+        '''
+        bit = self._network_bit(network)
+        if bit is None:
+            return np.zeros(self.station_count(), dtype=bool)
+        return (self.network_masks & bit) != 0
+
+    def network_counts(self) -> dict:
+        '''
+        The number of stations in each network, keyed by network name.
+        '''
+        return dict(
+            (network, int(np.count_nonzero(self.in_network(network))))
+            for network in sorted(self.available_networks()))
+
+    def _period_numbers(self, ordinals: np.ndarray, unit: str) -> np.ndarray:
+        '''
+        The number of the day, month or year of each day ordinal,
+        counted from the start of 1970.
+        '''
+        days = (np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL).astype('datetime64[D]')
+        return days.astype(f'datetime64[{unit}]').astype(np.int64)
+
+    def _active_spans(
+            self, unit: str, begin_ordinal: int, end_ordinal: int, keys: np.ndarray=None) -> tuple:
+        '''
+        The keys, by default the stations, and their spans of active periods, 
+        as inclusive period numbers, with the overlapping or abutting spans 
+        of each key merged, so no key is counted twice in a period.
+        Locations with a negative key are passed over.
+        '''
+        keys = keys if keys is not None else self.location_stations()
+        starts = self.start_ordinals
+        # Still open locations are active until the end of the series.
+        ends = np.minimum(self.end_ordinals, end_ordinal)
+        # The active span of a location with an unknown start is not known.
+        kept = (starts != UNKNOWN_START_ORDINAL) & (starts <= ends) \
+            & (starts <= end_ordinal) & (ends >= begin_ordinal) & (keys >= 0)
+        keys = keys[kept]
+        span_starts = self._period_numbers(np.maximum(starts[kept], begin_ordinal), unit)
+        span_ends = self._period_numbers(ends[kept], unit)
+        if len(keys) == 0:
+            return keys, span_starts, span_ends
+
+        order = np.lexsort((span_starts, keys))
+        keys = keys[order]
+        span_starts = span_starts[order]
+        span_ends = span_ends[order]
+        new_keys = np.ones(len(keys), dtype=bool)
+        new_keys[1:] = keys[1:] != keys[:-1]
+        # The running latest end for each key, by a running maximum
+        # over the ends offset by a multiple of the rank of the key.
+        base = span_starts.min()
+        width = int(span_ends.max() - base) + 1
+        offsets = np.cumsum(new_keys, dtype=np.int64) * width
+        latest_ends = np.maximum.accumulate(span_ends - base + offsets) - offsets + base
+        new_spans = new_keys
+        new_spans[1:] |= span_starts[1:] > latest_ends[:-1]
+        first_indices = np.flatnonzero(new_spans)
+        last_indices = np.append(first_indices[1:], len(keys)) - 1
+        return keys[first_indices], span_starts[first_indices], latest_ends[last_indices]
+
+    def _series_range(self, begin: date, end: date) -> tuple:
+        '''
+        The day ordinals of the range of a time series, by default
+        from the earliest known start date to today.
+        '''
+        end_ordinal = (end if end is not None else date.today()).toordinal()
+        if begin is not None:
+            return begin.toordinal(), end_ordinal
+        known_starts = self.start_ordinals[self.start_ordinals != UNKNOWN_START_ORDINAL]
+        begin_ordinal = int(known_starts.min()) if len(known_starts) > 0 else end_ordinal
+        return begin_ordinal, end_ordinal
+
+    def active_station_counts(
+            self, 
+            resolution: str='year', 
+            begin: date=None, 
+            end: date=None,
+            group_by: str=None) -> tuple:
+        '''
+        Count the active stations in each day, month or year,
+        by a sweep over the starts and ends of the active spans.
+
+        The series runs from the begin date, by default the earliest 
+        known start date, to the end date, by default today.
+        Locations with the unknown start date are not counted,
+        and the still open locations are active to the end of the series.
+        
+        Returns the periods, as numpy datetimes of the resolution, 
+        and the counts, or when grouped by 'country' or 'network' a 
+        dictionary of the counts keyed by country code or network name.
+        '''
+        unit = RESOLUTION_UNITS[resolution]
+        begin_ordinal, end_ordinal = self._series_range(begin, end)
+        first_period, last_period = self._period_numbers([begin_ordinal, end_ordinal], unit)
+        period_count = max(int(last_period - first_period) + 1, 0)
+        periods = np.arange(first_period, first_period + period_count).astype(f'datetime64[{unit}]')
+        stations, span_starts, span_ends = self._active_spans(unit, begin_ordinal, end_ordinal)
+
+        def sweep(selected: np.ndarray) -> np.ndarray:
+            # One event as each span starts and one after each span ends.
+            changes = np.bincount(
+                span_starts[selected] - first_period, minlength=period_count + 1) \
+                - np.bincount(span_ends[selected] - first_period + 1, minlength=period_count + 1)
+            return np.cumsum(changes)[0:period_count]
+
+        if group_by is None:
+            return periods, sweep(np.ones(len(stations), dtype=bool))
+        if group_by == 'country':
+            codes, country_indices = np.unique(self.country_codes, return_inverse=True)
+            span_countries = country_indices[stations]
+            return periods, dict(
+                (str(code), sweep(span_countries == index)) for index, code in enumerate(codes))
+        if group_by == 'network':
+            return periods, dict(
+                (network, sweep(self.in_network(network)[stations]))
+                for network in sorted(self.available_networks()))
+        raise ValueError(f"Unknown grouping: {group_by}")
+
+    def location_cells(self, grid: LatLonGrid) -> np.ndarray:
+        '''
+        The grid cell of every location, or -1 if it has no coordinates,
+        kept for each cell size.
+        '''
+        cells = self._location_cells.get(grid.cell_degrees)
+        if cells is None:
+            cells = grid.cell_indices(self.latitudes, self.longitudes)
+            self._location_cells[grid.cell_degrees] = cells
+        return cells
+
+    def grid_occupancy(
+            self, cell_degrees: float=5.0, begin: date=None, end: date=None) -> GridOccupancy:
+        '''
+        The number of active stations in each cell of a latitude/longitude
+        grid in each year, by a sweep over the active spans of each
+        station in each cell. The years and the sentinel dates are as 
+        for active_station_counts(). The occupancy is kept, 
+        so a repeated query costs nothing.
+        '''
+        begin_ordinal, end_ordinal = self._series_range(begin, end)
+        key = (cell_degrees, begin_ordinal, end_ordinal)
+        occupancy = self._grid_occupancies.get(key)
+        if occupancy is not None:
+            return occupancy
+
+        grid = LatLonGrid(cell_degrees)
+        cells = self.location_cells(grid)
+        first_year, last_year = self._period_numbers([begin_ordinal, end_ordinal], 'Y')
+        year_count = max(int(last_year - first_year) + 1, 0)
+        cell_count = grid.cell_count()
+        # The spans of each station in each cell.
+        keys = np.where(
+            cells >= 0, self.location_stations().astype(np.int64) * cell_count + cells, -1)
+        keys, span_starts, span_ends = self._active_spans('Y', begin_ordinal, end_ordinal, keys)
+        span_cells = keys % cell_count
+        row_width = year_count + 1
+        changes = np.bincount(
+            span_cells * row_width + span_starts - first_year, 
+            minlength=cell_count * row_width) \
+            - np.bincount(
+                span_cells * row_width + span_ends - first_year + 1,
+                minlength=cell_count * row_width)
+        counts = np.cumsum(changes.reshape(cell_count, row_width), axis=1)[:, 0:year_count]
+        years = np.arange(first_year, first_year + year_count) + 1970
+        occupancy = GridOccupancy(grid, years, counts)
+        self._grid_occupancies[key] = occupancy
+        return occupancy
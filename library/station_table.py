@@ -0,0 +1,63 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+
+class StationTable(object):
+    '''
+    A column-oriented representation of the station metadata
+    records in an EMSHR Lite file.
+
+    Per-station arrays are indexed by station.
+    Per-location arrays are indexed by location, with the
+    locations of station i held between location_offsets[i]
+    and location_offsets[i + 1].
+    Periods are day ordinals, as for date.toordinal().
+    Missing coordinates are NaN.
+    '''
+
+    def __init__(
+            self,
+            ncdcs: np.ndarray,
+            country_codes: np.ndarray,
+            location_offsets: np.ndarray,
+            start_ordinals: np.ndarray,
+            end_ordinals: np.ndarray,
+            latitudes: np.ndarray,
+            longitudes: np.ndarray):
+        '''
+        Constructor
+        '''
+        # Per station.
+        self.ncdcs = ncdcs
+        self.country_codes = country_codes
+        self.location_offsets = location_offsets
+        # Per location.
+        self.start_ordinals = start_ordinals
+        self.end_ordinals = end_ordinals
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+
+    def station_count(self) -> int:
+        return len(self.ncdcs)
+
+    def location_count(self) -> int:
+        return len(self.start_ordinals)
+
+    def location_counts(self) -> np.ndarray:
+        return np.diff(self.location_offsets)
+
+    def location_slice(self, station_index: int) -> slice:
+        return slice(
+            self.location_offsets[station_index],
+            self.location_offsets[station_index + 1])
+
+    def location_stations(self) -> np.ndarray:
+        '''
+        The station index of every location.
+        '''
+        return np.repeat(np.arange(self.station_count()), self.location_counts())
@@ -0,0 +1,238 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import logging
+from abc import ABC, abstractmethod
+
+from library.station_metadata import StationMetadata
+from library.network_registry import NETWORK_REGISTRY
+
+
+class Accumulator(ABC):
+    '''
+    Abstract base class for the accumulator of one statistic
+    over a sequence of station metadata records.
+    Each record is given to update(), the accumulators of
+    parts of the sequence may be combined by merge(),
+    and finalize() gives the value of the statistic,
+    or None if there is no value.
+    '''
+
+    key = None
+
+    @abstractmethod
+    def update(self, metadata: StationMetadata):
+        pass
+
+    @abstractmethod
+    def merge(self, other):
+        pass
+
+    @abstractmethod
+    def finalize(self):
+        pass
+
+
+class StationCountAccumulator(Accumulator):
+
+    key = 'station_count'
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.count = 0
+
+    def update(self, metadata: StationMetadata):
+        self.count += 1
+
+    def merge(self, other):
+        self.count += other.count
+
+    def finalize(self) -> int:
+        return self.count
+
+
+class LocationCountAccumulator(Accumulator):
+
+    key = 'location_count'
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.count = 0
+
+    def update(self, metadata: StationMetadata):
+        self.count += metadata.location_count()
+
+    def merge(self, other):
+        self.count += other.count
+
+    def finalize(self) -> int:
+        return self.count
+
+
+class ValidPeriodAccumulator(Accumulator):
+    '''
+    Counts the stations with valid periods,
+    and logs each station with invalid periods as a numbered failure.
+    '''
+
+    key = 'valid_period_count'
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.count = 0
+        self.failure_count = 0
+
+    def update(self, metadata: StationMetadata):
+        if metadata.is_valid_periods():
+            self.count += 1
+        else:
+            logger = logging.getLogger(__name__)
+            self.failure_count += 1
+            dump = metadata.dump()
+            logger.warning(
+                f"Failure: {self.failure_count} - \nMetadata: {dump}")
+
+    def merge(self, other):
+        self.count += other.count
+        self.failure_count += other.failure_count
+
+    def finalize(self) -> int:
+        return self.count
+
+
+class EarliestStationAccumulator(Accumulator):
+    '''
+    Keeps the station with the earliest location start date,
+    the first such station on a tie.
+    The dump of the station is None if no station has a location.
+    '''
+
+    key = 'earliest_station'
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.station = None
+        self.start_datetime = None
+
+    def update(self, metadata: StationMetadata):
+        earliest_location = metadata.earliest_location()
+        if earliest_location:
+            start_datetime = earliest_location.period().start_datetime
+            if self.start_datetime is None or start_datetime < self.start_datetime:
+                self.station = metadata
+                self.start_datetime = start_datetime
+
+    def merge(self, other):
+        if other.start_datetime is not None and \
+                (self.start_datetime is None or other.start_datetime < self.start_datetime):
+            self.station = other.station
+            self.start_datetime = other.start_datetime
+
+    def finalize(self) -> str:
+        return self.station.dump() if self.station is not None else None
+
+
+class RetiredStationAccumulator(Accumulator):
+
+    key = 'retired_station_count'
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.count = 0
+
+    def update(self, metadata: StationMetadata):
+        if metadata.is_retired_station():
+            self.count += 1
+
+    def merge(self, other):
+        self.count += other.count
+
+    def finalize(self) -> int:
+        return self.count
+
+
+class NetworkAccumulator(Accumulator):
+    '''
+    Combines the network bitmasks of the stations,
+    giving the sorted network names.
+    '''
+
+    key = 'available_networks'
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.network_mask = 0
+
+    def update(self, metadata: StationMetadata):
+        self.network_mask |= metadata.network_mask
+
+    def merge(self, other):
+        self.network_mask |= other.network_mask
+
+    def finalize(self) -> str:
+        return ', '.join(sorted(NETWORK_REGISTRY.names(self.network_mask)))
+
+
+class StatisticsAccumulator(object):
+    '''
+    Updates a set of accumulators together in a single pass
+    over the station metadata records, giving a statistics dictionary
+    keyed as for the Reporter.
+    By default it has an accumulator for each reported statistic.
+    '''
+
+    def __init__(self, accumulators: list=None):
+        '''
+        Constructor
+        '''
+        self.accumulators = accumulators if accumulators is not None else [
+            StationCountAccumulator(),
+            LocationCountAccumulator(),
+            ValidPeriodAccumulator(),
+            EarliestStationAccumulator(),
+            RetiredStationAccumulator(),
+            NetworkAccumulator()]
+
+    def update(self, metadata: StationMetadata):
+        for accumulator in self.accumulators:
+            accumulator.update(metadata)
+
+    def update_all(self, metadatas):
+        '''
+        Update the accumulators with any iterable of metadata records.
+        '''
+        updates = [accumulator.update for accumulator in self.accumulators]
+        for metadata in metadatas:
+            for update in updates:
+                update(metadata)
+        return self
+
+    def merge(self, other):
+        for accumulator, other_accumulator in zip(self.accumulators, other.accumulators):
+            accumulator.merge(other_accumulator)
+
+    def finalize(self) -> dict:
+        '''
+        The statistics, omitting any statistic without a value.
+        '''
+        statistics = dict()
+        for accumulator in self.accumulators:
+            value = accumulator.finalize()
+            if value is not None:
+                statistics[accumulator.key] = value
+        return statistics
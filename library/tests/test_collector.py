@@ -4,13 +4,16 @@ Created on 22 Jun. 2021
 @author: richardrothwell
 '''
 
-from datetime import datetime
+import logging
+from datetime import date, datetime
 from datetimerange import DateTimeRange
 
 from library.configuration import Configuration
 from library.collector import Collector
 from library.station_metadata import StationMetadata
 from library.station_location import StationLocation
+from library.station_store import StationStore
+from library.misc_types import spherical_coordinate
 
 
 def test_construction():
@@ -24,37 +27,50 @@ def test_construction():
     assert collector.date_range is None
     assert collector.country_code is None
 
+
+def test_construction_with_date_range(mocker):
+
+    configuration = mocker.MagicMock(date_range=('19500101', '19591231'))
+
+    collector = Collector(configuration)
+
+    assert collector.date_range == (date(1950, 1, 1), date(1959, 12, 31))
+
     
 def test_collect_statistics_when_no_metadata(mocker):
     
     metadatas = []
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
     
     statistics = collector.collect_statistics(metadatas)
         
-    assert statistics['station_count'] == 0
-    assert statistics['location_count'] == 0
+    # There is no earliest station.
+    assert statistics == {
+        'station_count': 0,
+        'location_count': 0,
+        'valid_period_count': 0,
+        'retired_station_count': 0,
+        'available_networks': ''}
 
     
 def test_collect_statistics_when_one_metadata(mocker):
     
     metadatas = [StationMetadata(0)]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
     
     statistics = collector.collect_statistics(metadatas)
         
-    assert statistics['station_count'] == 1
-    assert statistics['location_count'] == 0
+    # A station without locations has no earliest location.
+    assert statistics == {
+        'station_count': 1,
+        'location_count': 0,
+        'valid_period_count': 1,
+        'retired_station_count': 1,
+        'available_networks': ''}
 
     
 def test_collect_statistics_when_one_metadata_one_location(mocker):
@@ -63,20 +79,19 @@ def test_collect_statistics_when_one_metadata_one_location(mocker):
     location = StationLocation(None, None)
     metadata.add_location(location)
 
+    mocker.patch.object(metadata, 'is_retired_station',
+                        autospec=True, return_value=False)
+
     metadatas = [metadata]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
-    mocker.patch.object(collector, 'retired_station_count',
-                        autospec=True, return_value=0)
    
     statistics = collector.collect_statistics(metadatas)
         
     assert statistics['station_count'] == 1
     assert statistics['location_count'] == 1
+    assert statistics['retired_station_count'] == 0
 
     
 def test_collect_statistics_when_two_metadatas_two_locations(mocker):
@@ -89,20 +104,20 @@ def test_collect_statistics_when_two_metadatas_two_locations(mocker):
     location1 = StationLocation(None, None)
     metadata1.add_location(location1)
 
+    for metadata in [metadata0, metadata1]:
+        mocker.patch.object(metadata, 'is_retired_station',
+                            autospec=True, return_value=True)
+
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
-    mocker.patch.object(collector, 'retired_station_count',
-                        autospec=True, return_value=2)
 
     statistics = collector.collect_statistics(metadatas)
         
     assert statistics['station_count'] == 2
     assert statistics['location_count'] == 2
+    assert statistics['retired_station_count'] == 2
 
     
 def test_collect_statistics_when_two_metadatas_three_locations(mocker):
@@ -131,16 +146,16 @@ def test_collect_statistics_when_two_metadatas_three_locations(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
 
     statistics = collector.collect_statistics(metadatas)
         
     assert statistics['station_count'] == 2
     assert statistics['location_count'] == 3
+    assert statistics['valid_period_count'] == 2
+    assert statistics['earliest_station'] == metadata0.dump()
+    assert statistics['retired_station_count'] == 2
 
     
 def test_collect_statistics_calls_metadata_zero_location_count(mocker):
@@ -159,11 +174,8 @@ def test_collect_statistics_calls_metadata_zero_location_count(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
 
     statistics = collector.collect_statistics(metadatas)
     
@@ -171,6 +183,7 @@ def test_collect_statistics_calls_metadata_zero_location_count(mocker):
     metadata1.location_count.assert_called_once()
         
     assert statistics['location_count'] == 0
+    assert statistics['valid_period_count'] == 2
     
 def test_collect_statistics_calls_metadata_location_count(mocker):
 
@@ -188,11 +201,8 @@ def test_collect_statistics_calls_metadata_location_count(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
 
     statistics = collector.collect_statistics(metadatas)
     
@@ -200,6 +210,7 @@ def test_collect_statistics_calls_metadata_location_count(mocker):
     metadata1.location_count.assert_called_once()
         
     assert statistics['location_count'] == 5
+    assert statistics['valid_period_count'] == 0
 
     
 def test_collect_statistics_calls_metadata_is_no_valid_periods(mocker):
@@ -222,16 +233,13 @@ def test_collect_statistics_calls_metadata_is_no_valid_periods(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
 
     statistics = collector.collect_statistics(metadatas)
     
-    assert metadata0.is_valid_periods.call_count == 2
-    assert metadata1.is_valid_periods.call_count == 2
+    metadata0.is_valid_periods.assert_called_once()
+    metadata1.is_valid_periods.assert_called_once()
 
     metadata0.dump.assert_called_once()
     metadata1.dump.assert_called_once()
@@ -258,16 +266,13 @@ def test_collect_statistics_calls_metadata_is_one_valid_periods(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
 
     statistics = collector.collect_statistics(metadatas)
     
-    assert metadata0.is_valid_periods.call_count == 2
-    assert metadata1.is_valid_periods.call_count == 2
+    metadata0.is_valid_periods.assert_called_once()
+    metadata1.is_valid_periods.assert_called_once()
 
     metadata0.dump.assert_called_once()
     metadata1.dump.assert_not_called()
@@ -295,16 +300,13 @@ def test_collect_statistics_calls_metadata_is_all_valid_periods(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
 
     statistics = collector.collect_statistics(metadatas)
     
-    assert metadata0.is_valid_periods.call_count == 2
-    assert metadata1.is_valid_periods.call_count == 2
+    metadata0.is_valid_periods.assert_called_once()
+    metadata1.is_valid_periods.assert_called_once()
 
     metadata0.dump.assert_not_called()
     metadata1.dump.assert_not_called()
@@ -312,7 +314,7 @@ def test_collect_statistics_calls_metadata_is_all_valid_periods(mocker):
     assert statistics['valid_period_count'] == 2
 
     
-def test_collect_statistics_calls_metadata_dump_once(mocker):
+def test_collect_statistics_calls_metadata_dump_once(mocker, caplog):
    
     metadata0 = StationMetadata(0)
     mocker.patch.object(metadata0, 'location_count',
@@ -332,47 +334,41 @@ def test_collect_statistics_calls_metadata_dump_once(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
      
-    collector.collect_statistics(metadatas)
+    with caplog.at_level(logging.WARNING, logger='library.statistic_accumulators'):
+        statistics = collector.collect_statistics(metadatas)
     
     metadata0.dump.assert_called_once()
     metadata1.dump.assert_called_once()
+    assert [record.getMessage() for record in caplog.records] == [
+        'Failure: 1 - \nMetadata: dump0', 'Failure: 2 - \nMetadata: dump1']
+    assert statistics['valid_period_count'] == 0
 
     
-def test_collect_statistics_calls_earliest_station(mocker):
-   
+def test_collect_statistics_finds_earliest_station(mocker):
+
     metadata0 = StationMetadata(0)
-    mocker.patch.object(metadata0, 'location_count',
-                        autospec=True, return_value=0)
-    mocker.patch.object(metadata0, 'is_valid_periods',
-                        autospec=True, return_value=False)
-    mocker.patch.object(metadata0, 'dump',
-                        autospec=True, return_value='dump0')
-    
-    metadata1 = StationMetadata(0)
-    mocker.patch.object(metadata1, 'location_count',
-                        autospec=True, return_value=0)
-    mocker.patch.object(metadata1, 'is_valid_periods',
-                        autospec=True, return_value=False)
-    mocker.patch.object(metadata1, 'dump',
-                        autospec=True, return_value='dump1')
+    metadata0.add_location(StationLocation(
+        None, DateTimeRange(datetime(2020, 1, 1), datetime(2021, 1, 1))))
+    mocker.spy(metadata0, 'earliest_location')
+    metadata1 = StationMetadata(1)
+    metadata1.add_location(StationLocation(
+        None, DateTimeRange(datetime(1920, 1, 1), datetime(1921, 1, 1))))
+    mocker.spy(metadata1, 'earliest_location')
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
      
-    collector.collect_statistics(metadatas)
+    statistics = collector.collect_statistics(metadatas)
     
-    collector.earliest_station.assert_called_once()
+    assert statistics['earliest_station'] == metadata1.dump()
+    # A single pass over the stations.
+    metadata0.earliest_location.assert_called_once()
+    metadata1.earliest_location.assert_called_once()
 
 
 def test_earliest_station_of_two_stations(mocker):
@@ -395,7 +391,7 @@ def test_earliest_station_of_two_stations(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
      
     metadata = collector.earliest_station(metadatas)
@@ -403,8 +399,8 @@ def test_earliest_station_of_two_stations(mocker):
     # 1920 station is expected.
     assert metadata == StationMetadata(1)
     
-    assert metadata0.earliest_location.call_count == 2
-    assert metadata1.earliest_location.call_count == 2
+    metadata0.earliest_location.assert_called_once()
+    metadata1.earliest_location.assert_called_once()
 
 
 def test_earliest_station_with_unknown_start_date(mocker):
@@ -428,7 +424,7 @@ def test_earliest_station_with_unknown_start_date(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
      
     metadata = collector.earliest_station(metadatas)
@@ -436,41 +432,30 @@ def test_earliest_station_with_unknown_start_date(mocker):
     # 2020 station is expected.
     assert metadata == StationMetadata(1)
     
-    assert metadata0.earliest_location.call_count == 2
-    assert metadata1.earliest_location.call_count == 2
+    metadata0.earliest_location.assert_called_once()
+    metadata1.earliest_location.assert_called_once()
 
     
-def test_collect_statistics_calls_retired_station_count(mocker):
+def test_collect_statistics_counts_retired_stations(mocker):
    
     metadata0 = StationMetadata(0)
-    mocker.patch.object(metadata0, 'location_count',
-                        autospec=True, return_value=0)
-    mocker.patch.object(metadata0, 'is_valid_periods',
-                        autospec=True, return_value=False)
-    mocker.patch.object(metadata0, 'dump',
-                        autospec=True, return_value='dump0')
+    mocker.patch.object(metadata0, 'is_retired_station',
+                        autospec=True, return_value=True)
     
     metadata1 = StationMetadata(0)
-    mocker.patch.object(metadata1, 'location_count',
-                        autospec=True, return_value=0)
-    mocker.patch.object(metadata1, 'is_valid_periods',
+    mocker.patch.object(metadata1, 'is_retired_station',
                         autospec=True, return_value=False)
-    mocker.patch.object(metadata1, 'dump',
-                        autospec=True, return_value='dump1')
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
-    mocker.patch.object(collector, 'retired_station_count',
-                        autospec=True, return_value=2)
      
-    collector.collect_statistics(metadatas)
+    statistics = collector.collect_statistics(metadatas)
     
-    collector.retired_station_count.assert_called_once()
+    assert statistics['retired_station_count'] == 1
+    metadata0.is_retired_station.assert_called_once()
+    metadata1.is_retired_station.assert_called_once()
 
 
 def test_retired_station_count_when_only_one(mocker):
@@ -499,7 +484,7 @@ def test_retired_station_count_when_only_one(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
      
     count = collector.retired_station_count(metadatas)
@@ -536,7 +521,7 @@ def test_retired_station_count_when_two(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
      
     count = collector.retired_station_count(metadatas)
@@ -573,7 +558,7 @@ def test_retired_station_count_when_none(mocker):
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
      
     count = collector.retired_station_count(metadatas)
@@ -584,62 +569,171 @@ def test_retired_station_count_when_none(mocker):
     assert metadata1.is_retired_station.call_count == 1
 
     
-def test_collect_statistics_calls_available_networks(mocker):
+def test_collect_statistics_finds_available_networks(mocker):
    
     metadata0 = StationMetadata(0)
-    mocker.patch.object(metadata0, 'location_count',
-                        autospec=True, return_value=0)
-    mocker.patch.object(metadata0, 'is_valid_periods',
-                        autospec=True, return_value=False)
-    mocker.patch.object(metadata0, 'dump',
-                        autospec=True, return_value='dump0')
-    
-    metadata1 = StationMetadata(0)
-    mocker.patch.object(metadata1, 'location_count',
-                        autospec=True, return_value=0)
-    mocker.patch.object(metadata1, 'is_valid_periods',
-                        autospec=True, return_value=False)
-    mocker.patch.object(metadata1, 'dump',
-                        autospec=True, return_value='dump1')
+    metadata0.set_networks({'COOP', 'ACORN'})
+    metadata1 = StationMetadata(1)
+    metadata1.set_networks({'COOP', 'USHCN'})
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = mocker.MagicMock(date_range=None)    
     collector = Collector(configuration)
-    metadata2 = StationMetadata(0)
-    mocker.patch.object(collector, 'earliest_station',
-                        autospec=True, return_value=metadata2)
-    mocker.patch.object(collector, 'retired_station_count',
-                        autospec=True, return_value=2)
-    networks = {'COOP', 'ACORN', 'USHCN'}
-    mocker.patch.object(collector, 'available_networks',
-                        autospec=True, return_value=networks)
      
-    collector.collect_statistics(metadatas)
+    statistics = collector.collect_statistics(metadatas)
     
-    collector.available_networks.assert_called_once()
+    assert statistics['available_networks'] == 'ACORN, COOP, USHCN'
 
 
-def test_available_networks(mocker):
+def test_available_networks():
 
-    networks0 = {'COOP', 'ACORN'}
-    metadata0 = mocker.Mock()
-    networks_property0 = mocker.PropertyMock(return_value=networks0)
-    type(metadata0).networks = networks_property0
-    
-    networks1 = {'COOP', 'USHCN'}
-    metadata1 = mocker.Mock()
-    networks_property1 = mocker.PropertyMock(return_value=networks1)
-    type(metadata1).networks = networks_property1
+    metadata0 = StationMetadata(0)
+    metadata0.set_networks({'COOP', 'ACORN'})
+    metadata1 = StationMetadata(1)
+    metadata1.set_networks({'COOP', 'USHCN'})
 
     metadatas = [metadata0, metadata1]
 
-    configuration = mocker.MagicMock()    
+    configuration = Configuration({'input_file_path': ''})
     collector = Collector(configuration)
      
     networks = collector.available_networks(metadatas)
     
     assert networks == 'ACORN, COOP, USHCN'
-    
-    networks_property0.assert_called_once()
-    networks_property1.assert_called_once()
+
+
+def test_collect_statistics_from_iterator(mocker):
+
+    metadata0 = StationMetadata(0)
+    location0 = StationLocation(None, DateTimeRange(datetime(1991, 7, 3), datetime(1992, 6, 2)))
+    metadata0.add_location(location0)
+    metadata0.add_networks(['COOP'])
+
+    metadata1 = StationMetadata(1)
+    location1 = StationLocation(None, DateTimeRange(datetime(1920, 7, 3), datetime(1930, 6, 3)))
+    metadata1.add_location(location1)
+    location2 = StationLocation(None, DateTimeRange(datetime(1925, 7, 3), datetime(9999, 12, 31)))
+    metadata1.add_location(location2)
+    metadata1.add_networks(['ASOS', 'COOP'])
+
+    metadatas = [metadata0, metadata1]
+
+    configuration = mocker.MagicMock(date_range=None)    
+    collector = Collector(configuration)
+
+    statistics = collector.collect_statistics(iter(metadatas))
+
+    assert statistics == collector.collect_statistics(metadatas)
+    assert statistics['valid_period_count'] == 1
+    assert statistics['retired_station_count'] == 1
+    assert statistics['earliest_station'] == metadata1.dump()
+
+
+def test_collect_statistics_from_empty_iterator(mocker):
+
+    configuration = mocker.MagicMock(date_range=None)    
+    collector = Collector(configuration)
+
+    statistics = collector.collect_statistics(iter([]))
+
+    assert statistics['station_count'] == 0
+    assert statistics['location_count'] == 0
+    assert 'earliest_station' not in statistics
+
+
+def test_collect_statistics_from_store():
+
+    metadata0 = StationMetadata(123, 'CHARLESTON')
+    metadata0.add_networks(['COOP'])
+    metadata0.add_location(StationLocation(
+        spherical_coordinate(32.9, -80.0), DateTimeRange(datetime(1950, 1, 1), datetime(9999, 12, 31))))
+    metadata1 = StationMetadata(456, 'TORONTO')
+    metadata1.add_networks(['GHCND'])
+    metadata1.add_location(StationLocation(
+        spherical_coordinate(32.9, -80.0), DateTimeRange(datetime(1940, 1, 1), datetime(1960, 1, 1))))
+    metadata1.add_location(StationLocation(
+        spherical_coordinate(32.9, -80.0), DateTimeRange(datetime(1955, 1, 1), datetime(1970, 1, 1))))
+    metadatas = [metadata0, metadata1]
+    collector = Collector(Configuration({'input_file_path': ''}))
+
+    statistics = collector.collect_statistics(StationStore.from_metadatas(metadatas))
+
+    assert statistics == collector.collect_statistics(metadatas)
+    assert statistics['valid_period_count'] == 1
+    assert statistics['retired_station_count'] == 1
+    assert statistics['earliest_station'] == metadata1.dump()
+
+
+def test_collect_statistics_in_date_range():
+
+    metadata0 = StationMetadata(123, 'CHARLESTON')
+    metadata0.add_location(StationLocation(
+        spherical_coordinate(32.9, -80.0), DateTimeRange(datetime(1950, 1, 1), datetime(9999, 12, 31))))
+    metadata1 = StationMetadata(456, 'TORONTO')
+    metadata1.add_location(StationLocation(
+        spherical_coordinate(43.7, -79.4), DateTimeRange(datetime(1890, 1, 1), datetime(1910, 1, 1))))
+    collector = Collector(Configuration({'input_file_path': ''}))
+    collector.date_range = (datetime(1900, 1, 1), datetime(1900, 12, 31))
+
+    statistics = collector.collect_statistics([metadata0, metadata1])
+
+    assert statistics['station_count'] == 1
+    assert statistics['earliest_station'] == metadata1.dump()
+    assert collector.collect_statistics(iter([metadata0, metadata1])) == statistics
+
+
+def test_collect_active_station_series():
+
+    metadata = StationMetadata(123, 'CHARLESTON')
+    metadata.add_location(StationLocation(
+        spherical_coordinate(32.9, -80.0), DateTimeRange(datetime(1950, 6, 1), datetime(9999, 12, 31))))
+    collector = Collector(Configuration({'input_file_path': ''}))
+    collector.date_range = (datetime(1949, 1, 1), datetime(1952, 12, 31))
+
+    periods, counts = collector.collect_active_station_series([metadata])
+
+    assert list(periods.astype(str)) == ['1949', '1950', '1951', '1952']
+    assert list(counts) == [0, 1, 1, 1]
+
+
+def test_collect_relocation_statistics():
+
+    metadata0 = StationMetadata(123, 'CHARLESTON')
+    metadata1 = StationMetadata(456, 'TORONTO')
+    for metadata, coordinates in [
+            (metadata0, [(32.9, -80.0), (32.9, -80.001), (33.0, -80.0), (33.0, -80.0)]),
+            (metadata1, [(43.7, -79.4)])]:
+        for year, (latitude, longitude) in enumerate(coordinates, 1950):
+            metadata.add_location(StationLocation(
+                spherical_coordinate(latitude, longitude),
+                DateTimeRange(datetime(year, 1, 1), datetime(year, 12, 31))))
+    collector = Collector(Configuration({'input_file_path': ''}))
+
+    statistics = collector.collect_relocation_statistics([metadata0, metadata1], percentiles=(50,))
+
+    assert statistics['location_pair_count'] == 3
+    assert statistics['move_count'] == 2
+    assert statistics['pseudo_move_count'] == 1
+    assert statistics['pseudo_move_share'] == 0.5
+    assert statistics['moved_station_count'] == 1
+    assert statistics['mean_moves_per_station'] == 0.5
+    assert statistics['max_moves_per_station'] == 1
+    assert 5.0 < statistics['distance_percentiles'][50] < 6.0
+
+
+def test_collect_duplicate_clusters():
+
+    metadata0 = StationMetadata(123, 'CHARLESTON')
+    metadata1 = StationMetadata(456, 'CHARLESTON AP')
+    metadata2 = StationMetadata(789, 'TORONTO')
+    for metadata, (latitude, longitude) in [
+            (metadata0, (32.9, -80.0)), (metadata1, (32.9, -80.0)), (metadata2, (43.7, -79.4))]:
+        metadata.add_location(StationLocation(
+            spherical_coordinate(latitude, longitude),
+            DateTimeRange(datetime(1950, 1, 1), datetime(1959, 12, 31))))
+    collector = Collector(Configuration({'input_file_path': ''}))
+
+    clusters = collector.collect_duplicate_clusters([metadata0, metadata1, metadata2])
+
+    assert clusters == [([123, 456], 1.0)]
@@ -3,9 +3,13 @@ Created on 26 Jul. 2021
 
 @author: richardrothwell
 '''
+import pytest
+from datetime import date
 from struct import Struct
  
 from library.column_layout import ColumnLayout
+from library.field_types import ColumnField, INT_ID, YYYYMMDD_DATE, TEXT
+from library.exceptions import LayoutDriftError
 
 
 def test_line_format(mocker):
@@ -90,3 +94,166 @@ def test_parse_line():
     assert metadata['BEG_DT'] == '19490713'
     assert metadata['END_DT'] == '19501115'
     assert metadata['WBAN'] == '24285'
+
+
+def test_field_spans():
+    
+    headings = \
+        'NCDC     BEG_DT   END_DT   COOP   WBAN  ICAO FAA   NWSLI   WMO'
+    separator = \
+        '-------- -------- -------- ------ ----- ---- ----- ----- ----- '
+    selected_fields = ['NCDC', 'END_DT', 'WBAN']
+
+    layout = ColumnLayout(selected_fields, headings, separator)
+    spans = layout.field_spans()
+
+    assert spans == {'NCDC': (0, 8), 'END_DT': (17, 9), 'WBAN': (33, 6)}
+
+
+def test_compile_parser():
+    
+    headings = \
+        'NCDC     BEG_DT   END_DT   COOP   WBAN  ICAO FAA   NWSLI   WMO'
+    separator = \
+        '-------- -------- -------- ------ ----- ---- ----- ----- ----- '
+    # Listed out of file order.
+    selected_fields = ['WBAN', 'NCDC', 'END_DT']
+
+    layout = ColumnLayout(selected_fields, headings, separator)
+    parser = layout.compile_parser({'NCDC': int})
+
+    line = \
+    b'10000001 19490713 19501115 356032 24285                       '
+    record = parser(line)
+    
+    assert record == (10000001, '19501115', '24285')
+    assert record.NCDC == 10000001
+    assert record.END_DT == '19501115'
+    assert record.WBAN == '24285'
+
+
+def test_compile_parser_is_cached():
+
+    layout = ColumnLayout(['NCDC'], 'NCDC BEG_DT', '---- -----')
+
+    assert layout.compile_parser() is layout.compile_parser()
+    assert layout.compile_parser({'NCDC': int}) is layout.compile_parser({'NCDC': int})
+    assert layout.compile_parser({'NCDC': int}) is not layout.compile_parser()
+
+
+def test_typed_fields():
+
+    headings = \
+        'NCDC     BEG_DT   END_DT   COOP   WBAN  ICAO FAA   NWSLI   WMO'
+    separator = \
+        '-------- -------- -------- ------ ----- ---- ----- ----- ----- '
+    selected_fields = [ColumnField('NCDC', INT_ID), ColumnField('BEG_DT', YYYYMMDD_DATE), 'WBAN']
+
+    layout = ColumnLayout(selected_fields, headings, separator)
+
+    assert layout.selected_fields == ['NCDC', 'BEG_DT', 'WBAN']
+    assert layout.field_types == {'NCDC': INT_ID, 'BEG_DT': YYYYMMDD_DATE, 'WBAN': TEXT}
+
+    line = \
+    b'10000001 19490713 19501115 356032 24285                       '
+    assert layout.compile_parser()(line) == \
+        (10000001, date(1949, 7, 13).toordinal(), '24285')
+    # The compatibility wrapper still gives strings.
+    assert layout.parse_line(line) == \
+        {'NCDC': '10000001', 'BEG_DT': '19490713', 'WBAN': '24285'}
+
+
+def test_parse_lines():
+
+    headings = \
+        'NCDC     BEG_DT   END_DT   COOP   WBAN  ICAO FAA   NWSLI   WMO'
+    separator = \
+        '-------- -------- -------- ------ ----- ---- ----- ----- ----- '
+    selected_fields = [ColumnField('NCDC', INT_ID), ColumnField('BEG_DT', YYYYMMDD_DATE)]
+
+    layout = ColumnLayout(selected_fields, headings, separator)
+
+    lines = [
+        b'10000001 19490713 19501115 356032 24285                       ',
+        b'10000001 19491313 19501115 356032 24285                       ',
+        b'10000001 19490713',
+        b'10000158 19230401 19260131 356032 24285                       '
+    ]
+    records, errors = layout.parse_lines(lines)
+
+    assert records[0] == (10000001, date(1949, 7, 13).toordinal())
+    assert records[1] is None
+    assert records[2] is None
+    assert records[3].NCDC == 10000158
+    assert records[3].BEG_DT == date(1923, 4, 1).toordinal()
+    assert sorted(errors) == [1, 2]
+
+
+def test_parse_lines_without_lines():
+
+    layout = ColumnLayout(['NCDC'], 'NCDC BEG_DT', '---- -----')
+
+    assert layout.parse_lines([]) == ([], {})
+
+
+def test_parse_block():
+
+    headings = \
+        'NCDC     BEG_DT   END_DT   COOP   WBAN  ICAO FAA   NWSLI   WMO'
+    separator = \
+        '-------- -------- -------- ------ ----- ---- ----- ----- ----- '
+    selected_fields = [ColumnField('NCDC', INT_ID), ColumnField('BEG_DT', YYYYMMDD_DATE)]
+
+    layout = ColumnLayout(selected_fields, headings, separator)
+
+    lines = [
+        b'10000001 19490713 19501115 356032 24285                       \r\r\n',
+        b'10000001 19491313 19501115 356032 24285                       \r\r\n',
+        b'10000158 19230401 19260131 356032 24285                       \r\r\n'
+    ]
+    block = memoryview(b''.join(lines))
+    records, errors = layout.parse_block(block, len(lines[0]))
+
+    assert records[0] == (10000001, date(1949, 7, 13).toordinal())
+    assert records[1] is None
+    assert records[2] == (10000158, date(1923, 4, 1).toordinal())
+    assert list(errors) == [1]
+
+
+def test_blocks_reuse_the_derived_headings(mocker):
+
+    layout = ColumnLayout(['NCDC'], 'NCDC BEG_DT', '---- -----')
+    all_column_headings = mocker.spy(layout, '_all_column_headings')
+    all_field_widths = mocker.spy(layout, '_all_field_widths')
+
+    for _ in range(3):
+        layout.parse_lines([b'1234 19491'])
+        layout.parse_block(b'1234 19491\n', layout.field_struct.size + 1)
+
+    assert all_column_headings.call_count == 0
+    assert all_field_widths.call_count == 0
+
+
+def test_block_struct_skips_end_of_line():
+
+    layout = ColumnLayout(['NCDC'], 'NCDC BEG_DT', '---- -----')
+
+    assert layout.block_struct(layout.field_struct.size + 3).size == layout.field_struct.size + 3
+    with pytest.raises(ValueError):
+        layout.block_struct(layout.field_struct.size - 1)
+
+
+def test_columns():
+
+    layout = ColumnLayout(['NCDC'], 'NCDC BEG_DT', '---- ------')
+
+    assert layout.columns() == [('NCDC', 0, 4), ('BEG_DT', 4, 7)]
+
+
+def test_missing_fields_raise_when_parsing():
+
+    layout = ColumnLayout(['NCDC', 'WBAN'], 'NCDC BEG_DT', '---- ------')
+
+    assert layout.missing_fields() == ['WBAN']
+    with pytest.raises(LayoutDriftError):
+        layout.compile_parser()
@@ -0,0 +1,44 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import pytest
+
+from datetime import date, datetime
+
+from library.date_ordinals import date_ordinal, ordinal_datetime
+from library.date_ordinals import UNKNOWN_START_ORDINAL, STILL_OPEN_ORDINAL
+
+
+def test_date_ordinal():
+
+    assert date_ordinal('19490713') == date(1949, 7, 13).toordinal()
+
+
+def test_date_ordinal_for_sentinels():
+
+    assert date_ordinal('00010101') == UNKNOWN_START_ORDINAL
+    assert date_ordinal('99991231') == STILL_OPEN_ORDINAL
+    assert STILL_OPEN_ORDINAL == date(9999, 12, 31).toordinal()
+
+
+def test_date_ordinal_rejects_bad_dates():
+
+    with pytest.raises(ValueError):
+        date_ordinal('')
+    with pytest.raises(ValueError):
+        date_ordinal('1949071')
+    with pytest.raises(ValueError):
+        date_ordinal('1949 713')
+    with pytest.raises(ValueError):
+        date_ordinal('19490230')
+
+
+def test_ordinal_datetime():
+
+    ordinal = date_ordinal('19490713')
+
+    assert ordinal_datetime(ordinal) == datetime(1949, 7, 13)
+    assert ordinal_datetime(ordinal) is ordinal_datetime(ordinal)
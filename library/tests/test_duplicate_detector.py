@@ -0,0 +1,100 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import pytest
+from datetime import date
+
+from library.station_store import StationStore
+from library.station_metadata import StationMetadata
+from library.station_location import CompactStationLocation
+from library.duplicate_detector import DuplicateDetector
+from library.date_ordinals import UNKNOWN_START_ORDINAL
+
+
+def make_store(stations):
+    metadatas = []
+    for ncdc, locations in stations:
+        metadata = StationMetadata(ncdc, 'STATION')
+        for latitude, longitude, start, end in locations:
+            metadata.add_location(CompactStationLocation(
+                latitude, longitude,
+                start.toordinal() if start else UNKNOWN_START_ORDINAL, end.toordinal()))
+        metadatas.append(metadata)
+    return StationStore.from_metadatas(metadatas)
+
+
+def test_candidate_pairs():
+
+    store = make_store([
+        (1, [(32.9, -80.0, date(1950, 1, 1), date(1959, 12, 31))]),
+        # The same site, rounded differently, for half of the shorter period.
+        (2, [(32.9001, -80.0001, date(1955, 1, 1), date(1969, 12, 31))]),
+        # The same site, but not at the same time.
+        (3, [(32.9, -80.0, date(1970, 1, 1), date(1979, 12, 31))]),
+        # Too far.
+        (4, [(32.9002, -80.0, date(1950, 1, 1), date(1959, 12, 31))]),
+        (5, [(None, None, date(1950, 1, 1), date(1959, 12, 31))])])
+
+    lows, highs, scores = DuplicateDetector().candidate_pairs(store)
+
+    assert list(lows) == [0, 1]
+    assert list(highs) == [1, 3]
+    assert scores[0] == pytest.approx(0.5, abs=0.001)
+    # Station 2 is near station 4, but station 1 is not.
+    assert scores[1] == pytest.approx(0.5, abs=0.001)
+
+
+def test_best_location_pair_scores():
+
+    store = make_store([
+        (1, [
+            (10.0, 20.0, date(1950, 1, 1), date(1950, 12, 31)),
+            (10.0, 20.0, date(1951, 1, 1), date(1960, 12, 31))]),
+        (2, [(10.0, 20.0, date(1951, 1, 1), date(1955, 12, 31))])])
+
+    lows, highs, scores = DuplicateDetector().candidate_pairs(store)
+
+    assert list(zip(lows, highs, scores)) == [(0, 1, 1.0)]
+
+
+def test_unknown_start_and_antimeridian():
+
+    store = make_store([
+        (1, [(-17.0, 180.0, None, date(1960, 12, 31))]),
+        (2, [(-17.0, -179.99995, date(1950, 1, 1), date(1970, 12, 31))]),
+        (3, [(-17.0, 180.0, None, date(1980, 12, 31))])])
+
+    lows, highs, scores = DuplicateDetector().candidate_pairs(store)
+
+    # An unknown start is taken to be the end date.
+    assert list(zip(lows, highs, scores)) == [(0, 1, 1.0)]
+
+
+def test_clusters():
+
+    store = make_store([
+        (1, [(32.9, -80.0, date(1950, 1, 1), date(1959, 12, 31))]),
+        (2, [(43.7, -79.4, date(1950, 1, 1), date(1959, 12, 31))]),
+        (3, [(32.9, -80.0, date(1955, 1, 1), date(1969, 12, 31))]),
+        (4, [(32.9, -80.0001, date(1960, 1, 1), date(1964, 12, 31))]),
+        (5, [(43.7, -79.4, date(1950, 1, 1), date(1952, 12, 31))])])
+
+    clusters = DuplicateDetector(min_overlap=0.1).clusters(store)
+
+    # Equal scores are ordered by NCDC.
+    assert [cluster.ncdcs for cluster in clusters] == [[1, 3, 4], [2, 5]]
+    assert [cluster.score() for cluster in clusters] == [1.0, 1.0]
+    assert clusters[0].station_count() == 3
+    assert [pair[0:2] for pair in clusters[0].pairs] == [(1, 3), (3, 4)]
+    assert store.duplicate_clusters(min_overlap=0.1)[0].ncdcs == [1, 3, 4]
+
+
+def test_no_duplicates():
+
+    store = make_store([(1, [(32.9, -80.0, date(1950, 1, 1), date(1959, 12, 31))])])
+
+    assert DuplicateDetector().clusters(store) == []
+    assert DuplicateDetector().clusters(make_store([])) == []
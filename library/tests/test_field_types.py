@@ -0,0 +1,45 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+from datetime import date
+
+from library.field_types import FieldType, TEXT, INT_ID, YYYYMMDD_DATE, \
+    DECIMAL_DEGREE, COMMA_LIST, INTERNED_STRING
+
+
+def test_convert():
+
+    assert TEXT.convert(b' NEWPORT  ') == 'NEWPORT'
+    assert INT_ID.convert(b'10000001') == 10000001
+    assert YYYYMMDD_DATE.convert(b' 19490713') == date(1949, 7, 13).toordinal()
+    assert DECIMAL_DEGREE.convert(b' -124.05   ') == -124.05
+    assert DECIMAL_DEGREE.convert(b'          ') is None
+    assert COMMA_LIST.convert(b' AIRWAYS,COOP   ') == ('AIRWAYS', 'COOP')
+    assert COMMA_LIST.convert(b'     ') == ()
+    assert INTERNED_STRING.convert(b' US') == 'US'
+
+
+def test_convert_column_converts_each_value_once(mocker):
+
+    convert = mocker.MagicMock(side_effect=lambda value: int(value) * 2)
+    field_type = FieldType('double', convert)
+
+    converted, errors = field_type.convert_column([b'1', b'2', b'1', b'1'])
+
+    assert converted == [2, 4, 2, 2]
+    assert errors == {}
+    assert convert.call_count == 2
+
+
+def test_convert_column_reports_errors_by_row():
+
+    converted, errors = YYYYMMDD_DATE.convert_column(
+        [b' 19490713', b' 19491313', b' 19490713', b' 19491313'])
+
+    assert converted[0] == date(1949, 7, 13).toordinal()
+    assert converted[1] is None
+    assert sorted(errors) == [1, 3]
+    assert isinstance(errors[1], ValueError)
@@ -0,0 +1,51 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import pytest
+
+from library.gremlin_repair import GremlinRepair
+
+
+def test_construction_with_default_table():
+
+    gremlin_repair = GremlinRepair()
+
+    assert gremlin_repair.gremlins == GremlinRepair.GREMLINS
+
+
+def test_construction_rejects_widening_replacement():
+
+    with pytest.raises(ValueError):
+        GremlinRepair({b'\xc4\xa0': b'GGG'})
+
+
+def test_repair_returns_ascii_line_unchanged():
+
+    gremlin_repair = GremlinRepair()
+    line = b'10000001 19490713 NEWPORT'
+
+    assert gremlin_repair.repair(line) is line
+
+
+def test_repair_replaces_mixed_gremlins_in_one_pass():
+
+    gremlin_repair = GremlinRepair()
+    line = b'PR\xc3\x83\xc2\xa9VOST ESPA\xc3\x83\xc2\xb1OLA UTQIA\xc4\xa0VIK|'
+
+    repaired_line = gremlin_repair.repair(line)
+
+    assert len(repaired_line) == len(line)
+    assert repaired_line == b'PREVOST ESPANOLA UTQIAGVIK|       '
+
+
+def test_repair_uses_configured_table():
+
+    gremlin_repair = GremlinRepair({b'\xc3\xbc': b'U'})
+    line = b'Z\xc3\xbcRICH PR\xc3\x83\xc2\xa9VOST'
+
+    repaired_line = gremlin_repair.repair(line)
+
+    assert repaired_line == b'ZURICH PR\xc3\x83\xc2\xa9VOST '
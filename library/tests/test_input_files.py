@@ -0,0 +1,49 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from library.input_files import compression_suffix, is_compressed, open_input
+
+
+CONTENT = b'heading\nseparator\n10000001 19490713\r\r\n10000001 19590701\r\r\n'
+
+
+def test_compression_suffix():
+
+    assert compression_suffix('emshr_lite.txt') is None
+    assert compression_suffix('emshr_lite.txt.gz') == '.gz'
+    assert compression_suffix('emshr_lite.txt.bz2') == '.bz2'
+    assert compression_suffix('emshr_lite.txt.xz') == '.xz'
+    assert not is_compressed('emshr_lite.txt')
+    assert is_compressed('emshr_lite.txt.xz')
+
+
+def test_open_input_plain_file(tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(CONTENT)
+
+    with open_input(str(input_path)) as input_file:
+        assert input_file.read() == CONTENT
+
+
+@pytest.mark.parametrize('suffix, compress', [
+    ('.gz', gzip.compress), ('.bz2', bz2.compress), ('.xz', lzma.compress)])
+def test_open_input_compressed_file(tmp_path, suffix, compress):
+
+    input_path = tmp_path / ('emshr_lite.txt' + suffix)
+    input_path.write_bytes(compress(CONTENT))
+
+    with open_input(str(input_path)) as input_file:
+        lines = list(input_file)
+
+    assert b''.join(lines) == CONTENT
+    assert lines[2] == b'10000001 19490713\r\r\n'
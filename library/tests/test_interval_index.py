@@ -0,0 +1,56 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+from library.interval_index import IntervalIndex
+
+
+def make_index():
+    starts = np.array([10, 5, 20, 1, 30], dtype=np.int32)
+    ends = np.array([15, 25, 20, 2, 40], dtype=np.int32)
+    return IntervalIndex(starts, ends)
+
+
+def test_active():
+
+    index = make_index()
+
+    assert list(index.active(12)) == [0, 1]
+    assert list(index.active(20)) == [1, 2]
+    assert list(index.active(3)) == []
+    assert index.count_active(20) == 2
+    assert index.count_active(50) == 0
+
+
+def test_overlapping():
+
+    index = make_index()
+
+    assert list(index.overlapping(2, 10)) == [0, 1, 3]
+    assert list(index.overlapping(26, 29)) == []
+    assert index.count_overlapping(0, 100) == 5
+
+
+def test_matches_scan():
+
+    generator = np.random.default_rng(7)
+    starts = generator.integers(0, 1000, 500)
+    ends = starts + generator.integers(0, 200, 500)
+    index = IntervalIndex(starts, ends)
+
+    for begin, end in [(0, 0), (100, 100), (500, 520), (900, 1300), (1300, 1400)]:
+        expected = np.flatnonzero((starts <= end) & (ends >= begin))
+        assert list(index.overlapping(begin, end)) == list(expected)
+        assert index.count_overlapping(begin, end) == len(expected)
+
+
+def test_empty():
+
+    index = IntervalIndex(np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+    assert len(index.active(10)) == 0
+    assert index.count_active(10) == 0
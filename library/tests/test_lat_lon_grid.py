@@ -0,0 +1,57 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+import pytest
+
+from library.lat_lon_grid import LatLonGrid, GridOccupancy
+
+
+def test_construction():
+
+    grid = LatLonGrid(2.5)
+
+    assert grid.row_count == 72
+    assert grid.column_count == 144
+    assert grid.cell_count() == 72 * 144
+    with pytest.raises(ValueError):
+        LatLonGrid(7.0)
+
+
+def test_cell_indices():
+
+    grid = LatLonGrid(5.0)
+
+    cells = grid.cell_indices(
+        np.array([-90.0, 0.0, 2.5, 90.0, np.nan]),
+        np.array([-180.0, 0.0, 7.5, 180.0, 0.0]))
+
+    assert list(cells) == [0, 18 * 72 + 36, 18 * 72 + 37, 35 * 72, -1]
+
+
+def test_cell_centres_and_weights():
+
+    grid = LatLonGrid(90.0)
+
+    latitudes, longitudes = grid.cell_centres()
+
+    assert list(latitudes) == [-45.0] * 4 + [45.0] * 4
+    assert list(longitudes) == [-135.0, -45.0, 45.0, 135.0] * 2
+    assert grid.area_weights() == pytest.approx([np.cos(np.pi / 4)] * 8)
+
+
+def test_occupancy():
+
+    grid = LatLonGrid(90.0)
+    counts = np.zeros((8, 3), dtype=np.int64)
+    counts[0, :] = [1, 2, 0]
+    counts[5, :] = [0, 1, 0]
+    occupancy = GridOccupancy(grid, np.array([2000, 2001, 2002]), counts)
+
+    assert list(occupancy.year_counts(2001)) == [2, 0, 0, 0, 0, 1, 0, 0]
+    assert list(occupancy.occupied_cell_counts()) == [1, 2, 0]
+    assert occupancy.weighted_coverage() == pytest.approx([1 / 8, 2 / 8, 0.0])
+    assert occupancy.weighted_counts() == pytest.approx(np.array([1, 3, 0]) * np.cos(np.pi / 4))
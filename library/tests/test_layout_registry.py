@@ -0,0 +1,74 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+import logging
+
+from library.column_layout import ColumnLayout
+from library.layout_registry import LayoutRegistry
+from library.field_types import ColumnField, INT_ID
+
+
+def test_layout_is_reused_for_the_same_header():
+
+    registry = LayoutRegistry()
+    selected_fields = [ColumnField('NCDC', INT_ID), 'CC']
+
+    layout = registry.layout(selected_fields, ColumnLayout.COLUMN_HEADINGS, ColumnLayout.COLUMN_UNDERLINES)
+    parser = layout.compile_parser()
+
+    same_layout = registry.layout(
+        list(selected_fields), str(ColumnLayout.COLUMN_HEADINGS), str(ColumnLayout.COLUMN_UNDERLINES))
+    assert same_layout is layout
+    assert same_layout.compile_parser() is parser
+    assert registry.layout(['NCDC']) is not layout
+
+
+def test_signature_distinguishes_headers():
+
+    registry = LayoutRegistry()
+
+    assert registry.signature('NCDC CC', '---- --') == registry.signature('NCDC CC', '---- --')
+    assert registry.signature('NCDC CC', '---- --') != registry.signature('NCDC CC', '---- ---')
+
+
+def test_no_drift_for_the_reference_layout():
+
+    registry = LayoutRegistry()
+
+    registry.layout(['NCDC'])
+
+    assert list(registry.drifts().values()) == [[]]
+
+
+def test_drift_is_reported_once(caplog):
+
+    reference = ColumnLayout([], 'NCDC     CC WBAN', '-------- -- -----')
+    registry = LayoutRegistry(reference)
+    heading_line = 'NCDC     CC  ICAO WBAN'
+    separator_line = '-------- --- ---- -----'
+
+    with caplog.at_level(logging.WARNING, logger='library.layout_registry'):
+        registry.layout(['NCDC'], heading_line, separator_line)
+        registry.layout(['NCDC', 'CC'], heading_line, separator_line)
+
+    assert registry.drifts()[registry.signature(heading_line, separator_line)] == [
+        'Changed width of column: CC from: 3 to: 4',
+        'Added column: ICAO at offset: 12',
+        'Moved column: WBAN from offset: 11 to: 17'
+    ]
+    assert len(caplog.records) == 1
+
+
+def test_removed_and_missing_columns_are_reported(caplog):
+
+    reference = ColumnLayout([], 'NCDC     CC WBAN', '-------- -- -----')
+    registry = LayoutRegistry(reference)
+
+    with caplog.at_level(logging.WARNING, logger='library.layout_registry'):
+        layout = registry.layout(['NCDC', 'WBAN'], 'NCDC     CC', '-------- --')
+
+    assert registry.drift(layout) == ['Removed column: WBAN']
+    assert layout.missing_fields() == ['WBAN']
+    assert [record.levelname for record in caplog.records] == ['WARNING', 'ERROR']
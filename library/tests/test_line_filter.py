@@ -0,0 +1,122 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+import pytest
+
+from library.column_layout import ColumnLayout
+from library.line_filter import LineFilter
+
+
+HEADINGS = \
+    'NCDC     BEG_DT   END_DT   CC LAT_DEC   LON_DEC    TYPE'
+SEPARATOR = \
+    '-------- -------- -------- -- --------- ---------- ------------------'
+
+
+@pytest.fixture
+def column_layout():
+    return ColumnLayout(
+        ['NCDC', 'BEG_DT', 'END_DT', 'CC', 'LAT_DEC', 'LON_DEC', 'TYPE'],
+        HEADINGS, SEPARATOR)
+
+
+def make_line(
+        begin=b'19490713', end=b'19501115', country_code=b'US',
+        latitude=b'44.58333', longitude=b'-124.05', networks=b'AIRWAYS,COOP'):
+    return b'10000001 ' + begin + b' ' + end + b' ' + country_code.ljust(2) \
+        + b' ' + latitude.ljust(9) + b' ' + longitude.ljust(10) \
+        + b' ' + networks.ljust(18)
+
+
+def test_inactive_filter_compiles_to_none(column_layout):
+
+    line_filter = LineFilter()
+
+    assert not line_filter.is_active()
+    assert line_filter.compile(column_layout) is None
+
+
+def test_bad_date_range_is_rejected():
+
+    with pytest.raises(ValueError):
+        LineFilter(date_range=('19490713', '1950111'))
+
+
+def test_country_codes(column_layout):
+
+    accepts = LineFilter(country_codes=['CA', 'US']).compile(column_layout)
+
+    assert accepts(make_line(country_code=b'US'))
+    assert not accepts(make_line(country_code=b'AS'))
+    assert not accepts(make_line(country_code=b''))
+
+
+def test_networks(column_layout):
+
+    accepts = LineFilter(networks=['COOP']).compile(column_layout)
+
+    assert accepts(make_line(networks=b'AIRWAYS,COOP'))
+    assert accepts(make_line(networks=b'COOP'))
+    assert not accepts(make_line(networks=b'AIRWAYS'))
+    assert not accepts(make_line(networks=b'PRE-COOP'))
+    assert not accepts(make_line(networks=b''))
+
+
+def test_unknown_network(column_layout):
+
+    accepts = LineFilter(networks=['<UNKNOWN>']).compile(column_layout)
+
+    assert accepts(make_line(networks=b''))
+    assert not accepts(make_line(networks=b'COOP'))
+
+
+def test_bounding_box(column_layout):
+
+    accepts = LineFilter(bounding_box=(40.0, -130.0, 50.0, -120.0)).compile(column_layout)
+
+    assert accepts(make_line())
+    assert not accepts(make_line(latitude=b'58.41667'))
+    assert not accepts(make_line(longitude=b'-135.7'))
+    assert not accepts(make_line(latitude=b'', longitude=b''))
+
+
+def test_bounding_box_across_antimeridian(column_layout):
+
+    accepts = LineFilter(bounding_box=(-50.0, 170.0, -30.0, -170.0)).compile(column_layout)
+
+    assert accepts(make_line(latitude=b'-43.5', longitude=b'172.5'))
+    assert accepts(make_line(latitude=b'-43.5', longitude=b'-176.5'))
+    assert not accepts(make_line(latitude=b'-43.5', longitude=b'150.0'))
+
+
+def test_date_range(column_layout):
+
+    accepts = LineFilter(date_range=('19500101', '19591231')).compile(column_layout)
+
+    assert accepts(make_line(begin=b'19490713', end=b'19501115'))
+    assert accepts(make_line(begin=b'19591231', end=b'99991231'))
+    assert not accepts(make_line(begin=b'19300101', end=b'19491231'))
+    assert not accepts(make_line(begin=b'19600101', end=b'19621001'))
+    # Inverted periods are put in order.
+    assert accepts(make_line(begin=b'19501115', end=b'19490713'))
+
+
+def test_filters_are_combined(column_layout):
+
+    accepts = LineFilter(
+        country_codes=['US'], networks=['COOP']).compile(column_layout)
+
+    assert accepts(make_line())
+    assert not accepts(make_line(country_code=b'CA'))
+    assert not accepts(make_line(networks=b'AIRWAYS'))
+
+
+def test_memoryview_lines(column_layout):
+
+    accepts = LineFilter(
+        country_codes=['US'], bounding_box=(40.0, -130.0, 50.0, -120.0),
+        date_range=('19500101', '19591231')).compile(column_layout)
+
+    assert accepts(memoryview(make_line()))
@@ -4,6 +4,7 @@ Created on 22 Jun. 2021
 @author: richardrothwell
 '''
 
+from collections import namedtuple
 from unittest.mock import patch, mock_open, call
 from callee.types import IsA
 import pytest
@@ -173,6 +174,11 @@ def test_make_location_with_time_inversion(mocker) :
     assert station_location.date_range.end_datetime == expected_end_datetime
     
     
+def make_record(**fields):
+    record_type = namedtuple('ParsedLine', fields.keys())
+    return record_type(**fields)
+
+
 def test_extract_metadata_when_new_station(mocker):
     
     config = mocker.MagicMock()    
@@ -182,22 +188,24 @@ def test_extract_metadata_when_new_station(mocker):
     old_ncdc = 0
     
     # New station metadata.
-    fields = {
-        'NCDC': '123', 
-        'BEG_DT': '19490713', 
-        'END_DT': '19501115', 
-        'STATION_NAME': 'New York Airport',
-        'TYPE': 'COOP,USHCN',
-        'CC': 'US'
-    }    
+    record = make_record(
+        NCDC=123, 
+        BEG_DT=711686, 
+        END_DT=712176, 
+        STATION_NAME='New York Airport',
+        CC='US',
+        LAT_DEC=23.5,
+        LON_DEC=187.2,
+        TYPE=['COOP', 'USHCN'])
     mocker.patch('library.column_layout.ColumnLayout._line_format', 
         autospec=True, return_value='')    
     column_layout = ColumnLayout([])
-    mocker.patch.object(column_layout, 'parse_line', 
-        autospec=True, return_value=fields)
+    parser = mocker.MagicMock(return_value=record)
+    mocker.patch.object(column_layout, 'compile_parser', 
+        autospec=True, return_value=parser)
         
     station_location = StationLocation(None, None)
-    mocker.patch.object(loader, 'make_location', 
+    mocker.patch.object(loader, 'make_ordinal_location', 
         autospec=True, return_value=station_location)
 
     # Old station
@@ -206,8 +214,9 @@ def test_extract_metadata_when_new_station(mocker):
     # New station
     metadata_update = loader.extract_metadata(metadata, column_layout, line)
     
-    column_layout.parse_line.assert_called_once_with(line)
-    loader.make_location.assert_called_once_with(fields)
+    column_layout.compile_parser.assert_called_once_with()
+    parser.assert_called_once_with(line)
+    loader.make_ordinal_location.assert_called_once_with(711686, 712176, 23.5, 187.2)
     
     assert metadata_update.ncdc == 123
     assert metadata_update.name == 'New York Airport'
@@ -226,22 +235,24 @@ def test_extract_metadata_when_old_station(mocker):
     old_name = 'New York Airport'
     
     # New station metadata.
-    fields = {
-        'NCDC': '123', 
-        'BEG_DT': '19490713', 
-        'END_DT': '19501115', 
-        'STATION_NAME': 'New York Spaceport',
-        'TYPE': 'COOP,USHCN',
-        'CC': 'US'
-    }
+    record = make_record(
+        NCDC=123, 
+        BEG_DT=711686, 
+        END_DT=712176, 
+        STATION_NAME='New York Spaceport',
+        CC='US',
+        LAT_DEC=23.5,
+        LON_DEC=187.2,
+        TYPE=['COOP', 'USHCN'])
     mocker.patch('library.column_layout.ColumnLayout._line_format', 
         autospec=True, return_value='')    
     column_layout = ColumnLayout([])
-    mocker.patch.object(column_layout, 'parse_line', 
-        autospec=True, return_value=fields)
+    parser = mocker.MagicMock(return_value=record)
+    mocker.patch.object(column_layout, 'compile_parser', 
+        autospec=True, return_value=parser)
     
     station_location = StationLocation(None, None)
-    mocker.patch.object(loader, 'make_location', 
+    mocker.patch.object(loader, 'make_ordinal_location', 
         autospec=True, return_value=station_location)
 
     # Old station
@@ -251,12 +262,34 @@ def test_extract_metadata_when_old_station(mocker):
     # New station
     metadata_update = loader.extract_metadata(metadata, column_layout, line)
     
-    column_layout.parse_line.assert_called_once_with(line)
-    loader.make_location.assert_called_once_with(fields)
+    parser.assert_called_once_with(line)
+    loader.make_ordinal_location.assert_called_once_with(711686, 712176, 23.5, 187.2)
     
     assert metadata_update.ncdc == 123
     assert metadata_update.name == 'New York Spaceport'
     assert len(metadata_update.locations) == 1
+
+
+def test_extract_metadata_converts_fields(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadEMSHRLite(config)
+    headings = 'NCDC     BEG_DT   END_DT   STATION_NAME CC LAT_DEC   LON_DEC    TYPE'
+    separator = '-------- -------- -------- ------------ -- --------- ---------- ----------'
+    column_layout = ColumnLayout(LoadEMSHRLite.SELECTED_FIELDS, headings, separator)
+    line = b'10000001 19501115 19490713 NEWPORT      US' + b' ' * 10 \
+        + b' -124.05   ' + b' ' * 11
+
+    metadata = loader.extract_metadata(StationMetadata(0), column_layout, line)
+
+    assert metadata.ncdc == 10000001
+    assert metadata.name == 'NEWPORT'
+    assert metadata.country_code == 'US'
+    assert metadata.networks == {'<UNKNOWN>'}
+    location = metadata.locations[0]
+    assert location.start_ordinal == datetime(1949, 7, 13).toordinal()
+    assert location.end_ordinal == datetime(1950, 11, 15).toordinal()
+    assert location.coordinate() == (None, -124.05)
         
         
 def test_load_opens_empty_file(mocker):
@@ -278,7 +311,7 @@ def test_load_opens_oneline_file(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)
+        loader = LoadEMSHRLite(config, block_parsed=False)
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, return_value=StationMetadata(123))
         metadatas = loader.load()
@@ -293,7 +326,7 @@ def test_load_opens_twoline_file_with_different_station(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)
+        loader = LoadEMSHRLite(config, block_parsed=False)
         return_values = [StationMetadata(123), StationMetadata(456)]
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, side_effect=return_values)
@@ -309,7 +342,7 @@ def test_load_opens_twoline_file_with_same_station(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)
+        loader = LoadEMSHRLite(config, block_parsed=False)
         return_values = [StationMetadata(123), StationMetadata(123)]
         mocker.patch.object(loader, 'extract_metadata', 
                             autospec=True, side_effect=return_values)
@@ -325,7 +358,7 @@ def test_load_calls_extract_metadata_for_oneline(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
         mocker.patch.object(loader, 'extract_metadata', 
                 autospec=True, return_value=StationMetadata(123))
         metadatas = loader.load()
@@ -341,7 +374,7 @@ def test_load_calls_extract_metadata_for_twolines_with_different_station(mocker)
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
         return_values = [StationMetadata(123), StationMetadata(456)]
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, side_effect=return_values)
@@ -361,7 +394,7 @@ def test_load_calls_extract_metadata_for_twolines_with_same_station(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
         return_values = [StationMetadata(123), StationMetadata(123)]
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, side_effect=return_values)
@@ -381,7 +414,7 @@ def test_load_populates_metadatas_for_oneline(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, return_value=StationMetadata(123))
         metadatas = loader.load()
@@ -398,7 +431,7 @@ def test_load_populates_metadatas_for_twolines_different_station(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
         return_values = [StationMetadata(123), StationMetadata(456)]
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, side_effect=return_values)
@@ -420,7 +453,7 @@ def test_load_populates_metadatas_for_twolines_same_station(mocker):
         config = mocker.MagicMock()    
         config.input_file_path = './emshr_lite.txt'
 
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
         return_values = [StationMetadata(123), StationMetadata(123)]
         mocker.patch.object(loader, 'extract_metadata', 
             autospec=True, side_effect=return_values)
@@ -440,7 +473,7 @@ def test_load_strips_end_of_lines(mocker):
     with patch("builtins.open", mock_open(read_data=b'heading\nseparator\n1000\n')):
         config = mocker.MagicMock()    
         config.input_file_path = ''
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
 
         return_values = [b'heading', b'separator', b'1000']
         mocker.patch.object(loader, 'strip_end_of_line', 
@@ -468,7 +501,7 @@ def test_load_zaps_gremlins(mocker):
     with patch("builtins.open", mock_open(read_data=b'heading\nseparator\n1000\n')):
         config = mocker.MagicMock()    
         config.input_file_path = ''
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
 
         return_values = [b'heading', b'separator', b'1000']
         mocker.patch.object(loader, 'strip_end_of_line', 
@@ -491,7 +524,7 @@ def test_load_sorts_metadata_locations(mocker):
     with patch("builtins.open", mock_open(read_data=b'heading\nseparator\n1000\n')):
         config = mocker.MagicMock()    
         config.input_file_path = ''
-        loader = LoadEMSHRLite(config)               
+        loader = LoadEMSHRLite(config, block_parsed=False)               
 
         return_values = [b'heading', b'separator', b'1000']
         mocker.patch.object(loader, 'strip_end_of_line', 
@@ -511,3 +544,196 @@ def test_load_sorts_metadata_locations(mocker):
        
         loader.zap_gremlins.assert_called_once_with(b'1000')
         metadata.sort_locations_by_start_date.assert_called_once()
+
+
+def test_construction_defaults_to_line_reader(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config)
+    
+    assert not loader.memory_mapped
+
+
+def test_load_delegates_to_load_mapped(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config, memory_mapped=True)
+    mocker.patch.object(loader, 'load_mapped', 
+        autospec=True, return_value=[StationMetadata(123)])
+    metadatas = loader.load()
+
+    loader.load_mapped.assert_called_once()
+    assert metadatas[0].ncdc == 123
+
+
+def test_mapped_lines_walks_fixed_stride(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadEMSHRLite(config)
+
+    data = b'1000\r\r\n1001\r\r\n1002\r\r\n'
+    view = memoryview(data)
+    lines = [(offset, bytes(line)) for offset, line in loader.mapped_lines(view, 0, len(data))]
+
+    assert lines == [(0, b'1000'), (7, b'1001'), (14, b'1002')]
+
+
+def test_mapped_lines_repairs_gremlin_line(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadEMSHRLite(config)
+
+    data = b'1000\r\r\nPR\xc3\x83\xc2\xa9V\r\r\n1002\r\r\n'
+    view = memoryview(data)
+    lines = [(offset, bytes(line)) for offset, line in loader.mapped_lines(view, 0, len(data))]
+
+    assert lines == [(0, b'1000'), (7, b'PREV   '), (17, b'1002')]
+
+
+def test_load_delegates_to_load_parallel(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config, memory_mapped=True, workers=4)
+    mocker.patch.object(loader, 'load_parallel', 
+        autospec=True, return_value=[StationMetadata(123)])
+    mocker.patch.object(loader, 'load_mapped', autospec=True)
+    metadatas = loader.load()
+
+    loader.load_parallel.assert_called_once()
+    loader.load_mapped.assert_not_called()
+    assert metadatas[0].ncdc == 123
+
+
+def test_iter_stations_yields_each_station_once(mocker):
+    
+    with patch("builtins.open", mock_open(read_data=b'heading\nseparator\n1000\n1001\n1002')):
+        config = mocker.MagicMock()    
+        config.input_file_path = './emshr_lite.txt'
+
+        loader = LoadEMSHRLite(config, block_parsed=False)               
+        metadata0 = StationMetadata(123)
+        metadata1 = StationMetadata(456)
+        return_values = [metadata0, metadata0, metadata1]
+        mocker.patch.object(loader, 'extract_metadata', 
+            autospec=True, side_effect=return_values)
+        stations = loader.iter_stations()
+
+        assert next(stations) is metadata0
+        assert loader.extract_metadata.call_count == 3
+        assert next(stations) is metadata1
+        with pytest.raises(StopIteration):
+            next(stations)
+
+
+def test_zap_gremlins_uses_configured_table(mocker): 
+    config = mocker.MagicMock()    
+    config.input_file_path = ''
+
+    loader = LoadEMSHRLite(config, gremlins={b'\xc3\xb6': b'O'})
+    
+    input_bytes = b'K\xc3\xb6LN'
+    output_bytes = loader.zap_gremlins(input_bytes)
+
+    assert output_bytes == b'KOLN '
+
+
+def test_iter_stations_uses_current_cache(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config, cached=True)
+    metadatas = [StationMetadata(123)]
+    mocker.patch('library.load_emshr_lite.StationCache.read_columns',
+        autospec=True, return_value=dict())
+    mocker.patch('library.load_emshr_lite.StationCache.iter_column_stations',
+        autospec=True, return_value=iter(metadatas))
+    mocker.patch.object(loader, 'iter_parsed_stations', autospec=True)
+
+    assert list(loader.iter_stations()) == metadatas
+    loader.iter_parsed_stations.assert_not_called()
+
+
+def test_iter_stations_reparses_unreadable_cache(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config, cached=True)
+    metadatas = [StationMetadata(123)]
+    mocker.patch('library.load_emshr_lite.StationCache.read_columns',
+        autospec=True, return_value=None)
+    mocker.patch('library.load_emshr_lite.StationCache.iter_saving',
+        autospec=True, side_effect=lambda cache, stations: stations)
+    mocker.patch.object(loader, 'iter_parsed_stations', 
+        autospec=True, return_value=iter(metadatas))
+
+    assert list(loader.iter_stations()) == metadatas
+    loader.iter_parsed_stations.assert_called_once()
+
+
+def test_iter_stations_reparses_when_refreshing_cache(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config, cached=True, refresh_cache=True)
+    metadatas = [StationMetadata(123)]
+    mocker.patch('library.load_emshr_lite.StationCache.read_columns',
+        autospec=True, return_value=dict())
+    mocker.patch('library.load_emshr_lite.StationCache.iter_saving',
+        autospec=True, side_effect=lambda cache, stations: stations)
+    mocker.patch.object(loader, 'iter_parsed_stations', 
+        autospec=True, return_value=iter(metadatas))
+
+    assert list(loader.iter_stations()) == metadatas
+    loader.iter_parsed_stations.assert_called_once()
+
+
+def test_construction_defaults_to_block_parsing(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadEMSHRLite(config)
+    
+    assert loader.block_parsed
+
+
+def test_buffer_runs_splits_clean_runs_from_odd_lines(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadEMSHRLite(config)
+
+    data = b'1000\r\r\n1001\r\r\nPR\xc3\x83\xc2\xa9V\r\r\n1003\r\r\n1004'
+    runs = list(loader.buffer_runs(data, 0, len(data), 7))
+
+    assert runs == [(0, 14, True), (14, 24, False), (24, 31, True), (31, 35, False)]
+
+
+def test_buffer_runs_limits_run_length(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadEMSHRLite(config)
+    mocker.patch.object(LoadEMSHRLite, 'BLOCK_LINE_COUNT', 2)
+
+    data = b'1000\n1001\n1002\n'
+    runs = list(loader.buffer_runs(data, 0, len(data), 5))
+
+    assert runs == [(0, 10, True), (10, 15, True)]
+
+
+def test_line_stride_passes_over_gremlin_lines(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadEMSHRLite(config)
+
+    data = b'PR\xc3\x83\xc2\xa9V\r\r\n1001\r\r\n'
+    
+    assert loader.line_stride(memoryview(data), 0, len(data)) == (7, 4)
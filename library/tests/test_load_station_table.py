@@ -0,0 +1,111 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+from unittest.mock import patch, mock_open
+
+from datetime import date
+
+from library.column_layout import ColumnLayout
+from library.load_station_table import LoadStationTable
+
+
+HEADINGS = 'NCDC     BEG_DT   END_DT   CC LAT_DEC   LON_DEC   '
+SEPARATOR = '-------- -------- -------- -- --------- ----------'
+
+
+def make_file(lines: list, end_of_line: bytes=b'\r\r\n') -> bytes:
+    return end_of_line.join(
+        [HEADINGS.encode(), SEPARATOR.encode()] + lines) + end_of_line
+
+
+def test_construction(mocker):
+
+    config = mocker.MagicMock()    
+    config.input_file_path = './emshr_lite.txt'
+
+    loader = LoadStationTable(config)
+    
+    assert loader.file_path == './emshr_lite.txt'
+
+
+def test_record_dtype(mocker):
+
+    config = mocker.MagicMock()    
+    loader = LoadStationTable(config)
+    column_layout = ColumnLayout(['NCDC', 'END_DT'], HEADINGS, SEPARATOR)
+
+    dtype = loader.record_dtype(column_layout, 54)
+
+    assert dtype.itemsize == 54
+    assert dtype.fields['NCDC'][1] == 0
+    assert dtype.fields['END_DT'] == (dtype.fields['END_DT'][0], 17)
+    assert dtype.fields['END_DT'][0].itemsize == 9
+
+
+def test_load_groups_stations(mocker):
+
+    data = make_file([
+        b'10000001 19490713 19501115 US  44.58333   -124.05',
+        b'10000001 19501115 99991231 US  44.58333   -124.05',
+        b'10000158 19230401 19260131 US 58.416667    -135.7',
+    ])
+    with patch("builtins.open", mock_open(read_data=data)):
+        config = mocker.MagicMock()    
+        table = LoadStationTable(config).load()
+
+    assert list(table.ncdcs) == [10000001, 10000158]
+    assert list(table.country_codes) == ['US', 'US']
+    assert list(table.location_offsets) == [0, 2, 3]
+    assert table.start_ordinals[0] == date(1949, 7, 13).toordinal()
+    assert table.end_ordinals[1] == date(9999, 12, 31).toordinal()
+    assert table.latitudes[2] == 58.416667
+    assert table.longitudes[2] == -135.7
+
+
+def test_load_repairs_irregular_lines(mocker):
+
+    data = make_file([
+        b'10000001 19501115 19490713 US  44.58333   -124.05',
+        b'10000001 19501115 19600101 \xc4\xa0S  44.58333   -124.05',
+        b'10000158 19230401 19260230 US 58.416667    -135.7',
+        b'10000159 19230401 19260131 US                    ',
+    ])
+    with patch("builtins.open", mock_open(read_data=data)):
+        config = mocker.MagicMock()    
+        table = LoadStationTable(config).load()
+
+    # The inverted period is swapped, the bad date is dropped
+    # and the missing coordinates are NaN.
+    assert list(table.ncdcs) == [10000001, 10000159]
+    assert table.start_ordinals[0] == date(1949, 7, 13).toordinal()
+    assert table.end_ordinals[0] == date(1950, 11, 15).toordinal()
+    assert table.location_count() == 3
+    assert table.longitudes[1] == -124.05
+    assert str(table.latitudes[2]) == 'nan'
+
+
+def test_load_removes_duplicate_periods(mocker):
+
+    data = make_file([
+        b'10000001 19490713 19501115 US  44.58333   -124.05',
+        b'10000001 19490713 19501115 US  44.58334   -124.05',
+    ], b'\n')
+    with patch("builtins.open", mock_open(read_data=data)):
+        config = mocker.MagicMock()    
+        table = LoadStationTable(config).load()
+
+    assert table.location_count() == 1
+    assert table.latitudes[0] == 44.58334
+
+
+def test_load_empty_file(mocker):
+
+    with patch("builtins.open", mock_open(read_data=b'')):
+        config = mocker.MagicMock()    
+        table = LoadStationTable(config).load()
+
+    assert table.station_count() == 0
+    assert table.location_count() == 0
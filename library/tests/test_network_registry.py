@@ -0,0 +1,54 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+from library.network_registry import NetworkRegistry
+
+
+def test_positions_grow():
+
+    registry = NetworkRegistry()
+
+    assert registry.position('COOP') == 0
+    assert registry.position('ASOS') == 1
+    assert registry.position('COOP') == 0
+    assert registry.bit('ASOS') == 2
+    assert len(registry) == 2
+
+
+def test_find_does_not_register():
+
+    registry = NetworkRegistry()
+    registry.position('COOP')
+
+    assert registry.find('COOP') == 0
+    assert registry.find('NOT_A_NET') is None
+    assert len(registry) == 1
+
+
+def test_mask_and_names():
+
+    registry = NetworkRegistry()
+
+    coop_asos = registry.mask(['COOP', 'ASOS'])
+    coop_ushcn = registry.mask(('USHCN', 'COOP'))
+
+    assert registry.names(coop_asos) == {'COOP', 'ASOS'}
+    assert registry.names(coop_asos | coop_ushcn) == {'COOP', 'ASOS', 'USHCN'}
+    assert registry.names(coop_asos & coop_ushcn) == {'COOP'}
+    assert registry.names(0) == set()
+    assert registry.mask([]) == 0
+
+
+def test_mask_dtype():
+
+    registry = NetworkRegistry()
+    registry.mask(str(index) for index in range(64))
+
+    assert registry.mask_dtype() == np.uint64
+    registry.bit('NEW')
+    assert registry.mask_dtype() == object
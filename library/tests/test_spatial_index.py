@@ -0,0 +1,65 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+import pytest
+
+from library.spatial_index import SpatialIndex
+from library.geodesy import chord_to_km, km_to_chord, unit_vectors, haversine_km
+
+
+def make_index():
+    # Points along the equator about 111 km apart, and one at the pole.
+    latitudes = np.array([0.0, 0.0, 0.0, 0.0, 90.0, np.nan])
+    longitudes = np.array([0.0, 1.0, 2.0, 3.0, 0.0, np.nan])
+    groups = np.array([0, 0, 1, 2, 3, 4])
+    starts = np.array([10, 20, 10, 10, 10, 10])
+    ends = np.array([15, 30, 30, 30, 30, 30])
+    return SpatialIndex(latitudes, longitudes, groups, starts, ends)
+
+
+def test_geodesy():
+
+    assert chord_to_km(km_to_chord(50.0)) == pytest.approx(50.0)
+    assert chord_to_km(2.0) == pytest.approx(np.pi * 6371.0088)
+    assert unit_vectors(90.0, 0.0) == pytest.approx([0.0, 0.0, 1.0])
+    assert haversine_km(0.0, 0.0, 0.0, 1.0) == pytest.approx(111.195, abs=0.001)
+    assert haversine_km(0.0, 0.0, 0.0, 180.0) == pytest.approx(chord_to_km(2.0))
+    assert np.isnan(haversine_km(np.nan, 0.0, 0.0, 1.0))
+
+
+def test_within():
+
+    index = make_index()
+
+    groups, distances = index.within(0.0, 0.9, 150.0)
+
+    assert len(index) == 5
+    assert list(groups) == [0, 1]
+    assert distances[0] == pytest.approx(11.1, abs=0.1)
+    assert distances[1] == pytest.approx(122.3, abs=0.1)
+
+
+def test_within_time_filtered():
+
+    index = make_index()
+
+    groups, distances = index.within(0.0, 0.9, 150.0, 12)
+
+    assert list(groups) == [0, 1]
+    assert distances[0] == pytest.approx(100.1, abs=0.1)
+
+
+def test_nearest():
+
+    index = make_index()
+
+    groups, distances = index.nearest(1.0, 3.0, 3)
+
+    assert list(groups) == [2, 1, 0]
+    assert list(distances) == sorted(distances)
+    assert list(index.nearest(80.0, 0.0, 10)[0]) == [3, 0, 1, 2]
+    assert list(index.nearest(0.0, 0.0, 2, 16, 18)[0]) == [1, 2]
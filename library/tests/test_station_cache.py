@@ -0,0 +1,140 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import os
+
+from datetime import datetime
+
+from library.station_cache import StationCache, settings_digest
+import library.file_key as file_key_module
+from library.station_metadata import StationMetadata
+from library.station_location import OrdinalStationLocation
+from library.misc_types import spherical_coordinate
+from library.field_types import ColumnField, INT_ID, TEXT, INTERNED_STRING
+
+
+def make_metadatas():
+    metadata0 = StationMetadata(123, 'CHARLESTON')
+    metadata0.set_country_code('US')
+    metadata0.add_networks(['COOP', 'USHCN'])
+    metadata0.add_location(OrdinalStationLocation(
+        spherical_coordinate(32.783333, -79.933333),
+        datetime(1738, 1, 1).toordinal(), datetime(1760, 1, 1).toordinal()))
+    metadata0.add_location(OrdinalStationLocation(
+        spherical_coordinate(None, None),
+        datetime(1760, 1, 1).toordinal(), datetime(9999, 12, 31).toordinal()))
+    metadata1 = StationMetadata(456)
+    metadata1.add_networks(['COOP'])
+    return [metadata0, metadata1]
+
+
+def write_cache(tmp_path):
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(b'heading\nseparator\n')
+    cache = StationCache(str(input_path))
+    metadatas = list(cache.iter_saving(make_metadatas()))
+    return cache, metadatas
+
+
+def test_construction():
+
+    cache = StationCache('./emshr_lite.txt')
+
+    assert cache.cache_path == './emshr_lite.txt.cache'
+
+
+def test_is_valid_without_snapshot(tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(b'heading\nseparator\n')
+
+    assert not StationCache(str(input_path)).is_valid()
+
+
+def test_iter_saving_writes_snapshot(tmp_path):
+
+    cache, metadatas = write_cache(tmp_path)
+
+    assert len(metadatas) == 2
+    assert os.path.isfile(cache.cache_path)
+    assert cache.is_valid()
+
+
+def test_iter_stations_round_trip(tmp_path):
+
+    cache, metadatas = write_cache(tmp_path)
+
+    cached_metadatas = list(cache.iter_stations())
+
+    assert [metadata.dump() for metadata in cached_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+    assert cached_metadatas[0].name == 'CHARLESTON'
+    assert cached_metadatas[0].country_code == 'US'
+    assert cached_metadatas[0].networks == {'COOP', 'USHCN'}
+    assert cached_metadatas[0].locations[1].coordinate() == (None, None)
+    assert cached_metadatas[1].name == ''
+    assert cached_metadatas[1].location_count() == 0
+
+
+def test_snapshot_survives_touch(tmp_path):
+
+    cache, _ = write_cache(tmp_path)
+    stat = os.stat(cache.file_path)
+    os.utime(cache.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert cache.is_valid()
+
+
+def test_snapshot_is_stale_after_change(tmp_path):
+
+    cache, _ = write_cache(tmp_path)
+    with open(cache.file_path, 'ab') as input_file:
+        input_file.write(b'10000001')
+
+    assert not cache.is_valid()
+    assert list(cache.iter_stations()) == []
+
+
+def test_corrupt_snapshot_is_not_read(tmp_path):
+
+    cache, _ = write_cache(tmp_path)
+    with open(cache.cache_path, 'r+b') as cache_file:
+        cache_file.truncate(os.path.getsize(cache.cache_path) - 40)
+
+    # The header is still current, but the columns are not all there.
+    assert cache.is_valid()
+    assert cache.read_columns() is None
+    assert list(cache.iter_stations()) == []
+
+
+def test_snapshot_is_stale_after_settings_change(tmp_path):
+
+    cache, _ = write_cache(tmp_path)
+    fields = [ColumnField('NCDC', INT_ID), ColumnField('CC', INTERNED_STRING)]
+    gremlins = {b'\xc4\xa0': b'G'}
+    settings = settings_digest(fields, gremlins)
+
+    assert not StationCache(cache.file_path, settings=settings).is_valid()
+    # Another field type, field or gremlin table gives other settings.
+    assert settings_digest([ColumnField('NCDC', TEXT), fields[1]], gremlins) != settings
+    assert settings_digest(fields[0:1], gremlins) != settings
+    assert settings_digest(fields, {}) != settings
+    assert settings_digest(list(fields), dict(gremlins)) == settings
+
+
+def test_touch_rewrites_key(tmp_path, mocker):
+
+    cache, _ = write_cache(tmp_path)
+    stat = os.stat(cache.file_path)
+    os.utime(cache.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    file_hash = mocker.spy(file_key_module, 'file_hash')
+
+    assert cache.is_valid()
+    assert cache.is_valid()
+
+    # Only the first check after the touch hashes the input.
+    assert file_hash.call_count == 1
+    assert len(list(cache.iter_stations())) == 2
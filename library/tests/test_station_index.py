@@ -0,0 +1,114 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import os
+
+from library.station_index import StationIndex
+import library.file_key as file_key_module
+
+
+LINES = [
+    b'NCDC     BEG_DT\r\r\n',
+    b'-------- --------\r\r\n',
+    b'10000001 19490713\r\r\n',
+    b'10000001 19590701\r\r\n',
+    b'30125305 17380101\r\r\n',
+    b'BADNCDC. 17380101\r\r\n',
+    b'10000158 19230401\r\r\n',
+    b'30125305 17600101\r\r\n',
+]
+
+
+def write_input(tmp_path):
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(b''.join(LINES))
+    return StationIndex(str(input_path))
+
+
+def line_offset(line_index):
+    return len(b''.join(LINES[0:line_index]))
+
+
+def test_construction():
+
+    index = StationIndex('./emshr_lite.txt')
+
+    assert index.index_path == './emshr_lite.txt.index'
+
+
+def test_scan(tmp_path):
+
+    index = write_input(tmp_path)
+
+    columns = index.scan()
+
+    assert list(columns['ncdc']) == [10000001, 10000158, 30125305, 30125305]
+    assert list(columns['offset']) == [
+        line_offset(2), line_offset(6), line_offset(4), line_offset(7)]
+    assert list(columns['line_count']) == [2, 1, 1, 1]
+
+
+def test_lookup_builds_index(tmp_path):
+
+    index = write_input(tmp_path)
+
+    assert not index.is_valid()
+    assert index.lookup(10000001) == [(line_offset(2), 2)]
+    assert index.is_valid()
+    assert os.path.isfile(index.index_path)
+
+
+def test_lookup_split_station(tmp_path):
+
+    index = write_input(tmp_path)
+
+    assert index.lookup(30125305) == [(line_offset(4), 1), (line_offset(7), 1)]
+
+
+def test_lookup_missing_station(tmp_path):
+
+    index = write_input(tmp_path)
+
+    assert index.lookup(5) == []
+    assert index.lookup(99999999) == []
+
+
+def test_index_round_trip(tmp_path):
+
+    write_input(tmp_path).build()
+    index = StationIndex(str(tmp_path / 'emshr_lite.txt'))
+
+    columns = index.read_columns()
+
+    assert list(columns['ncdc']) == [10000001, 10000158, 30125305, 30125305]
+    assert list(columns['line_count']) == [2, 1, 1, 1]
+
+
+def test_index_is_rebuilt_after_change(tmp_path):
+
+    index = write_input(tmp_path)
+    index.lookup(10000001)
+    with open(index.file_path, 'ab') as input_file:
+        input_file.write(b'40000001 19230401\r\r\n')
+
+    assert not index.is_valid()
+    assert index.lookup(40000001) == [(line_offset(8), 1)]
+    assert index.is_valid()
+
+
+def test_touch_rewrites_key(tmp_path, mocker):
+
+    index = write_input(tmp_path)
+    index.build()
+    stat = os.stat(index.file_path)
+    os.utime(index.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    file_hash = mocker.spy(file_key_module, 'file_hash')
+
+    assert index.is_valid()
+    assert index.read_columns() is not None
+
+    # Only the first check after the touch hashes the input.
+    assert file_hash.call_count == 1
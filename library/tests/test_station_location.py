@@ -4,10 +4,11 @@ Created on 22 Jun. 2021
 @author: richardrothwell
 '''
 
+import pickle
 from datetime import datetime
 from datetimerange import DateTimeRange
 
-from library.station_location import StationLocation
+from library.station_location import StationLocation, OrdinalStationLocation, CompactStationLocation
 from library.misc_types import spherical_coordinate
 
 def almost_equal(actual, expected):
@@ -181,4 +182,82 @@ def test_is_valid_after_period_when_ranges_out_of_order():
         DateTimeRange(begin_date1, end_date1)
     )
     assert not location1.is_period_valid_after_period(location0)
-    
\ No newline at end of file
+    
+
+def test_ordinal_location_period():
+
+    start_ordinal = datetime(2018, 11, 9).toordinal()
+    end_ordinal = datetime(2018, 11, 10).toordinal()
+
+    location = OrdinalStationLocation(
+        spherical_coordinate(180.5, 135.7), start_ordinal, end_ordinal)
+
+    assert location.period() == \
+        DateTimeRange(datetime(2018, 11, 9), datetime(2018, 11, 10))
+    assert str(location) == '2018-11-09 : 2018-11-10 -> (180.5, 135.7)'
+    assert location.is_valid_period()
+
+
+def test_ordinal_location_is_valid_after_period():
+
+    location0 = OrdinalStationLocation(
+        None, datetime(2018, 11, 9).toordinal(), datetime(2018, 11, 11).toordinal())
+    location1 = OrdinalStationLocation(
+        None, datetime(2018, 11, 11).toordinal(), datetime(2018, 11, 12).toordinal())
+    location2 = StationLocation(
+        None, DateTimeRange(datetime(2018, 11, 10), datetime(2018, 11, 12)))
+
+    assert location1.is_period_valid_after_period(location0)
+    assert not location0.is_period_valid_after_period(location1)
+    assert not location1.is_period_valid_after_period(location2)
+
+
+def test_ordinal_location_has_same_period():
+
+    start_ordinal = datetime(2018, 11, 9).toordinal()
+    end_ordinal = datetime(2018, 11, 10).toordinal()
+    location0 = OrdinalStationLocation(None, start_ordinal, end_ordinal)
+    location1 = OrdinalStationLocation(None, start_ordinal, end_ordinal)
+    location2 = StationLocation(
+        None, DateTimeRange(datetime(2018, 11, 9), datetime(2018, 11, 10)))
+
+    assert location0.has_same_period(location1)
+    assert location0.has_same_period(location2)
+    assert not location0.has_same_period(
+        OrdinalStationLocation(None, start_ordinal, end_ordinal + 1))
+
+
+def test_compact_location():
+
+    start_ordinal = datetime(2018, 11, 9).toordinal()
+    end_ordinal = datetime(2018, 11, 10).toordinal()
+
+    location = CompactStationLocation(180.5, 135.7, start_ordinal, end_ordinal)
+
+    assert location.coordinate() == spherical_coordinate(180.5, 135.7)
+    assert location.period() == \
+        DateTimeRange(datetime(2018, 11, 9), datetime(2018, 11, 10))
+    assert str(location) == '2018-11-09 : 2018-11-10 -> (180.5, 135.7)'
+    assert location.has_same_period(OrdinalStationLocation(None, start_ordinal, end_ordinal))
+    # Just the four fields, with no instance dictionary.
+    assert not hasattr(location, '__dict__')
+    assert [slot for cls in type(location).__mro__ for slot in getattr(cls, '__slots__', ())] \
+        == ['latitude', 'longitude', 'start_ordinal', 'end_ordinal']
+
+
+def test_compact_location_without_coordinate():
+
+    location = CompactStationLocation(
+        None, None, datetime(2018, 11, 9).toordinal(), datetime(2018, 11, 10).toordinal())
+
+    assert location.coordinate() == spherical_coordinate(None, None)
+    assert str(location) == '2018-11-09 : 2018-11-10 -> (None, None)'
+
+
+def test_ordinal_locations_pickle():
+
+    location0 = OrdinalStationLocation(spherical_coordinate(180.5, 135.7), 1, 2)
+    location1 = CompactStationLocation(180.5, 135.7, 1, 2)
+
+    assert str(pickle.loads(pickle.dumps(location0))) == str(location0)
+    assert str(pickle.loads(pickle.dumps(location1))) == str(location1)
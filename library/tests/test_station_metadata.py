@@ -4,6 +4,9 @@ Created on 22 Jun. 2021
 @author: richardrothwell
 '''
 
+import gc
+import pickle
+import pytest
 from datetime import datetime
 from datetimerange import DateTimeRange 
 
@@ -29,6 +32,53 @@ def test_construction():
     assert station_metadata.GHCND is None
     assert len(station_metadata.locations) is 0
     assert len(station_metadata.networks) is 0
+    # The identifiers take no space unless set.
+    assert station_metadata.__dict__ == {}
+
+
+def test_identifier_can_be_set():
+
+    station_metadata = StationMetadata(123)
+    station_metadata.WBAN = '24285'
+
+    assert station_metadata.WBAN == '24285'
+    assert StationMetadata(124).WBAN is None
+
+
+def test_pickle():
+
+    station_metadata = StationMetadata(123, 'CHARLESTON')
+    station_metadata.set_country_code('US')
+    station_metadata.add_networks(['COOP'])
+
+    copy = pickle.loads(pickle.dumps(station_metadata))
+
+    assert copy == station_metadata
+    assert copy.name == 'CHARLESTON'
+    assert copy.country_code == 'US'
+    assert copy.networks == {'COOP'}
+
+
+def test_pickle_does_not_make_instance_dict():
+
+    station_metadata = StationMetadata(123, 'CHARLESTON')
+
+    copy = pickle.loads(pickle.dumps(station_metadata))
+
+    # Reading __dict__ would make one, so look at the referents instead.
+    assert not any(isinstance(referent, dict) for referent in gc.get_referents(station_metadata))
+    assert not any(isinstance(referent, dict) for referent in gc.get_referents(copy))
+
+
+def test_pickle_keeps_identifiers():
+
+    station_metadata = StationMetadata(123, 'CHARLESTON')
+    station_metadata.WBAN = '24285'
+
+    copy = pickle.loads(pickle.dumps(station_metadata))
+
+    assert copy.WBAN == '24285'
+    assert station_metadata.WBAN == '24285'
 
 
 def test_representation():
@@ -473,6 +523,7 @@ def test_set_networks():
     
     assert 'COOP' in metadata.networks
     assert 'USHCN' in metadata.networks
+    assert metadata.network_count() == 2
     
 
 def test_add_networks():
@@ -485,8 +536,21 @@ def test_add_networks():
     
     assert 'COOP' in metadata.networks
     assert 'USHCN' in metadata.networks
+    assert metadata.network_count() == 2
     
 
+def test_networks_cannot_be_changed_in_place():
+    
+    metadata = StationMetadata(1)
+    metadata.set_networks({'COOP'})
+    
+    with pytest.raises(AttributeError):
+        metadata.networks.add('USHCN')
+    
+    assert metadata.networks == {'COOP'}
+    
+
+
 def test_set_country_code():
     
     metadata = StationMetadata(1)
@@ -494,3 +558,48 @@ def test_set_country_code():
     metadata.set_country_code('US')
     
     assert metadata.country_code == 'US'
+
+
+def test_derived_values_are_cached(mocker):
+
+    metadata = StationMetadata(0)
+    metadata.add_location(StationLocation(
+        None, DateTimeRange(datetime(1990, 7, 3), datetime(1991, 6, 2))))
+    mocker.patch.object(metadata, '_check_periods', autospec=True, return_value=True)
+    mocker.patch.object(metadata, '_check_retired', autospec=True, return_value=True)
+
+    assert metadata.is_valid_periods()
+    assert metadata.is_valid_periods()
+    assert metadata.is_retired_station()
+    assert metadata.is_retired_station()
+
+    metadata._check_periods.assert_called_once()
+    metadata._check_retired.assert_called_once()
+
+
+def test_derived_values_are_invalidated():
+
+    metadata = StationMetadata(0)
+    location0 = StationLocation(
+        None, DateTimeRange(datetime(2000, 7, 3), datetime(2001, 6, 2)))
+    location1 = StationLocation(
+        None, DateTimeRange(datetime(1990, 7, 3), FAR_FUTURE_DATE))
+    metadata.add_location(location0)
+
+    assert metadata.is_retired_station()
+    assert metadata.earliest_location() is location0
+    assert metadata.is_valid_periods()
+
+    metadata.add_location(location1)
+
+    assert not metadata.is_retired_station()
+    assert not metadata.is_valid_periods()
+
+    metadata.sort_locations_by_start_date()
+
+    assert metadata.earliest_location() is location1
+    assert metadata.is_retired_station()
+
+    metadata.set_locations([])
+
+    assert metadata.earliest_location() is None
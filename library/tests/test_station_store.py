@@ -0,0 +1,254 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+import pytest
+from datetime import date, datetime
+from datetimerange import DateTimeRange
+
+from library.station_store import StationStore
+from library.station_metadata import StationMetadata
+from library.station_location import StationLocation, CompactStationLocation
+from library.misc_types import spherical_coordinate
+from library.date_ordinals import UNKNOWN_START_ORDINAL, STILL_OPEN_ORDINAL
+from library.network_registry import NetworkRegistry, NETWORK_REGISTRY
+
+
+def make_metadatas():
+    metadata0 = StationMetadata(123, 'CHARLESTON')
+    metadata0.set_country_code('US')
+    metadata0.add_networks(['COOP', 'WBAN'])
+    metadata0.add_location(CompactStationLocation(
+        None, None, UNKNOWN_START_ORDINAL, date(1950, 1, 1).toordinal()))
+    metadata0.add_location(CompactStationLocation(
+        32.9, -80.0, date(1950, 1, 1).toordinal(), STILL_OPEN_ORDINAL))
+    metadata1 = StationMetadata(456, 'TORONTO')
+    metadata1.set_country_code('CA')
+    metadata1.add_networks(['GHCND'])
+    metadata1.add_location(StationLocation(
+        spherical_coordinate(43.7, -79.4),
+        DateTimeRange(datetime(1940, 1, 1), datetime(1960, 1, 1))))
+    metadata1.add_location(CompactStationLocation(
+        43.6, -79.4, date(1955, 1, 1).toordinal(), date(1970, 1, 1).toordinal()))
+    metadata2 = StationMetadata(789, 'NOWHERE')
+    return [metadata0, metadata1, metadata2]
+
+
+def test_from_metadatas():
+
+    store = StationStore.from_metadatas(iter(make_metadatas()))
+
+    assert len(store) == 3
+    assert store.location_count() == 4
+    assert list(store.location_counts()) == [2, 2, 0]
+    assert list(store.location_ncdcs()) == [123, 123, 456, 456]
+    assert store.names == ['CHARLESTON', 'TORONTO', 'NOWHERE']
+    assert store.start_ordinals[2] == date(1940, 1, 1).toordinal()
+    codes, indices = store.country_indices()
+    assert list(codes[indices]) == ['US', 'US', 'CA', 'CA']
+
+
+def test_stations_match_metadatas():
+
+    metadatas = make_metadatas()
+    store = StationStore.from_metadatas(metadatas)
+
+    for metadata, station in zip(metadatas, store):
+        assert station == metadata
+        assert station.name == metadata.name
+        assert station.country_code == metadata.country_code
+        assert station.networks == metadata.networks
+        assert station.dump() == metadata.dump()
+
+
+def test_aggregates_match_metadatas():
+
+    metadatas = make_metadatas()
+    store = StationStore.from_metadatas(metadatas)
+
+    assert list(store.valid_periods()) == [metadata.is_valid_periods() for metadata in metadatas]
+    assert list(store.retired()) == [metadata.is_retired_station() for metadata in metadatas]
+    assert store.earliest_station_index() == 1
+    assert store.available_networks() == {'COOP', 'WBAN', 'GHCND'}
+
+
+def test_network_queries():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    assert list(store.in_network('COOP')) == [True, False, False]
+    assert list(store.in_network('UNSEEN')) == [False, False, False]
+    assert NETWORK_REGISTRY.find('UNSEEN') is None
+    assert store.network_counts() == {'COOP': 1, 'GHCND': 1, 'WBAN': 1}
+
+
+def test_network_registered_after_store(monkeypatch):
+
+    registry = NetworkRegistry()
+    monkeypatch.setattr('library.station_store.NETWORK_REGISTRY', registry)
+    coop = registry.bit('COOP')
+    store = StationStore(
+        np.array([123], dtype=np.int64), np.array(['US']), np.array([0, 0], dtype=np.int64),
+        np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32),
+        np.zeros(0), np.zeros(0), ['CHARLESTON'], np.zeros(1, dtype=np.uint32),
+        np.array([coop], dtype=registry.mask_dtype()))
+    # Past the 64 bits of the masks of the store.
+    registry.mask(str(index) for index in range(64))
+
+    assert list(store.in_network('COOP')) == [True]
+    assert list(store.in_network('63')) == [False]
+
+
+def test_empty_store():
+
+    store = StationStore.from_metadatas([])
+
+    assert len(store) == 0
+    assert store.earliest_station_index() is None
+    assert len(store.valid_periods()) == 0
+    assert store.available_networks() == set()
+
+
+def test_select():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    selected = store.select([2, 1])
+
+    assert list(selected.ncdcs) == [789, 456]
+    assert list(selected.location_offsets) == [0, 0, 2]
+    assert list(selected.start_ordinals) == list(store.start_ordinals[2:4])
+    assert [station.dump() for station in selected] == \
+        [store.station(2).dump(), store.station(1).dump()]
+
+
+def test_stations_active():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    assert list(store.stations_active_on(date(1945, 6, 1))) == [0, 1]
+    assert list(store.stations_active_on(date(1975, 6, 1))) == [0]
+    assert list(store.stations_active_between(date(1951, 1, 1), date(1956, 1, 1))) == [0, 1]
+
+
+def test_active_station_counts_by_year():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    periods, counts = store.active_station_counts('year', date(1938, 1, 1), date(1972, 12, 31))
+
+    assert periods[0] == np.datetime64('1938')
+    assert periods[-1] == np.datetime64('1972')
+    expected = dict((year, 0) for year in range(1938, 1973))
+    # The unknown start location of station 0 is not counted.
+    for year in range(1950, 1973):
+        expected[year] += 1
+    # The overlapping locations of station 1 are counted once.
+    for year in range(1940, 1971):
+        expected[year] += 1
+    assert list(counts) == list(expected.values())
+
+
+def test_active_station_counts_by_month():
+
+    metadata = StationMetadata(1)
+    metadata.add_location(CompactStationLocation(
+        None, None, date(2000, 1, 5).toordinal(), date(2000, 1, 10).toordinal()))
+    metadata.add_location(CompactStationLocation(
+        None, None, date(2000, 1, 20).toordinal(), date(2000, 3, 1).toordinal()))
+    store = StationStore.from_metadatas([metadata])
+
+    periods, counts = store.active_station_counts('month', end=date(2000, 5, 31))
+
+    assert list(periods.astype(str)) == ['2000-01', '2000-02', '2000-03', '2000-04', '2000-05']
+    assert list(counts) == [1, 1, 1, 0, 0]
+
+
+def test_active_station_counts_grouped():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    _, counts = store.active_station_counts('year', date(1945, 1, 1), date(1975, 1, 1))
+    _, country_counts = store.active_station_counts(
+        'year', date(1945, 1, 1), date(1975, 1, 1), group_by='country')
+    _, network_counts = store.active_station_counts(
+        'year', date(1945, 1, 1), date(1975, 1, 1), group_by='network')
+
+    assert list(country_counts) == ['', 'CA', 'US']
+    assert list(sum(country_counts.values())) == list(counts)
+    assert list(network_counts['COOP']) == list(country_counts['US'])
+    assert list(network_counts['GHCND']) == list(country_counts['CA'])
+    with pytest.raises(ValueError):
+        store.active_station_counts(group_by='state')
+
+
+def test_active_station_counts_when_empty():
+
+    store = StationStore.from_metadatas([])
+
+    periods, counts = store.active_station_counts('day', date(2000, 1, 1), date(2000, 1, 3))
+
+    assert len(periods) == 3
+    assert list(counts) == [0, 0, 0]
+
+
+def test_nearest_stations():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    stations, distances = store.nearest_stations(43.65, -79.38, 2)
+
+    assert list(stations) == [1, 0]
+    assert distances[0] < 10.0
+    assert list(store.nearest_stations(43.65, -79.38, 2, date(1941, 1, 1))[0]) == [1]
+
+
+def test_stations_within():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    stations, distances = store.stations_within(32.9, -80.0, 50.0)
+
+    assert list(stations) == [0]
+    assert distances[0] == pytest.approx(0.0, abs=1e-6)
+    assert len(store.stations_within(32.9, -80.0, 50.0, date(1940, 1, 1))[0]) == 0
+
+
+def test_relocations():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    relocations = store.relocations()
+
+    assert relocations.row_count() == 2
+    assert list(relocations.ncdcs) == [123, 456]
+    assert list(relocations.location_indices) == [1, 3]
+    # No coordinates for the first location of station 0.
+    assert np.isnan(relocations.distances_km[0])
+    assert relocations.distances_km[1] == pytest.approx(11.1, abs=0.1)
+    # An unknown start date for station 0.
+    assert np.isnan(relocations.elapsed_days[0])
+    assert relocations.elapsed_days[1] == (date(1955, 1, 1) - date(1940, 1, 1)).days
+    assert list(relocations.moves()) == [False, True]
+    assert list(relocations.pseudo_moves(20.0)) == [False, True]
+
+
+def test_grid_occupancy():
+
+    store = StationStore.from_metadatas(make_metadatas())
+
+    occupancy = store.grid_occupancy(5.0, date(1940, 1, 1), date(1972, 12, 31))
+
+    assert occupancy.counts.shape == (36 * 72, 33)
+    assert list(occupancy.years[[0, -1]]) == [1940, 1972]
+    charleston = occupancy.grid.cell_indices(32.9, -80.0)
+    toronto = occupancy.grid.cell_indices(43.7, -79.4)
+    # The location without coordinates is not counted.
+    assert list(occupancy.counts[charleston]) == [0] * 10 + [1] * 23
+    # Both Toronto locations are in one cell and counted once.
+    assert list(occupancy.counts[toronto]) == [1] * 31 + [0] * 2
+    assert occupancy.counts.sum() == 23 + 31
+    assert store.grid_occupancy(5.0, date(1940, 1, 1), date(1972, 12, 31)) is occupancy
@@ -0,0 +1,44 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import numpy as np
+
+from library.station_table import StationTable
+
+
+def make_table():
+    return StationTable(
+        np.array([123, 456]),
+        np.array(['US', 'CA']),
+        np.array([0, 2, 3]),
+        np.array([10, 20, 30], dtype=np.int32),
+        np.array([20, 30, 40], dtype=np.int32),
+        np.array([1.0, 2.0, np.nan]),
+        np.array([3.0, 4.0, np.nan]))
+
+
+def test_counts():
+
+    table = make_table()
+
+    assert table.station_count() == 2
+    assert table.location_count() == 3
+    assert list(table.location_counts()) == [2, 1]
+
+
+def test_location_slice():
+
+    table = make_table()
+
+    assert list(table.start_ordinals[table.location_slice(0)]) == [10, 20]
+    assert list(table.start_ordinals[table.location_slice(1)]) == [30]
+
+
+def test_location_stations():
+
+    table = make_table()
+
+    assert list(table.location_stations()) == [0, 0, 1]
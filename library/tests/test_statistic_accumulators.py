@@ -0,0 +1,98 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+
+import pytest
+from datetime import datetime
+from datetimerange import DateTimeRange
+
+from library.station_metadata import StationMetadata
+from library.station_location import StationLocation
+from library.statistic_accumulators import Accumulator, StatisticsAccumulator, \
+    StationCountAccumulator, EarliestStationAccumulator, NetworkAccumulator
+
+
+def make_metadata(ncdc, start_year, end_year, networks):
+    metadata = StationMetadata(ncdc, 'STATION')
+    # The year 9999 is the special value for a still open period.
+    end_datetime = datetime(9999, 12, 31) if end_year == 9999 else datetime(end_year, 1, 1)
+    metadata.add_location(StationLocation(
+        None, DateTimeRange(datetime(start_year, 1, 1), end_datetime)))
+    metadata.set_networks(networks)
+    return metadata
+
+
+def test_update_all():
+
+    metadatas = [
+        make_metadata(1, 1950, 1960, {'COOP'}),
+        make_metadata(2, 1940, 9999, {'GHCND'})]
+
+    statistics = StatisticsAccumulator().update_all(iter(metadatas)).finalize()
+
+    assert list(statistics) == [
+        'station_count', 'location_count', 'valid_period_count',
+        'earliest_station', 'retired_station_count', 'available_networks']
+    assert statistics['station_count'] == 2
+    assert statistics['location_count'] == 2
+    assert statistics['earliest_station'] == metadatas[1].dump()
+    assert statistics['retired_station_count'] == 1
+    assert statistics['available_networks'] == 'COOP, GHCND'
+
+
+def test_no_earliest_station():
+
+    statistics = StatisticsAccumulator().update_all([StationMetadata(1)]).finalize()
+
+    assert 'earliest_station' not in statistics
+    assert statistics['station_count'] == 1
+
+
+def test_merge():
+
+    metadatas = [
+        make_metadata(1, 1950, 1960, {'COOP'}),
+        make_metadata(2, 1940, 9999, {'GHCND'}),
+        make_metadata(3, 1930, 1935, {'COOP', 'USHCN'})]
+
+    first = StatisticsAccumulator().update_all(metadatas[0:1])
+    second = StatisticsAccumulator().update_all(metadatas[1:])
+    first.merge(second)
+
+    assert first.finalize() == StatisticsAccumulator().update_all(metadatas).finalize()
+
+
+def test_chosen_accumulators():
+
+    metadatas = [make_metadata(1, 1950, 1960, {'COOP'})]
+    accumulator = StatisticsAccumulator([StationCountAccumulator(), NetworkAccumulator()])
+
+    statistics = accumulator.update_all(metadatas).finalize()
+
+    assert statistics == {'station_count': 1, 'available_networks': 'COOP'}
+
+
+def test_earliest_station_keeps_first_on_tie():
+
+    metadatas = [make_metadata(1, 1950, 1960, set()), make_metadata(2, 1950, 1960, set())]
+    accumulator = EarliestStationAccumulator()
+
+    for metadata in metadatas:
+        accumulator.update(metadata)
+
+    assert accumulator.station.ncdc == 1
+
+
+def test_incomplete_accumulator_cannot_be_made():
+
+    class CountOnlyAccumulator(Accumulator):
+
+        key = 'count'
+
+        def update(self, metadata):
+            pass
+
+    with pytest.raises(TypeError):
+        CountOnlyAccumulator()
@@ -6,12 +6,15 @@ Created on 27 Jun. 2021
 
 import pytest
 import os
+import gzip
 
 from datetime import datetime
 from datetimerange import DateTimeRange 
 
 from library.configuration import Configuration
 from library.load_emshr_lite import LoadEMSHRLite
+from library.load_station_table import LoadStationTable
+from library.line_filter import LineFilter
 
 
 @pytest.fixture
@@ -85,3 +88,203 @@ def test_loader(loader):
         DateTimeRange(datetime(1923, 4, 1), datetime(1926, 1, 31))
     assert metadatas[1].locations[9].date_range == \
         DateTimeRange(datetime(1988, 5, 17), datetime(1988, 9, 7))
+
+
+def test_memory_mapped_loader_matches_loader(configuration):
+
+    metadatas = LoadEMSHRLite(configuration).load()
+    mapped_metadatas = LoadEMSHRLite(configuration, memory_mapped=True).load()
+
+    assert len(mapped_metadatas) == 2
+    assert [metadata.dump() for metadata in mapped_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+
+
+def test_chunk_offsets_align_on_stations(loader):
+
+    offsets = loader.chunk_offsets(3)
+
+    # The second station starts on the twelfth line.
+    assert offsets == [1076, 1076 + 9 * 537, 11279]
+
+
+def test_parallel_loader_matches_loader(configuration):
+
+    metadatas = LoadEMSHRLite(configuration).load()
+    parallel_metadatas = LoadEMSHRLite(configuration, workers=3).load()
+
+    assert len(parallel_metadatas) == 2
+    assert [metadata.dump() for metadata in parallel_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+
+
+def test_iter_stations_matches_loader(configuration):
+
+    metadatas = LoadEMSHRLite(configuration).load()
+
+    for loader in [
+            LoadEMSHRLite(configuration), 
+            LoadEMSHRLite(configuration, memory_mapped=True)]:
+        stations = list(loader.iter_stations())
+        assert [metadata.dump() for metadata in stations] == \
+            [metadata.dump() for metadata in metadatas]
+
+
+def test_cached_loader_matches_loader(tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(open(os.path.join(
+        os.path.dirname(__file__), 'emshr_lite_truncated.txt'), 'rb').read())
+    configuration = Configuration({'input_file_path': str(input_path)})
+
+    metadatas = LoadEMSHRLite(configuration).load()
+    parsed_metadatas = LoadEMSHRLite(configuration, cached=True).load()
+    cached_metadatas = LoadEMSHRLite(configuration, cached=True).load()
+
+    assert os.path.isfile(str(input_path) + '.cache')
+    assert [metadata.dump() for metadata in parsed_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+    assert [metadata.dump() for metadata in cached_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+
+
+def test_cached_loader_reparses_corrupt_snapshot(tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(open(os.path.join(
+        os.path.dirname(__file__), 'emshr_lite_truncated.txt'), 'rb').read())
+    configuration = Configuration({'input_file_path': str(input_path)})
+    cache_path = str(input_path) + '.cache'
+
+    metadatas = LoadEMSHRLite(configuration, cached=True).load()
+    with open(cache_path, 'r+b') as cache_file:
+        cache_file.truncate(os.path.getsize(cache_path) - 40)
+    reparsed_metadatas = LoadEMSHRLite(configuration, cached=True).load()
+    cached_metadatas = LoadEMSHRLite(configuration, cached=True).load()
+
+    assert len(metadatas) > 0
+    assert [metadata.dump() for metadata in reparsed_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+    assert [metadata.dump() for metadata in cached_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
+
+
+def test_station_table_matches_loader(configuration):
+
+    metadatas = LoadEMSHRLite(configuration).load()
+    table = LoadStationTable(configuration).load()
+
+    assert list(table.ncdcs) == [metadata.ncdc for metadata in metadatas]
+    assert list(table.location_counts()) == \
+        [metadata.location_count() for metadata in metadatas]
+    locations = [location for metadata in metadatas for location in metadata.locations]
+    assert list(table.start_ordinals) == [location.start_ordinal for location in locations]
+    assert list(table.end_ordinals) == [location.end_ordinal for location in locations]
+    assert list(table.latitudes) == [location.coordinate().latitude for location in locations]
+    assert list(table.longitudes) == [location.coordinate().longitude for location in locations]
+
+
+def test_compressed_loaders_match_loader(tmp_path, configuration):
+
+    metadatas = LoadEMSHRLite(configuration).load()
+    table = LoadStationTable(configuration).load()
+    input_path = tmp_path / 'emshr_lite.txt.gz'
+    input_path.write_bytes(gzip.compress(open(configuration.input_file_path, 'rb').read()))
+    compressed_configuration = Configuration({'input_file_path': str(input_path)})
+
+    for loader in [
+            LoadEMSHRLite(compressed_configuration), 
+            LoadEMSHRLite(compressed_configuration, memory_mapped=True, workers=2)]:
+        compressed_metadatas = loader.load()
+        assert [metadata.dump() for metadata in compressed_metadatas] == \
+            [metadata.dump() for metadata in metadatas]
+    compressed_table = LoadStationTable(compressed_configuration).load()
+    assert list(compressed_table.ncdcs) == list(table.ncdcs)
+    assert list(compressed_table.start_ordinals) == list(table.start_ordinals)
+
+
+def test_filtered_loaders_match(configuration):
+
+    line_filter = LineFilter(networks=['USHCN'], date_range=('19600101', '19851231'))
+
+    for loader in [
+            LoadEMSHRLite(configuration, line_filter=line_filter), 
+            LoadEMSHRLite(configuration, memory_mapped=True, line_filter=line_filter),
+            LoadEMSHRLite(configuration, memory_mapped=True, workers=2, line_filter=line_filter)]:
+        metadatas = loader.load()
+        assert [metadata.ncdc for metadata in metadatas] == [10000001]
+        assert [location.period().start_datetime.year 
+                for location in metadatas[0].locations] == [1963, 1980]
+
+
+def test_filtered_loader_bypasses_cache(tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(open(os.path.join(
+        os.path.dirname(__file__), 'emshr_lite_truncated.txt'), 'rb').read())
+    configuration = Configuration({'input_file_path': str(input_path)})
+
+    metadatas = LoadEMSHRLite(
+        configuration, cached=True, line_filter=LineFilter(country_codes=['CA'])).load()
+
+    assert metadatas == []
+    assert not os.path.isfile(str(input_path) + '.cache')
+
+
+def test_load_station_matches_loader(tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(open(os.path.join(
+        os.path.dirname(__file__), 'emshr_lite_truncated.txt'), 'rb').read())
+    configuration = Configuration({'input_file_path': str(input_path)})
+    loader = LoadEMSHRLite(configuration)
+
+    metadatas = loader.load()
+
+    for metadata in metadatas:
+        assert loader.load_station(metadata.ncdc).dump() == metadata.dump()
+    assert os.path.isfile(str(input_path) + '.index')
+    assert loader.load_station(30125305) is None
+
+
+def test_load_station_from_compressed_file(tmp_path, configuration):
+
+    metadatas = LoadEMSHRLite(configuration).load()
+    input_path = tmp_path / 'emshr_lite.txt.gz'
+    input_path.write_bytes(gzip.compress(open(configuration.input_file_path, 'rb').read()))
+    loader = LoadEMSHRLite(Configuration({'input_file_path': str(input_path)}))
+
+    assert loader.load_station(10000158).dump() == metadatas[1].dump()
+    assert not os.path.isfile(str(input_path) + '.index')
+
+
+def test_block_parsed_loaders_match_line_reader(tmp_path, configuration):
+
+    metadatas = LoadEMSHRLite(configuration, block_parsed=False).load()
+    # Put a gremlin in a station name so one line has an odd length.
+    data = open(configuration.input_file_path, 'rb').read()
+    name_offset = data.index(b'GUSTAVUS AP')
+    data = data[0:name_offset] + b'GUSTAVUS \xc3\x83\xc2\xa9P' + data[name_offset + 11:]
+    input_path = tmp_path / 'emshr_lite.txt'
+    input_path.write_bytes(data)
+    gremlin_configuration = Configuration({'input_file_path': str(input_path)})
+
+    for loader in [
+            LoadEMSHRLite(configuration), 
+            LoadEMSHRLite(configuration, memory_mapped=True),
+            LoadEMSHRLite(gremlin_configuration, block_parsed=False),
+            LoadEMSHRLite(gremlin_configuration), 
+            LoadEMSHRLite(gremlin_configuration, memory_mapped=True)]:
+        assert [metadata.dump() for metadata in loader.load()] == \
+            [metadata.dump() for metadata in metadatas]
+
+
+def test_block_reader_carries_stations_across_reads(mocker, configuration):
+
+    metadatas = LoadEMSHRLite(configuration, block_parsed=False).load()
+    mocker.patch.object(LoadEMSHRLite, 'READ_SIZE', 1000)
+
+    block_metadatas = LoadEMSHRLite(configuration).load()
+
+    assert [metadata.dump() for metadata in block_metadatas] == \
+        [metadata.dump() for metadata in metadatas]
@@ -0,0 +1,41 @@
+import logging
+
+from library.input_files import is_compressed
+
+
+class Application():
+
+    def __init__(self, loader, configuration):
+        self.loader = loader
+        self.output_file_path = configuration.output_file_path
+        self.ncdc = configuration.ncdc
+        return
+
+
+    def initialise(self):
+        return
+
+
+    def run(self):
+        logger = logging.getLogger(__name__)
+        if is_compressed(self.loader.file_path):
+            # A compressed file cannot be sought, so it is scanned instead.
+            logger.info(
+                f"Input: {self.loader.file_path}, "
+                f"is compressed, so it is not indexed.")
+        else:
+            # Rebuilds the index if the input file has changed.
+            index = self.loader.station_index()
+            columns = index.load()
+            logger.info(
+                f"Index: {index.index_path}, "
+                f"has {len(columns['ncdc'])} station blocks.")
+        if self.ncdc is None:
+            return
+        metadata = self.loader.load_station(self.ncdc)
+        with open(self.output_file_path, 'w') as lookup_file:
+            if metadata is None:
+                lookup_file.write(f"NCDC: {self.ncdc} not found.\n")
+            else:
+                lookup_file.write(metadata.dump())
+        return
@@ -0,0 +1,17 @@
+from library.load_emshr_lite import LoadEMSHRLite
+
+from station_lookup.application import Application
+
+
+'''
+Builder assembles an app
+by injecting class instances according to the dependency graph.
+'''
+
+from station_lookup.configuration import Configuration
+
+class Builder():
+
+    def compose(self, configuration: Configuration) -> Application:
+        loader = LoadEMSHRLite(configuration)
+        return Application(loader, configuration)
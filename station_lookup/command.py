@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+'''
+Created on 18 Oct. 2026
+
+@author: Richard Rothwell
+'''
+
+
+import argparse
+import sys
+import os
+import logging
+from datetime import datetime
+# import pbd; pdb.set_trace()
+
+from library.logging_utilities import LoggingManager
+from library.logging_utilities import LOG_LEVEL_LOOKUP
+from library.logging_utilities import LOG_DIRECTORY_PATH
+
+from station_lookup.configuration import Configuration
+from station_lookup.builder import Builder
+
+'''
+Build the station index for an EMSHR Lite file
+and optionally look up one station.
+=================================================
+
+This is the app entry point to be run from the command line.
+It accepts command-line parameters and then runs the app.
+
+This command reads a local data file containing a list of 
+weather stations and writes a sidecar index beside it,
+mapping each NCDC to the byte offset and line count 
+of the lines for that station.
+
+The index is rebuilt whenever the data file changes.
+When an NCDC is given, only the lines for that station 
+are parsed and its history is written to the output file.
+
+Prerequisites:
+The weather station files have been stored in the local file system.
+
+Instructions: run via the wrapper script like:
+    /usr/local/bin/run_station_lookup.sh
+'''
+
+
+class Command(object):
+
+    def __init__(self):
+        self.LOOKUP_NAME = 'global_weather_station_lookup'
+        self.application = None
+        return
+
+    def parameters(self):
+
+        command_description = 'Index the fixed field format station ' \
+            + ' records file ' \
+            + ' in the local file system ' \
+            + 'and optionally write the history of one station. '
+        parser = argparse.ArgumentParser(
+            description=command_description)
+
+        param_help_name = 'File path of uncompressed weather station records fixed field file.'
+        parser.add_argument('--input_file_path',
+                            nargs='?',
+                            type=argparse.FileType('rb'),
+                            help=param_help_name,
+                            default=sys.stdin
+                            )
+
+        param_help_name = 'File path of station history text file.'
+        parser.add_argument('--output_file_path',
+                            nargs='?',
+                            type=argparse.FileType('w'),
+                            help=param_help_name,
+                            default=sys.stdout
+                            )
+
+        param_help_name = 'NCDC of the station to look up.'
+        parser.add_argument('--ncdc',
+                            type=int,
+                            help=param_help_name,
+                            default=None
+                            )
+
+        args = parser.parse_args()
+        params = {
+            'input_file_path': args.input_file_path.name,
+            'output_file_path': args.output_file_path.name,
+            'ncdc': args.ncdc
+        }
+        return params
+
+    def initialise(self):
+
+        parameters = self.parameters()
+        
+        configuration = Configuration(parameters)
+
+        log_level_key = os.environ.get(
+            'LOG_LEVEL', default="INFO")
+        log_level = LOG_LEVEL_LOOKUP.get(
+            log_level_key, logging.INFO)
+
+        # Message will appear in cron.log.
+        print(
+            f"Initialising logging with: "
+            f"{log_level_key}({log_level}). "
+        )
+
+        logging_path = LOG_DIRECTORY_PATH
+        if os.environ.get('TEST_LOGGING', default="false") == 'true':
+            logging_path = '../logs'
+
+        global LOGGING_MANAGER
+        LOGGING_MANAGER = LoggingManager(
+            self.LOOKUP_NAME,
+            logging_path,
+            log_level
+        )
+        LOGGING_MANAGER.init_logging()
+
+        logger = logging.getLogger(__name__)
+
+        # Exercise logging at different levels.
+        logger.info(
+            f"Logging level (info) is: "
+            f"{log_level_key}({log_level})."
+        )
+        logger.debug(
+            f"Logging level (debug) is: "
+            f"{log_level_key}({log_level})."
+        )
+        logger.warning(
+            f"Logging level (warn) is: "
+            f"{log_level_key}({log_level})."
+        )
+        logger.error(
+            f"Logging level (error) is: "
+            f"{log_level_key}({log_level})."
+        )
+
+        logger.info("Initialising station lookup command.")
+        logger.info(sys.version)
+
+        self.application = Builder().compose(configuration)
+
+        self.application.initialise()
+
+    def run(self):
+        logger = logging.getLogger(__name__)
+
+        start_command = datetime.now()
+        logger.info(
+            f"Start station lookup at: "
+            f"{start_command}"
+        )
+
+        self.application.run()
+
+        end_command = datetime.now()
+        duration_minutes = (
+            end_command - start_command
+        ).seconds / 60.0
+        logger.info(
+            f"End station lookup at: {end_command}, "
+            f"with duration {duration_minutes:.2f} minutes. ")
+
+
+def main():
+    command = Command()
+    command.initialise()
+    command.run()
+
+
+if __name__ == '__main__':
+    main()
+        
\ No newline at end of file
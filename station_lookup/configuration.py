@@ -0,0 +1,12 @@
+
+
+class Configuration():
+
+    def __init__(self, parameters: dict):
+        self._label = 'station lookup'
+        self.input_file_path = parameters['input_file_path']
+        self.output_file_path = parameters['output_file_path']
+        self.ncdc = parameters.get('ncdc')
+
+    def label(self):
+        return self._label
@@ -0,0 +1,83 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+import os
+
+from library.load_emshr_lite import LoadEMSHRLite
+from library.station_metadata import StationMetadata
+
+from station_lookup.configuration import Configuration
+from station_lookup.application import Application
+
+
+def make_application(tmp_path, ncdc, input_file_path='./emshr_lite.txt'):
+    parameters = {
+        'input_file_path': input_file_path,
+        'output_file_path': str(tmp_path / 'emshr_station.txt'),
+        'ncdc': ncdc
+    }
+    configuration = Configuration(parameters)
+    return Application(LoadEMSHRLite(configuration), configuration)
+
+
+def test_run_builds_index(mocker, tmp_path):
+
+    application = make_application(tmp_path, None)
+    index = application.loader.station_index()
+    mocker.patch.object(index, 'load', autospec=True, return_value={'ncdc': [1, 2]})
+    mocker.patch.object(application.loader, 'load_station', autospec=True)
+
+    application.run()
+
+    index.load.assert_called_once_with()
+    application.loader.load_station.assert_not_called()
+    assert not os.path.exists(application.output_file_path)
+
+
+def test_run_writes_station(mocker, tmp_path):
+
+    application = make_application(tmp_path, 10000001)
+    index = application.loader.station_index()
+    mocker.patch.object(index, 'load', autospec=True, return_value={'ncdc': [10000001]})
+    metadata = StationMetadata(10000001, 'NEWPORT MUNICIPAL AP')
+    mocker.patch.object(application.loader, 'load_station', 
+        autospec=True, return_value=metadata)
+
+    application.run()
+
+    application.loader.load_station.assert_called_once_with(10000001)
+    with open(application.output_file_path) as lookup_file:
+        assert lookup_file.read() == metadata.dump()
+
+
+def test_run_reports_missing_station(mocker, tmp_path):
+
+    application = make_application(tmp_path, 5)
+    index = application.loader.station_index()
+    mocker.patch.object(index, 'load', autospec=True, return_value={'ncdc': []})
+    mocker.patch.object(application.loader, 'load_station', 
+        autospec=True, return_value=None)
+
+    application.run()
+
+    with open(application.output_file_path) as lookup_file:
+        assert lookup_file.read() == 'NCDC: 5 not found.\n'
+
+
+def test_run_does_not_index_compressed_file(mocker, tmp_path):
+
+    input_path = tmp_path / 'emshr_lite.txt.gz'
+    application = make_application(tmp_path, 10000001, str(input_path))
+    index = application.loader.station_index()
+    mocker.patch.object(index, 'load', autospec=True)
+    metadata = StationMetadata(10000001, 'NEWPORT MUNICIPAL AP')
+    mocker.patch.object(application.loader, 'load_station', 
+        autospec=True, return_value=metadata)
+
+    application.run()
+
+    index.load.assert_not_called()
+    application.loader.load_station.assert_called_once_with(10000001)
+    assert not os.path.exists(str(input_path) + '.index')
@@ -0,0 +1,24 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+from station_lookup.configuration import Configuration
+from station_lookup.builder import Builder
+from library.load_emshr_lite import LoadEMSHRLite
+
+
+def test_compose():
+
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_station.txt'
+    }
+    
+    configuration = Configuration(parameters)
+    
+    application = Builder().compose(configuration)
+    
+    assert isinstance(application.loader, LoadEMSHRLite)
+    assert application.output_file_path == './emshr_station.txt'
+    assert application.ncdc is None
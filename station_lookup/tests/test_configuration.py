@@ -0,0 +1,34 @@
+'''
+Created on 18 Oct. 2026
+
+@author: richardrothwell
+'''
+from station_lookup.configuration import Configuration
+
+
+def test_construction():
+
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_station.txt',
+        'ncdc': 30125305
+    }
+    
+    config = Configuration(parameters)
+    
+    assert config._label == 'station lookup'
+    assert config.input_file_path == './emshr_lite.txt'
+    assert config.output_file_path == './emshr_station.txt'
+    assert config.ncdc == 30125305
+
+
+def test_construction_without_ncdc():
+
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_station.txt'
+    }
+    
+    config = Configuration(parameters)
+    
+    assert config.ncdc is None
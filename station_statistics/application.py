@@ -1,5 +1,3 @@
-
-
 class Application():
 
     def __init__(self, loader, collector, reporter):
@@ -14,7 +12,6 @@ class Application():
 
 
     def run(self):
-        metadatas = self.loader.load()
-        statistics = self.collector.collect_statistics(metadatas)
+        statistics = self.collector.collect_statistics(self.loader.iter_stations())
         self.reporter.report(statistics)
         return
@@ -1,4 +1,5 @@
 from library.load_emshr_lite import LoadEMSHRLite
+from library.line_filter import LineFilter
 from library.collector import Collector
 from library.reporter import Reporter
 
@@ -15,7 +16,17 @@ from station_statistics.configuration import Configuration
 class Builder():
 
     def compose(self, configuration: Configuration) -> Application:
-        loader = LoadEMSHRLite(configuration)
+        loader = LoadEMSHRLite(
+            configuration, 
+            memory_mapped=True, 
+            workers=configuration.workers,
+            cached=True,
+            refresh_cache=configuration.reparse,
+            line_filter=LineFilter(
+                configuration.country_codes,
+                configuration.networks,
+                configuration.bounding_box,
+                configuration.date_range))
         collector = Collector(configuration)
         reporter = Reporter(configuration)
         return Application(loader, collector, reporter)
@@ -17,6 +17,7 @@ from datetime import datetime
 from library.logging_utilities import LoggingManager
 from library.logging_utilities import LOG_LEVEL_LOOKUP
 from library.logging_utilities import LOG_DIRECTORY_PATH
+from library.date_ordinals import date_ordinal
 
 from station_statistics.configuration import Configuration
 from station_statistics.builder import Builder
@@ -43,6 +44,18 @@ Instructions: run via the wrapper script like:
 '''
 
 
+def yyyymmdd_date(value: str) -> str:
+    '''
+    Argument type for a YYYYMMDD date, kept as a string
+    so argparse reports a malformed date as a usage error.
+    '''
+    try:
+        date_ordinal(value)
+    except ValueError as value_error:
+        raise argparse.ArgumentTypeError(str(value_error))
+    return value
+
+
 class Command(object):
 
     def __init__(self):
@@ -59,10 +72,11 @@ class Command(object):
         parser = argparse.ArgumentParser(
             description=command_description)
 
-        param_help_name = 'File path of weather station records fixed field file.'
+        param_help_name = 'File path of weather station records fixed field file. ' \
+            + 'The file may be compressed as .gz, .bz2 or .xz.'
         parser.add_argument('--input_file_path',
                             nargs='?',
-                            type=argparse.FileType('r'),
+                            type=argparse.FileType('rb'),
                             help=param_help_name,
                             default=sys.stdin
                             )
@@ -75,10 +89,63 @@ class Command(object):
                             default=sys.stdout
                             )
 
+        param_help_name = 'Number of worker processes used to parse the input file.'
+        parser.add_argument('--workers',
+                            type=int,
+                            help=param_help_name,
+                            default=1
+                            )
+
+        param_help_name = 'Re-parse the input file rather than using its cached snapshot.'
+        parser.add_argument('--reparse',
+                            action='store_true',
+                            help=param_help_name
+                            )
+
+        param_help_name = 'Only load locations in these comma separated country codes.'
+        parser.add_argument('--country_codes',
+                            help=param_help_name,
+                            default=None
+                            )
+
+        param_help_name = 'Only load locations in these comma separated networks.'
+        parser.add_argument('--networks',
+                            help=param_help_name,
+                            default=None
+                            )
+
+        param_help_name = 'Only load locations within this box of decimal degrees.'
+        parser.add_argument('--bounding_box',
+                            nargs=4,
+                            type=float,
+                            metavar=('MIN_LAT', 'MIN_LON', 'MAX_LAT', 'MAX_LON'),
+                            help=param_help_name,
+                            default=None
+                            )
+
+        param_help_name = 'Only load locations with periods overlapping these YYYYMMDD dates.'
+        parser.add_argument('--date_range',
+                            nargs=2,
+                            type=yyyymmdd_date,
+                            metavar=('BEGIN', 'END'),
+                            help=param_help_name,
+                            default=None
+                            )
+
         args = parser.parse_args()
+        if args.date_range and args.date_range[0] > args.date_range[1]:
+            parser.error(
+                f"argument --date_range: begin {args.date_range[0]} "
+                f"is after end {args.date_range[1]}")
         params = {
             'input_file_path': args.input_file_path.name,
-            'output_file_path': args.output_file_path.name
+            'output_file_path': args.output_file_path.name,
+            'workers': args.workers,
+            'reparse': args.reparse,
+            'country_codes': args.country_codes.split(',') if args.country_codes else None,
+            'networks': args.networks.split(',') if args.networks else None,
+            'bounding_box': tuple(args.bounding_box) if args.bounding_box else None,
+            'date_range': tuple(args.date_range) if args.date_range else None
         }
         return params
 
@@ -6,6 +6,12 @@ class Configuration():
         self._label = 'statistics collector'
         self.input_file_path = parameters['input_file_path']
         self.output_file_path = parameters['output_file_path']
+        self.workers = parameters.get('workers', 1)
+        self.reparse = parameters.get('reparse', False)
+        self.country_codes = parameters.get('country_codes')
+        self.networks = parameters.get('networks')
+        self.bounding_box = parameters.get('bounding_box')
+        self.date_range = parameters.get('date_range')
 
     def label(self):
         return self._label
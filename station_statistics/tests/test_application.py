@@ -4,12 +4,18 @@ Created on 27 Jul. 2021
 @author: richardrothwell
 '''
 
+import os
+import shutil
+from datetime import date
+
 from library.load_emshr_lite import LoadEMSHRLite
 from library.collector import Collector
 from library.reporter import Reporter
+from library.station_store import StationStore
 
 from station_statistics.configuration import Configuration
 from station_statistics.application import Application
+from station_statistics.builder import Builder
 
 
 def test_compose():
@@ -41,8 +47,8 @@ def test_run(mocker):
     configuration = Configuration(parameters)
 
     loader = LoadEMSHRLite(configuration)
-    metadatas = []
-    mocker.patch.object(loader, 'load', 
+    metadatas = iter([])
+    mocker.patch.object(loader, 'iter_stations', 
         autospec=True, return_value=metadatas)
     
     collector = Collector(configuration)
@@ -60,5 +66,63 @@ def test_run(mocker):
     collector.collect_statistics.assert_called_once_with(metadatas)
     reporter.report.assert_called_once_with(statistics)
 
+
+def test_run_with_date_range(mocker):
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_statistics.txt'
+    }
+    configuration = Configuration(parameters)
+
+    loader = LoadEMSHRLite(configuration)
+    mocker.patch.object(loader, 'iter_stations', 
+        autospec=True, return_value=iter([]))
+    
+    collector = Collector(configuration)
+    collector.date_range = (date(1950, 1, 1), date(1959, 12, 31))
+    statistics = {}
+    mocker.patch.object(collector, 'collect_store_statistics', 
+        autospec=True, return_value=statistics)
+    
+    reporter = Reporter(configuration)
+    mocker.patch.object(reporter, 'report', 
+        autospec=True)
+    
+    application = Application(loader, collector, reporter)
+    application.run()
+    
+    collector.collect_store_statistics.assert_called_once()
+    store = collector.collect_store_statistics.call_args[0][0]
+    assert isinstance(store, StationStore)
+    assert store.station_count() == 0
+    reporter.report.assert_called_once_with(statistics)
+
     
     
+
+
+def test_run_filters_by_configured_date_range(mocker, tmp_path):
+    input_path = tmp_path / 'emshr_lite.txt'
+    shutil.copyfile(
+        os.path.join(
+            os.path.dirname(__file__), '..', '..',
+            'library', 'tests_integration', 'emshr_lite_truncated.txt'),
+        input_path)
+    output_path = tmp_path / 'emshr_statistics.txt'
+    parameters = {
+        'input_file_path': str(input_path),
+        'output_file_path': str(output_path),
+        'date_range': ('19230101', '19301231')
+    }
+    application = Builder().compose(Configuration(parameters))
+    stations_active_between = mocker.spy(StationStore, 'stations_active_between')
+
+    application.run()
+
+    assert application.collector.date_range == (date(1923, 1, 1), date(1930, 12, 31))
+    # The stations are selected by the interval index of a store.
+    stations_active_between.assert_called_once()
+    assert stations_active_between.call_args[0][1:] == (date(1923, 1, 1), date(1930, 12, 31))
+    report = output_path.read_text()
+    assert 'Station count: 1\n' in report
+    assert 'Location count: 1\n' in report
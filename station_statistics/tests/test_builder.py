@@ -8,6 +8,7 @@ from station_statistics.builder import Builder
 from library.load_emshr_lite import LoadEMSHRLite
 from library.collector import Collector
 from library.reporter import Reporter
+from library.line_filter import LineFilter
 
 
 def test_compose():
@@ -25,4 +26,30 @@ def test_compose():
     assert isinstance(application.loader, LoadEMSHRLite)
     assert isinstance(application.collector, Collector)
     assert isinstance(application.reporter, Reporter)
+    assert application.loader.memory_mapped
+    assert application.loader.workers == 1
+    assert application.loader.cached
+    assert not application.loader.refresh_cache
+    assert not application.loader.line_filter.is_active()
+
+
+def test_compose_with_filters():
+
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_statistics.txt',
+        'country_codes': ['US'],
+        'date_range': ('19500101', '19591231')
+    }
+    
+    configuration = Configuration(parameters)
+    
+    application = Builder().compose(configuration)
+    
+    line_filter = application.loader.line_filter
+    assert isinstance(line_filter, LineFilter)
+    assert line_filter.is_active()
+    assert line_filter.country_codes == ['US']
+    assert line_filter.networks is None
+    assert line_filter.date_range == ('19500101', '19591231')
     
\ No newline at end of file
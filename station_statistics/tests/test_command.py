@@ -4,6 +4,7 @@ Created on 21 Jun. 2021
 @author: richardrothwell
 '''
 import pytest
+import sys
 import os
 
 from library.logging_utilities import LoggingManager
@@ -289,3 +290,34 @@ def test_main(monkeypatch):
 
     assert initialise_call_count == 1
     assert run_call_count == 1
+
+
+def test_parameters_date_range(monkeypatch, tmp_path):
+
+    input_path = tmp_path / 'weather_station_locations.txt'
+    input_path.write_bytes(b'')
+    monkeypatch.setattr(sys, 'argv', [
+        'command', '--input_file_path', str(input_path),
+        '--output_file_path', str(tmp_path / 'statistics.txt'),
+        '--date_range', '19500101', '19591231'])
+
+    parameters = Command().parameters()
+
+    assert parameters['date_range'] == ('19500101', '19591231')
+
+
+@pytest.mark.parametrize('date_range', [('1900', '1950'), ('19500101', '19491231')])
+def test_parameters_bad_date_range_is_a_usage_error(monkeypatch, tmp_path, capsys, date_range):
+
+    input_path = tmp_path / 'weather_station_locations.txt'
+    input_path.write_bytes(b'')
+    monkeypatch.setattr(sys, 'argv', [
+        'command', '--input_file_path', str(input_path),
+        '--output_file_path', str(tmp_path / 'statistics.txt'),
+        '--date_range', *date_range])
+
+    with pytest.raises(SystemExit) as exit_info:
+        Command().parameters()
+
+    assert exit_info.value.code == 2
+    assert 'argument --date_range' in capsys.readouterr().err
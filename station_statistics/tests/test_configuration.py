@@ -18,4 +18,33 @@ def test_construction():
     assert config._label == 'statistics collector'
     assert config.input_file_path == './emshr_lite.txt'
     assert config.output_file_path == './emshr_statistics.txt'
-    
\ No newline at end of file
+    
+
+def test_construction_with_workers():
+
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_statistics.txt',
+        'workers': 4
+    }
+    
+    config = Configuration(parameters)
+    
+    assert config.workers == 4
+
+
+def test_construction_defaults_to_one_worker():
+
+    parameters = {
+        'input_file_path': './emshr_lite.txt',
+        'output_file_path': './emshr_statistics.txt'
+    }
+    
+    config = Configuration(parameters)
+    
+    assert config.workers == 1
+    assert not config.reparse
+    assert config.country_codes is None
+    assert config.networks is None
+    assert config.bounding_box is None
+    assert config.date_range is None